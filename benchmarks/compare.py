@@ -0,0 +1,46 @@
+"""Compare two benchmark results files written by `benchmarks.run`
+
+Usage:
+    python -m benchmarks.compare baseline.json candidate.json
+"""
+
+import argparse
+import json
+
+
+def compare(baseline: dict, candidate: dict) -> list[tuple[str, float, float, float | None]]:
+    """Pair up benchmark results by name
+
+    Args:
+        baseline (dict): Baseline benchmark report
+        candidate (dict): Candidate benchmark report
+
+    Returns:
+        list[tuple[str, float, float, float | None]]: Name, baseline seconds, candidate seconds and speedup
+            (baseline / candidate) of every benchmark present in both reports
+    """
+    baseline_seconds = {result["name"]: result["seconds"] for result in baseline["results"]}
+    rows = []
+    for result in candidate["results"]:
+        if (before := baseline_seconds.get(result["name"])) is not None:
+            after = result["seconds"]
+            rows.append((result["name"], before, after, before / after if after else None))
+    return rows
+
+
+def main(argv: list[str] = None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("baseline", help="Baseline results file")
+    parser.add_argument("candidate", help="Candidate results file")
+    args = parser.parse_args(argv)
+    with open(args.baseline, encoding="utf-8") as file:
+        baseline = json.load(file)
+    with open(args.candidate, encoding="utf-8") as file:
+        candidate = json.load(file)
+    print(f"{'benchmark':<48} {'baseline ms':>12} {'candidate ms':>12} {'speedup':>8}")
+    for name, before, after, speedup in compare(baseline, candidate):
+        print(f"{name:<48} {before * 1000:>12.2f} {after * 1000:>12.2f} {speedup or 0:>7.2f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,160 @@
+"""Deterministic synthetic Esri JSON geometries and FeatureSets for benchmarking"""
+
+import math
+import random
+
+
+def point_cloud(count: int, seed: int = 0) -> list[dict]:
+    """Generate Esri JSON Point geometries scattered uniformly over the globe
+
+    Args:
+        count (int): Number of points
+        seed (int, optional): Random seed. Defaults to 0.
+
+    Returns:
+        list[dict]: Esri JSON Point geometries
+    """
+    rng = random.Random(seed)
+    return [{"x": rng.uniform(-180, 180), "y": rng.uniform(-90, 90)} for _ in range(count)]
+
+
+def long_polyline(vertices: int, seed: int = 0) -> dict:
+    """Generate an Esri JSON Polyline with one long random-walk path
+
+    Args:
+        vertices (int): Number of vertices
+        seed (int, optional): Random seed. Defaults to 0.
+
+    Returns:
+        dict: Esri JSON Polyline geometry
+    """
+    rng = random.Random(seed)
+    x, y = 0.0, 0.0
+    path = []
+    for _ in range(vertices):
+        x += rng.uniform(-0.001, 0.001)
+        y += rng.uniform(-0.001, 0.001)
+        path.append([x, y])
+    return {"paths": [path]}
+
+
+def polygon_with_holes(holes: int, vertices_per_ring: int = 32, seed: int = 0) -> dict:
+    """Generate an Esri JSON Polygon with one outer ring containing a grid of holes
+
+    Args:
+        holes (int): Number of holes
+        vertices_per_ring (int, optional): Number of vertices per ring. Defaults to 32.
+        seed (int, optional): Random seed. Defaults to 0.
+
+    Returns:
+        dict: Esri JSON Polygon geometry
+    """
+    rng = random.Random(seed)
+    side = max(1, math.ceil(math.sqrt(holes)))
+    rings = [_ring(rng, side / 2, side / 2, side * 0.75, vertices_per_ring * 4, clockwise=True)]
+    for i in range(holes):
+        cx, cy = i % side + 0.5, i // side + 0.5
+        rings.append(_ring(rng, cx, cy, 0.3, vertices_per_ring, clockwise=False))
+    return {"rings": rings}
+
+
+def deep_multipolygon(parts: int, holes_per_part: int = 2, vertices_per_ring: int = 32, seed: int = 0) -> dict:
+    """Generate an Esri JSON Polygon with many outer rings, each with some holes
+
+    Args:
+        parts (int): Number of outer rings
+        holes_per_part (int, optional): Number of holes per outer ring. Defaults to 2.
+        vertices_per_ring (int, optional): Number of vertices per ring. Defaults to 32.
+        seed (int, optional): Random seed. Defaults to 0.
+
+    Returns:
+        dict: Esri JSON Polygon geometry
+    """
+    rng = random.Random(seed)
+    side = max(1, math.ceil(math.sqrt(parts)))
+    rings = []
+    for i in range(parts):
+        cx, cy = (i % side) * 10.0, (i // side) * 10.0
+        rings.append(_ring(rng, cx, cy, 4.0, vertices_per_ring, clockwise=True))
+        for j in range(holes_per_part):
+            angle = 2 * math.pi * j / holes_per_part
+            rings.append(
+                _ring(rng, cx + 2 * math.cos(angle), cy + 2 * math.sin(angle), 0.8, vertices_per_ring, clockwise=False)
+            )
+    rng.shuffle(rings)
+    return {"rings": rings}
+
+
+def featureset(kind: str, count: int, seed: int = 0) -> dict:
+    """Generate an Esri JSON FeatureSet
+
+    Args:
+        kind (str): Geometry kind: "point", "polyline" or "polygon"
+        count (int): Number of features
+        seed (int, optional): Random seed. Defaults to 0.
+
+    Raises:
+        ValueError: If `kind` is not recognized
+
+    Returns:
+        dict: Esri JSON FeatureSet
+    """
+    rng = random.Random(seed)
+    geometry_types = {"point": "esriGeometryPoint", "polyline": "esriGeometryPolyline", "polygon": "esriGeometryPolygon"}
+    if kind not in geometry_types:
+        raise ValueError(f"Unknown geometry kind: {kind}")
+    features = []
+    for i in range(count):
+        x, y = rng.uniform(-170, 170), rng.uniform(-80, 80)
+        if kind == "point":
+            geometry = {"x": x, "y": y}
+        elif kind == "polyline":
+            geometry = {"paths": [[[x + k * 0.001, y + rng.uniform(-0.001, 0.001)] for k in range(16)]]}
+        else:
+            geometry = {"rings": [_ring(rng, x, y, 0.01, 16, clockwise=True), _ring(rng, x, y, 0.003, 8, False)]}
+        features.append(
+            {
+                "geometry": geometry,
+                "attributes": {"OBJECTID": i + 1, "name": f"feature {i}", "value": rng.random(), "code": i % 97},
+            }
+        )
+    return {
+        "objectIdFieldName": "OBJECTID",
+        "geometryType": geometry_types[kind],
+        "spatialReference": {"wkid": 4326},
+        "features": features,
+    }
+
+
+def count_vertices(obj) -> int:
+    """Count the vertices in an Esri JSON or GeoJSON object
+
+    Args:
+        obj: Esri JSON or GeoJSON object, or a list of them
+
+    Returns:
+        int: Number of vertices
+    """
+    if isinstance(obj, list):
+        if obj and isinstance(obj[0], (int, float)):
+            return 1
+        return sum(count_vertices(item) for item in obj)
+    if isinstance(obj, dict):
+        if "x" in obj and "y" in obj:
+            return 1
+        keys = ("features", "geometry", "points", "paths", "rings", "coordinates")
+        return sum(count_vertices(obj[key]) for key in keys if obj.get(key))
+    return 0
+
+
+def _ring(rng: random.Random, cx: float, cy: float, radius: float, vertices: int, clockwise: bool) -> list:
+    """Generate a closed, slightly irregular circular ring"""
+    ring = []
+    for k in range(vertices):
+        angle = 2 * math.pi * k / vertices
+        r = radius * rng.uniform(0.9, 1.0)
+        ring.append([cx + r * math.cos(angle), cy + r * math.sin(angle)])
+    if clockwise:
+        ring.reverse()
+    ring.append(ring[0][:])
+    return ring
@@ -0,0 +1,195 @@
+"""Run the conversion benchmarks and write the results as JSON
+
+Usage:
+    python -m benchmarks.run [--sizes 1000 10000 100000 1000000] [--repeat 3] [--output results.json]
+"""
+
+import argparse
+import json
+import platform
+import sys
+import time
+import tracemalloc
+from collections.abc import Callable
+from datetime import datetime, timezone
+from importlib.metadata import PackageNotFoundError, version
+
+from terraformer import common, jsonio, vectorized
+from terraformer.arcgis import (
+    arcgis_to_geojson,
+    arcgis_to_geojson_bytes,
+    geojson_to_arcgis,
+    geojson_to_arcgis_bytes,
+    helpers,
+)
+
+from . import generators
+
+DEFAULT_SIZES = (1000, 10000, 100000)
+
+
+def measure(name: str, func: Callable, args: tuple, features: int, vertices: int, repeat: int) -> dict:
+    """Time a function call (best of `repeat`) and measure its peak memory allocation in a separate traced run
+
+    Args:
+        name (str): Benchmark name
+        func (Callable): Function to benchmark
+        args (tuple): Arguments to call `func` with
+        features (int): Number of features processed per call
+        vertices (int): Number of vertices processed per call
+        repeat (int): Number of timed calls
+
+    Returns:
+        dict: Benchmark result
+    """
+    seconds = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func(*args)
+        seconds = min(seconds, time.perf_counter() - start)
+    tracemalloc.start()
+    func(*args)
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    result = {
+        "name": name,
+        "features": features,
+        "vertices": vertices,
+        "seconds": seconds,
+        "features_per_sec": features / seconds if seconds else None,
+        "vertices_per_sec": vertices / seconds if seconds else None,
+        "peak_memory_bytes": peak,
+    }
+    print(
+        f"{name:<48} {seconds * 1000:>10.2f} ms {result['features_per_sec'] or 0:>14,.0f} feat/s "
+        f"{result['vertices_per_sec'] or 0:>14,.0f} vert/s {peak / 1e6:>10.1f} MB",
+        file=sys.stderr,
+    )
+    return result
+
+
+def conversion_benchmarks(sizes: list[int], repeat: int) -> list[dict]:
+    """Benchmark both conversion directions on FeatureSets and single large geometries"""
+    results = []
+    for kind in ("point", "polyline", "polygon"):
+        for size in sizes:
+            featureset = generators.featureset(kind, size)
+            feature_collection = arcgis_to_geojson(featureset)
+            vertices = generators.count_vertices(featureset)
+            results.append(
+                measure(f"arcgis_to_geojson/{kind}/{size}", arcgis_to_geojson, (featureset,), size, vertices, repeat)
+            )
+            results.append(
+                measure(
+                    f"geojson_to_arcgis/{kind}/{size}",
+                    geojson_to_arcgis,
+                    (feature_collection,),
+                    size,
+                    vertices,
+                    repeat,
+                )
+            )
+
+    geometries = {
+        "point_cloud": {"points": [[p["x"], p["y"]] for p in generators.point_cloud(max(sizes))]},
+        "long_polyline": generators.long_polyline(max(sizes)),
+        "polygon_with_holes": generators.polygon_with_holes(max(1, max(sizes) // 100)),
+        "deep_multipolygon": generators.deep_multipolygon(max(1, max(sizes) // 100)),
+    }
+    for name, geometry in geometries.items():
+        geojson = arcgis_to_geojson(geometry)
+        vertices = generators.count_vertices(geometry)
+        results.append(measure(f"arcgis_to_geojson/{name}", arcgis_to_geojson, (geometry,), 1, vertices, repeat))
+        results.append(measure(f"geojson_to_arcgis/{name}", geojson_to_arcgis, (geojson,), 1, vertices, repeat))
+    return results
+
+
+def bytes_benchmarks(sizes: list[int], repeat: int) -> list[dict]:
+    """Benchmark end-to-end conversion of raw JSON documents: the dict API with the standard library `json` module
+    versus the bytes API with the selected JSON backend"""
+
+    def arcgis_to_geojson_dict(data: bytes) -> bytes:
+        return json.dumps(arcgis_to_geojson(json.loads(data))).encode("utf-8")
+
+    def geojson_to_arcgis_dict(data: bytes) -> bytes:
+        return json.dumps(geojson_to_arcgis(json.loads(data))).encode("utf-8")
+
+    results = []
+    for kind in ("point", "polyline", "polygon"):
+        for size in sizes:
+            featureset = generators.featureset(kind, size)
+            vertices = generators.count_vertices(featureset)
+            arcgis_data = json.dumps(featureset).encode("utf-8")
+            geojson_data = json.dumps(arcgis_to_geojson(featureset)).encode("utf-8")
+            for name, func, data in (
+                (f"end_to_end/dict/arcgis_to_geojson/{kind}/{size}", arcgis_to_geojson_dict, arcgis_data),
+                (f"end_to_end/bytes/arcgis_to_geojson/{kind}/{size}", arcgis_to_geojson_bytes, arcgis_data),
+                (f"end_to_end/dict/geojson_to_arcgis/{kind}/{size}", geojson_to_arcgis_dict, geojson_data),
+                (f"end_to_end/bytes/geojson_to_arcgis/{kind}/{size}", geojson_to_arcgis_bytes, geojson_data),
+            ):
+                results.append(measure(name, func, (data,), size, vertices, repeat))
+    return results
+
+
+def kernel_benchmarks(sizes: list[int], repeat: int) -> list[dict]:
+    """Benchmark the ring geometry kernels in `terraformer.common` and `terraformer.arcgis.helpers`"""
+    results = []
+    for size in sizes:
+        ring = generators.polygon_with_holes(1, vertices_per_ring=max(4, size // 4))["rings"][0]
+        hole = generators.polygon_with_holes(1, vertices_per_ring=max(4, size // 4), seed=1)["rings"][1]
+        open_ring = ring[:-1]
+        polygon = [ring, hole]
+        vertices = len(ring)
+        for name, func, args in (
+            ("ring_is_clockwise", helpers.ring_is_clockwise, (ring,)),
+            ("close_ring", helpers.close_ring, (open_ring,)),
+            ("coordinates_contain_point", common.coordinates_contain_point, (ring, hole[0])),
+            ("array_intersects_array", common.array_intersects_array, (ring, hole)),
+            ("orient_rings", helpers.orient_rings, (polygon,)),
+            ("flatten_multipolygon_rings", helpers.flatten_multipolygon_rings, ([polygon, polygon],)),
+        ):
+            results.append(measure(f"kernel/{name}/{vertices}", func, args, 1, vertices, repeat))
+    return results
+
+
+def main(argv: list[str] = None) -> dict:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--sizes", type=int, nargs="+", default=DEFAULT_SIZES, help="FeatureSet sizes to benchmark")
+    parser.add_argument("--repeat", type=int, default=3, help="Number of timed runs per benchmark (best is kept)")
+    parser.add_argument("--output", help="Path of the JSON results file (default: print to stdout)")
+    parser.add_argument("--skip-kernels", action="store_true", help="Only benchmark the converters")
+    args = parser.parse_args(argv)
+
+    results = conversion_benchmarks(args.sizes, args.repeat)
+    results += bytes_benchmarks(args.sizes, args.repeat)
+    if not args.skip_kernels:
+        results += kernel_benchmarks(args.sizes, args.repeat)
+
+    try:
+        package_version = version("terraformer-py")
+    except PackageNotFoundError:
+        package_version = None
+    report = {
+        "metadata": {
+            "terraformer_version": package_version,
+            "python": platform.python_version(),
+            "implementation": platform.python_implementation(),
+            "platform": platform.platform(),
+            "numpy": vectorized.np.__version__ if vectorized.available else None,
+            "json_backend": jsonio.get_json_backend(),
+            "sizes": list(args.sizes),
+            "repeat": args.repeat,
+            "timestamp": datetime.now(timezone.utc).isoformat(),
+        },
+        "results": results,
+    }
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as file:
+            json.dump(report, file, indent=2)
+    else:
+        json.dump(report, sys.stdout, indent=2)
+    return report
+
+
+if __name__ == "__main__":
+    main()
@@ -1,6 +1,36 @@
 """Convert ArcGIS JSON geometries to GeoJSON geometries and vice versa"""
 
-from .arcgis import arcgis_to_geojson
-from .geojson import geojson_to_arcgis
+from .arcgis import arcgis_to_geojson, arcgis_to_geojson_bytes, arcgis_to_geojson_iter
+from .batch import batch_features, estimate_feature_size
+from .geojson import geojson_to_arcgis, geojson_to_arcgis_bytes, geojson_to_arcgis_iter
+from .harvest import HarvestError, harvest_layer
+from .mapped import MappedFeatureFile
+from .pbf import arcgis_pbf_to_geojson, arcgis_pbf_to_geojson_iter
+from .parallel import (
+    arcgis_to_geojson_parallel,
+    arcgis_to_geojson_threaded,
+    geojson_to_arcgis_parallel,
+    geojson_to_arcgis_threaded,
+)
+from .quantization import quantization_transform
 
-__all__ = ["arcgis_to_geojson", "geojson_to_arcgis"]
+__all__ = [
+    "HarvestError",
+    "MappedFeatureFile",
+    "arcgis_pbf_to_geojson",
+    "arcgis_pbf_to_geojson_iter",
+    "arcgis_to_geojson",
+    "arcgis_to_geojson_bytes",
+    "arcgis_to_geojson_iter",
+    "arcgis_to_geojson_parallel",
+    "arcgis_to_geojson_threaded",
+    "batch_features",
+    "estimate_feature_size",
+    "geojson_to_arcgis",
+    "geojson_to_arcgis_bytes",
+    "geojson_to_arcgis_iter",
+    "geojson_to_arcgis_parallel",
+    "geojson_to_arcgis_threaded",
+    "harvest_layer",
+    "quantization_transform",
+]
@@ -0,0 +1,142 @@
+"""Reading Esri JSON FeatureSets and GeoJSON files feature by feature, and converting them chunk by chunk, shared by
+the streaming, memory-mapped, parallel and harvesting readers"""
+
+from collections import deque
+from collections.abc import Callable, Iterable, Iterator
+from concurrent.futures import Executor
+from typing import BinaryIO, TextIO
+
+from terraformer import jsonio
+from .helpers import check_spatial_reference
+
+# FeatureSet members applied to each of its features (see `apply_header`)
+HEADER_MEMBERS = ("spatialReference", "transform", "geometryType")
+
+_RECORD_SEPARATOR = "\x1e"
+
+
+def apply_header(header: dict, options: dict, started: bool = False):
+    """Add a FeatureSet's `spatialReference`, `transform` and `geometryType` to the conversion options of its
+    features, checking its spatial reference. The options get a set of checked spatial references, shared by the
+    features, so that each distinct CRS warns once. Streaming readers apply each of these members as it's read.
+
+    Args:
+        header (dict): FeatureSet, or some of its members other than `features`
+        options (dict): Keyword arguments for `arcgis_to_geojson`, updated in place
+        started (bool, optional): Whether features preceding the members were already converted. Defaults to False.
+
+    Raises:
+        ValueError: If features were already converted without the `transform` (or, with `reproject`, the
+            `spatialReference`)
+    """
+    checked = options.setdefault("checked_spatial_references", set())
+    if spatial_reference := header.get("spatialReference"):
+        check_spatial_reference(spatial_reference, options.get("reproject"), checked)
+        if started and options.get("reproject"):
+            raise ValueError(
+                "FeatureSet 'spatialReference' must precede its 'features' to be reprojected while streaming"
+            )
+        # Features' geometries declaring the same CRS aren't checked (and warned about) again
+        options["spatial_reference"] = spatial_reference
+    if transform := header.get("transform"):
+        if started:
+            raise ValueError("FeatureSet 'transform' must precede its 'features' to be applied while streaming")
+        options["transform"] = transform
+    if (geometry_type := header.get("geometryType")) and not started:
+        options["geometry_type"] = geometry_type
+
+
+def iter_raw_features(
+    members: Iterable[tuple[str, bytes]], options: dict, array_key: str = "features"
+) -> Iterator[bytes]:
+    """Yield the raw JSON of each feature of an Esri JSON FeatureSet from its members (see
+    `JSONScanner.iter_members`), applying the header members met along the way to the conversion `options` (see
+    `apply_header`) before the features that follow them are yielded
+
+    Args:
+        members (Iterable[tuple[str, bytes]]): Member keys and raw JSON values, one per feature for `array_key`
+        options (dict): Keyword arguments for `arcgis_to_geojson`, updated in place
+        array_key (str, optional): Key of the member containing the features. Defaults to "features".
+
+    Raises:
+        ValueError: If the FeatureSet's `transform` (or, with `reproject`, its `spatialReference`) follows its features
+
+    Yields:
+        bytes: Raw JSON of each feature
+    """
+    started = False
+    options.setdefault("checked_spatial_references", set())
+    for key, raw in members:
+        if key == array_key:
+            started = True
+            yield raw
+        elif key in HEADER_MEMBERS:
+            apply_header({key: jsonio.loads(raw)}, options, started)
+
+
+def load_feature(raw: bytes) -> dict:
+    """Parse the raw JSON of a streamed feature
+
+    Raises:
+        ValueError: If the feature is not a JSON object
+
+    Returns:
+        dict: Feature
+    """
+    if not isinstance(feature := jsonio.loads(raw), dict):
+        raise ValueError(f"Features must be JSON objects, not {type(feature).__name__}: {bytes(raw[:40])!r}")
+    return feature
+
+
+def iter_geojson_texts(file: BinaryIO | TextIO) -> Iterator[str]:
+    """Split a GeoJSON Text Sequence (RFC 8142) or newline-delimited GeoJSON file object into raw GeoJSON texts.
+    The rule is decided line by line, so the file is read in a single pass: a line starting with the RS character
+    starts a record that runs until the next such line, and may span several lines. Until the first of them, each
+    non-blank line is a record of its own. RS characters elsewhere in a line are not delimiters.
+
+    Args:
+        file (BinaryIO | TextIO): File object to read from
+
+    Yields:
+        str: Raw GeoJSON texts
+    """
+    pending = []
+    for line in file:
+        if isinstance(line, bytes):
+            line = line.decode("utf-8")
+        if line.startswith(_RECORD_SEPARATOR):
+            if pending:
+                yield "".join(pending)
+            pending = [line[1:]]
+        elif pending:
+            pending.append(line)  # Records in a text sequence may span multiple lines
+        elif line.strip():
+            yield line
+    if pending:
+        yield "".join(pending)
+
+
+def map_chunks(executor: Executor, convert: Callable, chunks: Iterator, max_in_flight: int) -> Iterator[dict]:
+    """Submit chunks to an executor, keeping at most `max_in_flight` chunks queued so that memory stays bounded for
+    large inputs, and yield the converted features of each chunk in submission order
+
+    Args:
+        executor (Executor): Executor to run conversions in
+        convert (Callable): Function converting one chunk to a list of features
+        chunks (Iterator): Chunks of input features
+        max_in_flight (int): Maximum number of submitted chunks whose results haven't been yielded yet
+
+    Yields:
+        dict: Converted features, in input order
+    """
+    pending = deque()
+    try:
+        for chunk in chunks:
+            pending.append(executor.submit(convert, chunk))
+            if len(pending) >= max_in_flight:
+                yield from pending.popleft().result()
+        while pending:
+            yield from pending.popleft().result()
+    finally:
+        for future in pending:
+            future.cancel()
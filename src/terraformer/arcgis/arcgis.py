@@ -1,94 +1,393 @@
+from collections.abc import Callable, Iterator
+from functools import partial
+from time import perf_counter
+from typing import BinaryIO, TextIO
 from warnings import warn
 
 from terraformer.common import (
+    BBoxIndex,
     LineStringCoords,
     MultiLineStringCoords,
     array_intersects_array,
+    coordinates_bbox,
     coordinates_contain_point,
+    round_path,
+    round_point,
+    simplify_path,
 )
-from .helpers import close_ring, ring_is_clockwise
-
-
-def arcgis_to_geojson(arcgis: dict, id_attribute: str = None) -> dict:
+from terraformer import jsonio
+from terraformer.cache import GeometryCache
+from terraformer.jsonscan import JSONScanner
+from terraformer.lazy import LazyFeature, LazyValue
+from terraformer.packed import PackedCoordinates, unpack
+from terraformer.projection import is_web_mercator, web_mercator_to_wgs84_geometry
+from terraformer.stats import current_stats
+from ._stream import iter_raw_features, load_feature
+from .helpers import check_spatial_reference, close_ring, matches_where, ring_is_clockwise, spatial_reference_ids
+from .quantization import dequantize_geometry
+
+_PACKABLE_TYPES = ("MultiPoint", "LineString", "MultiLineString", "Polygon", "MultiPolygon")
+
+
+def arcgis_to_geojson(
+    arcgis: dict,
+    id_attribute: str = None,
+    packed: bool = False,
+    copy: bool = True,
+    transform: dict = None,
+    cache: GeometryCache = None,
+    precision: int = None,
+    reproject: bool = False,
+    spatial_reference: dict = None,
+    simplify: float = None,
+    lazy: bool = False,
+    fields: list[str] = None,
+    where: Callable[[dict], bool] = None,
+    geometry_type: str = None,
+    checked_spatial_references: set = None,
+) -> dict:
     """Recursively converts an Esri JSON object into a GeoJSON object
 
     Args:
-        arcgis (dict): Esri JSON object
+        arcgis (dict): Esri JSON object. `points`, `paths` and `rings` may be nested lists or PackedCoordinates.
         id_attribute (str, optional): Name of ID attribute (default: None)
+        packed (bool, optional): Emit non-Point geometry coordinates as PackedCoordinates instead of nested lists.
+            Defaults to False.
+        copy (bool, optional): Copy coordinate arrays and attributes into the output. If False, the output shares
+            every container the conversion doesn't need to change (e.g. MultiPoint/LineString coordinates and
+            properties) with the input, so neither should be modified afterwards. Defaults to True.
+        transform (dict, optional): Esri JSON transform of quantized, delta-encoded coordinates. Defaults to None, in
+            which case a FeatureSet's own `transform` (if any) is used for its features.
+        cache (GeometryCache, optional): Cache of converted geometries, for inputs that repeat geometries. Defaults
+            to None (no caching).
+        precision (int, optional): Round x and y coordinates to this many decimal places as they're converted,
+            dropping vertices that become identical to the previous one and rings that collapse (6 decimal places of
+            a degree is about 10 cm). Defaults to None (coordinates are kept as is).
+        reproject (bool, optional): Reproject Web Mercator coordinates (WKID 3857, 102100, 102113 or 900913) to
+            WGS 84 as they're converted, instead of warning about their CRS. Defaults to False.
+        spatial_reference (dict, optional): Esri JSON spatialReference of geometries that don't have their own, used
+            with `reproject`. Defaults to None, in which case a FeatureSet's own `spatialReference` is used for its
+            features.
+        simplify (float, optional): Simplify paths and rings with the Douglas-Peucker algorithm as they're converted,
+            dropping vertices closer than this tolerance (in output coordinate units) to the simplified line, and
+            rings that collapse. Applied before `precision`. Defaults to None (no simplification).
+        lazy (bool, optional): Return Features as LazyFeatures, whose `properties` and `id` are available right away
+            but whose `geometry` is only converted when it's first accessed (or serialized), which saves converting
+            geometries of features that are filtered out by attribute. The input geometries must not be modified
+            until then, and errors and warnings converting them are deferred until then too. Defaults to False.
+        fields (list[str], optional): Names of the attributes to keep in Features' properties, in this order. Other
+            attributes are never copied, but the ID is still read from them. Defaults to None (all attributes).
+        where (Callable[[dict], bool], optional): Predicate called with the attributes of each feature of a FeatureSet
+            (all of them, or an empty dict) before anything else is converted. Features for which it returns False
+            are left out. Defaults to None (all features).
+        geometry_type (str, optional): Esri JSON geometry type of Features' geometries (e.g. "esriGeometryPoint"),
+            which are then converted directly as that type instead of being probed for every type's members. Defaults
+            to None, in which case a FeatureSet's own `geometryType` is used for its features. Geometries without the
+            type's members are still probed.
+        checked_spatial_references (set, optional): IDs of the spatial references checked (and warned about)
+            already, updated in place (see `helpers.check_spatial_reference`). Defaults to None, in which case a new set
+            is shared by the object and the objects nested in it, so that each distinct CRS warns once, and
+            `spatial_reference` counts as checked.
+
+    Raises:
+        ValueError: If `precision` or `simplify` is negative
 
     Returns:
         dict: A GeoJSON object
     """
+    # Spatial references are inherited by nested objects, and each distinct one is only checked once
+    if checked_spatial_references is None:
+        checked_spatial_references = spatial_reference_ids(spatial_reference) if spatial_reference else set()
+    spatial_reference = (own_spatial_reference := arcgis.get("spatialReference")) or spatial_reference
+    # FeatureSets and Features have no coordinates of their own, their geometries are projected as they're converted
+    is_geometry = not ("features" in arcgis or "geometry" in arcgis or "attributes" in arcgis)
+    project = reproject and is_geometry and bool(spatial_reference) and is_web_mercator(spatial_reference)
+
+    if cache is not None and is_geometry:
+        # The conversion inherits this object's spatial reference, so it's checked here, on hits and misses alike
+        if own_spatial_reference:
+            check_spatial_reference(own_spatial_reference, reproject, checked_spatial_references)
+        return cache.get_or_convert(
+            ("arcgis_to_geojson", arcgis, packed, transform, precision, project, simplify),
+            partial(
+                arcgis_to_geojson,
+                arcgis,
+                None,
+                packed,
+                copy,
+                transform,
+                precision=precision,
+                reproject=reproject,
+                spatial_reference=spatial_reference,
+                simplify=simplify,
+                checked_spatial_references=checked_spatial_references,
+            ),
+            copy,
+        )
+
     geojson = {}
+    transform = arcgis.get("transform") or transform
 
     if features := arcgis.get("features"):
         geojson["type"] = "FeatureCollection"
         geojson["features"] = []
+        geometry_type = arcgis.get("geometryType") or geometry_type
         for feature in features:
-            geojson["features"].append(arcgis_to_geojson(feature, id_attribute))
-
-    if _is_number(x := arcgis.get("x")) and _is_number(y := arcgis.get("y")):
-        geojson["type"] = "Point"
-        geojson["coordinates"] = [x, y]
-        if (z := arcgis.get("z")) and _is_number(z):
-            geojson["coordinates"].append(z)
-
-    if points := arcgis.get("points"):
-        geojson["type"] = "MultiPoint"
-        geojson["coordinates"] = points[:]
-
-    if paths := arcgis.get("paths"):
-        if len(paths) == 1:
-            geojson["type"] = "LineString"
-            geojson["coordinates"] = paths[0][:]
-        else:
-            geojson["type"] = "MultiLineString"
-            geojson["coordinates"] = paths[:]
-
-    if rings := arcgis.get("rings"):
-        geojson = _convert_rings_to_geojson(rings)
-
-    if (
-        (xmin := arcgis.get("xmin"))
-        and (ymin := arcgis.get("ymin"))
-        and (xmax := arcgis.get("xmax"))
-        and (ymax := arcgis.get("ymax"))
-    ):
-        if all(_is_number(v) for v in [xmin, ymin, xmax, ymax]):
-            geojson["type"] = "Polygon"
-            geojson["coordinates"] = [
-                [
-                    [xmax, ymax],
-                    [xmin, ymax],
-                    [xmin, ymin],
-                    [xmax, ymin],
-                    [xmax, ymax],
-                ]
-            ]
+            if where is not None and not matches_where(feature, where, "attributes"):
+                continue
+            geojson["features"].append(
+                arcgis_to_geojson(
+                    feature,
+                    id_attribute,
+                    packed,
+                    copy,
+                    transform,
+                    cache,
+                    precision,
+                    reproject,
+                    spatial_reference,
+                    simplify,
+                    lazy,
+                    fields,
+                    None,
+                    geometry_type,
+                    checked_spatial_references,
+                )
+            )
+
+    if is_geometry:
+        geojson.update(
+            _geometry_to_geojson(arcgis, geometry_type, packed, copy, transform, precision, project, simplify)
+        )
+    elif not _GEOMETRY_MEMBER_NAMES.isdisjoint(arcgis):
+        # Geometry members of a FeatureSet or Feature itself are probed, like those of a geometry of undeclared type
+        geojson.update(_geometry_to_geojson(arcgis, None, packed, copy, transform, precision, False, simplify))
 
     geometry = arcgis.get("geometry")
     attributes = arcgis.get("attributes")
     if geometry or attributes:
+        start = perf_counter() if (stats := current_stats()) is not None else None
         geojson["type"] = "Feature"
-        geojson["geometry"] = arcgis_to_geojson(geometry) if geometry else None
-        geojson["properties"] = attributes.copy() if attributes else None
+        if geometry:
+            if cache is None and "spatialReference" not in geometry and "transform" not in geometry:
+                # The geometry inherits everything from the feature, so it's converted without checking its own
+                project = reproject and bool(spatial_reference) and is_web_mercator(spatial_reference)
+                convert = _geometry_to_geojson
+                args = (geometry, geometry_type, packed, copy, transform, precision, project, simplify)
+            else:
+                convert = arcgis_to_geojson
+                args = (geometry, None, packed, copy, transform, cache, precision, reproject, spatial_reference)
+                args += (simplify, False, None, None, geometry_type, checked_spatial_references)
+            if lazy:
+                # Invalid geometries convert to {}, and become None (see below)
+                geojson["geometry"] = LazyValue(lambda: convert(*args) or None)
+            else:
+                geojson["geometry"] = convert(*args)
+        else:
+            geojson["geometry"] = None
+        if attributes and fields is not None:
+            geojson["properties"] = {name: attributes[name] for name in fields if name in attributes}
+        else:
+            geojson["properties"] = (attributes.copy() if copy else attributes) if attributes else None
         if attributes:
             try:
                 geojson["id"] = _get_id(attributes, id_attribute)
             except KeyError:
                 pass  # Don't set an (optional) id
+        if stats is not None:
+            stats.record_feature("arcgis_to_geojson", geojson.get("id"), perf_counter() - start)
 
     # If no valid geometry was encountered
     if geojson.get("geometry") == {}:
         geojson["geometry"] = None
 
-    if spatial_reference := arcgis.get("spatialReference"):
-        if (wkid := spatial_reference.get("wkid")) and wkid != 4326:
-            warn(f"Object converted in non-standard CRS - {spatial_reference}")
+    if lazy and geojson.get("type") == "Feature":
+        geojson = LazyFeature(geojson)
+
+    if own_spatial_reference:
+        check_spatial_reference(own_spatial_reference, reproject, checked_spatial_references)
+
+    return geojson
+
+
+def arcgis_to_geojson_bytes(data: bytes | str, id_attribute: str = None, **options) -> bytes:
+    """Converts a raw Esri JSON document into a raw GeoJSON document. The document is parsed and the result
+    serialized with the fastest installed JSON backend (see `terraformer.jsonio`), and since the parsed input is
+    private to this call, it's converted without copying (`copy=False`).
+
+    Args:
+        data (bytes | str): Esri JSON document
+        id_attribute (str, optional): Name of ID attribute (default: None)
+        **options: Additional keyword arguments passed to `arcgis_to_geojson`
+
+    Raises:
+        ValueError: If `data` is not valid JSON
+
+    Returns:
+        bytes: UTF-8 encoded GeoJSON document
+    """
+    return jsonio.dumps(arcgis_to_geojson(jsonio.loads(data), id_attribute, **{"copy": False, **options}))
+
+
+def arcgis_to_geojson_iter(
+    source: BinaryIO | TextIO | bytes, id_attribute: str = None, chunk_size: int = 1 << 16, **options
+) -> Iterator[dict]:
+    """Incrementally converts the features of an Esri JSON FeatureSet read from a file object or byte string into
+    GeoJSON Features. Only one feature is parsed and held in memory at a time, so arbitrarily large FeatureSets can be
+    converted with flat memory use. Each yielded Feature is identical to the corresponding item of
+    `arcgis_to_geojson(featureset)["features"]`.
+
+    Args:
+        source (BinaryIO | TextIO | bytes): File object (binary or text) or bytes containing an Esri JSON FeatureSet
+        id_attribute (str, optional): Name of ID attribute (default: None)
+        chunk_size (int, optional): Number of bytes to read from `source` at a time. Defaults to 64 KiB.
+        **options: Additional keyword arguments passed to `arcgis_to_geojson`
+
+    Raises:
+        JSONScanError: If `source` is not a JSON object or is malformed/truncated
+        ValueError: If a feature is not a JSON object, or if the FeatureSet's `transform` (or, with `reproject`, its
+            `spatialReference`) follows its features, so it can't be applied while streaming
 
+    Yields:
+        dict: GeoJSON Feature objects
+    """
+    where = options.get("where")
+    for raw in iter_raw_features(JSONScanner(source, chunk_size).iter_members("features"), options):
+        feature = load_feature(raw)
+        if where is None or matches_where(feature, where, "attributes"):
+            yield arcgis_to_geojson(feature, id_attribute, **options)
+
+
+def _geometry_to_geojson(
+    arcgis: dict,
+    geometry_type: str,
+    packed: bool,
+    copy: bool,
+    transform: dict,
+    precision: int,
+    project: bool,
+    simplify: float,
+) -> dict:
+    """Convert the geometry members of an Esri JSON object to a GeoJSON geometry, or return an empty dict if it has
+    none. An object of a declared geometry type is converted by that type's converter alone, unless it has none of the
+    type's members or also has the members of a type probed after it (see `_GEOMETRY_MEMBERS`)."""
+    copy_coordinates = copy and precision is None and simplify is None  # These build new coordinate lists
+    if transform:
+        arcgis = dequantize_geometry(arcgis, transform)
+    if project and (projected := web_mercator_to_wgs84_geometry(arcgis)) is not arcgis:
+        arcgis = projected
+        copy_coordinates = False  # Reprojecting builds new coordinate lists
+
+    geojson = None
+    if declared := _GEOMETRY_CONVERTERS.get(geometry_type):
+        convert_geometry, later_members = declared
+        if not any(member in arcgis for member in later_members):
+            geojson = convert_geometry(arcgis, precision, simplify, copy_coordinates)
+    if geojson is None:
+        geojson = {}
+        for member, convert_geometry in _GEOMETRY_MEMBERS:
+            if member in arcgis and (converted := convert_geometry(arcgis, precision, simplify, copy_coordinates)):
+                geojson.update(converted)
+
+    if packed and geojson.get("type") in _PACKABLE_TYPES:
+        geojson["coordinates"] = PackedCoordinates.from_coordinates(geojson["coordinates"])
     return geojson
 
 
+def _point_to_geojson(arcgis: dict, precision: int, _simplify: float, _copy_coordinates: bool) -> dict | None:
+    """Convert the `x`, `y` and `z` of an Esri JSON object to a GeoJSON Point, or return None if it has none"""
+    if not (_is_number(x := arcgis.get("x")) and _is_number(y := arcgis.get("y"))):
+        return None
+    coordinates = [x, y] if precision is None else round_point([x, y], precision)
+    if (z := arcgis.get("z")) and _is_number(z):
+        coordinates.append(z)
+    return {"type": "Point", "coordinates": coordinates}
+
+
+def _multipoint_to_geojson(arcgis: dict, precision: int, _simplify: float, copy_coordinates: bool) -> dict | None:
+    """Convert the `points` of an Esri JSON object to a GeoJSON MultiPoint, or return None if it has none"""
+    if not (points := arcgis.get("points")):
+        return None
+    if precision is None:
+        return {"type": "MultiPoint", "coordinates": _coordinates(points, copy_coordinates)}
+    return {"type": "MultiPoint", "coordinates": [round_point(point, precision) for point in unpack(points)]}
+
+
+def _polyline_to_geojson(arcgis: dict, precision: int, simplify: float, copy_coordinates: bool) -> dict | None:
+    """Convert the `paths` of an Esri JSON object to a GeoJSON LineString or MultiLineString, or return None if it has
+    none"""
+    if not (paths := arcgis.get("paths")):
+        return None
+    if simplify is not None:
+        paths = [simplify_path(path, simplify) for path in unpack(paths)]
+    if precision is not None:
+        paths = [round_path(path, precision) for path in unpack(paths)]
+    if len(paths) == 1:
+        return {"type": "LineString", "coordinates": _coordinates(unpack(paths)[0], copy_coordinates)}
+    return {"type": "MultiLineString", "coordinates": _coordinates(paths, copy_coordinates)}
+
+
+def _polygon_to_geojson(arcgis: dict, precision: int, simplify: float, _copy_coordinates: bool) -> dict | None:
+    """Convert the `rings` of an Esri JSON object to a GeoJSON Polygon or MultiPolygon, or return None if it has none"""
+    if not (rings := arcgis.get("rings")):
+        return None
+    if simplify is not None:
+        rings = [simplify_path(ring, simplify) for ring in unpack(rings)]
+    if precision is not None:
+        rings = [round_path(ring, precision) for ring in unpack(rings)]
+    return _convert_rings_to_geojson(unpack(rings))
+
+
+def _envelope_to_geojson(arcgis: dict, precision: int, _simplify: float, _copy_coordinates: bool) -> dict | None:
+    """Convert the bounds of an Esri JSON envelope to a GeoJSON Polygon, or return None if it has none"""
+    if not (
+        (xmin := arcgis.get("xmin"))
+        and (ymin := arcgis.get("ymin"))
+        and (xmax := arcgis.get("xmax"))
+        and (ymax := arcgis.get("ymax"))
+    ):
+        return None
+    if not all(_is_number(v) for v in [xmin, ymin, xmax, ymax]):
+        return None
+    if precision is not None:
+        xmin, ymin, xmax, ymax = (round(v, precision) for v in (xmin, ymin, xmax, ymax))
+    return {
+        "type": "Polygon",
+        "coordinates": [
+            [
+                [xmax, ymax],
+                [xmin, ymax],
+                [xmin, ymin],
+                [xmax, ymin],
+                [xmax, ymax],
+            ]
+        ],
+    }
+
+
+# Member of each Esri JSON geometry type an object is probed for by `arcgis_to_geojson`, in order (an object with the
+# members of several types gets the type of the last one), and the converter of the type's members
+_GEOMETRY_MEMBERS = (
+    ("x", _point_to_geojson),
+    ("points", _multipoint_to_geojson),
+    ("paths", _polyline_to_geojson),
+    ("rings", _polygon_to_geojson),
+    ("xmin", _envelope_to_geojson),
+)
+
+_GEOMETRY_MEMBER_NAMES = frozenset(member for member, _ in _GEOMETRY_MEMBERS)
+
+# Converter of each geometry type a FeatureSet can declare (its `geometryType`), and the members of the types probed
+# after it, which take precedence over it when a geometry has them too
+_GEOMETRY_CONVERTERS = {
+    "esriGeometryPoint": (_point_to_geojson, ("points", "paths", "rings", "xmin")),
+    "esriGeometryMultipoint": (_multipoint_to_geojson, ("paths", "rings", "xmin")),
+    "esriGeometryPolyline": (_polyline_to_geojson, ("rings", "xmin")),
+    "esriGeometryPolygon": (_polygon_to_geojson, ("xmin",)),
+    "esriGeometryEnvelope": (_envelope_to_geojson, ()),
+}
+
+
 def _coordinates_contain_coordinates(outer: LineStringCoords, inner: LineStringCoords) -> bool:
     """Check if `outer` coordinates contain `inner` coordinates
 
@@ -114,10 +413,11 @@ def _convert_rings_to_geojson(rings: MultiLineStringCoords) -> dict:
     Returns:
         dict: GeoJSON Polygon or MultiPolygon object
     """
+    stats = current_stats()
     outer_rings = []
     holes = []
     for ring in rings:
-        ring = close_ring(ring[:])
+        ring = close_ring(ring)  # Never modified in place; outer rings and holes are both reversed into new lists
         if len(ring) < 4:
             continue
         if ring_is_clockwise(ring):
@@ -126,32 +426,45 @@ def _convert_rings_to_geojson(rings: MultiLineStringCoords) -> dict:
         else:
             holes.append(ring[::-1])  # wind inner rings clockwise for RFC 7946 compliance
 
+    # Index outer ring bounding boxes so each hole is only tested against outer rings that could contain/intersect it
+    index = BBoxIndex()
+    for i, polygon in enumerate(outer_rings):
+        index.insert(i, coordinates_bbox(polygon[0]))
+
     # Loop over all outer rings and see if they contain our hole
     uncontained_holes = []
     while len(holes):
         hole = holes.pop()
+        hole_bbox = coordinates_bbox(hole)
         contained = False
-        for i in range(len(outer_rings) - 1, -1, -1):
+        for i in index.containing(hole_bbox):
             outer_ring = outer_rings[i][0]
             if _coordinates_contain_coordinates(outer_ring, hole):
                 outer_rings[i].append(hole)
                 contained = True
+                if stats is not None:
+                    stats.count("holes_contained")
                 break
         if not contained:
-            uncontained_holes.append(hole)
+            uncontained_holes.append((hole, hole_bbox))
 
     # If any holes weren't matched using contains, try intersects
     while len(uncontained_holes):
-        hole = uncontained_holes.pop()
+        hole, hole_bbox = uncontained_holes.pop()
         intersects = False
-        for i in range(len(outer_rings) - 1, -1, -1):
+        for i in index.intersecting(hole_bbox):
             outer_ring = outer_rings[i][0]
             if array_intersects_array(outer_ring, hole):
                 outer_rings[i].append(hole)
                 intersects = True
+                if stats is not None:
+                    stats.count("holes_intersected")
                 break
         if not intersects:
+            index.insert(len(outer_rings), hole_bbox)
             outer_rings.append([hole[::-1]])
+            if stats is not None:
+                stats.count("holes_promoted")
 
     if len(outer_rings) == 1:
         return {"type": "Polygon", "coordinates": outer_rings[0]}
@@ -159,6 +472,21 @@ def _convert_rings_to_geojson(rings: MultiLineStringCoords) -> dict:
         return {"type": "MultiPolygon", "coordinates": outer_rings}
 
 
+def _coordinates(coordinates, copy: bool):
+    """Unpack PackedCoordinates, or return a shallow copy of (or, if `copy` is False, the same) nested coordinate list
+
+    Args:
+        coordinates: PackedCoordinates or nested coordinate lists
+        copy (bool): Whether nested coordinate lists should be copied
+
+    Returns:
+        Nested coordinate lists
+    """
+    if isinstance(coordinates, PackedCoordinates):
+        return coordinates.to_coordinates()
+    return coordinates[:] if copy else coordinates
+
+
 def _get_id(attributes: dict, id_attribute: str = None) -> str | int | float:
     """Get the ID value from a dictionary of attributes
 
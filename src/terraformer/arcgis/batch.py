@@ -0,0 +1,116 @@
+"""Split converted Esri JSON features into batches that fit the record count and request size limits of feature
+service edits (e.g. the `adds` of `applyEdits`), using size estimates instead of serializing features to measure them"""
+
+from collections.abc import Iterable, Iterator
+
+from terraformer.packed import PackedCoordinates
+
+# Longest repr of a float, e.g. -1.2345678901234567e-100
+FLOAT_BYTES = 24
+
+_COORDINATE_KEYS = ("points", "paths", "rings")
+
+
+def estimate_feature_size(feature: dict, coordinate_bytes: int = FLOAT_BYTES) -> int:
+    """Estimate the size of an Esri JSON feature (or geometry) serialized as compact UTF-8 JSON, as produced by
+    `terraformer.jsonio.dumps`. Coordinate arrays are estimated from their vertex counts and dimensions, without
+    visiting each vertex, and other values from their types and lengths.
+
+    With the default `coordinate_bytes`, the estimate is an upper bound, except for strings containing characters
+    that JSON escapes (quotes, backslashes and control characters), which are counted as one byte each.
+
+    Args:
+        feature (dict): Esri JSON feature or geometry. Coordinates may be nested lists or PackedCoordinates.
+        coordinate_bytes (int, optional): Bytes assumed per coordinate value. Defaults to 24, the longest float repr.
+            Coordinates rounded with `precision` or quantized with a `transform` are shorter, so a smaller value
+            (e.g. the number of integer digits plus `precision` plus 2) packs batches fuller.
+
+    Returns:
+        int: Estimated number of bytes
+    """
+    return _value_size(feature, coordinate_bytes)
+
+
+def batch_features(
+    features: Iterable[dict], max_features: int = 1000, max_bytes: int = 8 << 20, coordinate_bytes: int = FLOAT_BYTES
+) -> Iterator[list[dict]]:
+    """Lazily group Esri JSON features (e.g. from `geojson_to_arcgis_iter(...)`) into batches of at most
+    `max_features` features whose estimated size as a JSON array (see `estimate_feature_size`) is at most `max_bytes`.
+    Features are sized as they arrive from the conversion, so each one is only serialized once, when its batch is sent.
+
+    A feature estimated to be larger than `max_bytes` on its own is yielded as a batch of one.
+
+    Args:
+        features (Iterable[dict]): Esri JSON features
+        max_features (int, optional): Maximum number of features per batch. Defaults to 1000.
+        max_bytes (int, optional): Maximum estimated size of each batch's JSON array, in bytes. Defaults to 8 MiB.
+        coordinate_bytes (int, optional): Bytes assumed per coordinate value, see `estimate_feature_size`. Defaults
+            to 24.
+
+    Raises:
+        ValueError: If `max_features` or `max_bytes` is less than 1
+
+    Yields:
+        list[dict]: Batches of features, in input order
+    """
+    if max_features < 1 or max_bytes < 1:
+        raise ValueError("max_features and max_bytes must be at least 1")
+    batch = []
+    size = 2  # Array brackets
+    for feature in features:
+        feature_size = _value_size(feature, coordinate_bytes)
+        if batch and (len(batch) >= max_features or size + 1 + feature_size > max_bytes):
+            yield batch
+            batch = []
+            size = 2
+        size += feature_size + 1 if batch else feature_size  # Plus a separating comma
+        batch.append(feature)
+    if batch:
+        yield batch
+
+
+def _value_size(value, coordinate_bytes: int) -> int:
+    """Estimate the serialized size of a JSON value, see `estimate_feature_size`"""
+    value_type = type(value)  # Exact type checks first, since this runs for every attribute of every feature
+    if value_type is float:
+        return FLOAT_BYTES
+    if value_type is str:
+        return (len(value) if value.isascii() else len(value.encode("utf-8"))) + 2
+    if value_type is int:
+        return len(str(value))
+    if value is None or value is True:
+        return 4
+    if value is False:
+        return 5
+    if isinstance(value, dict):
+        size = 1 + len(value) if value else 2  # Braces and separating commas
+        for key, item in value.items():
+            size += len(key) + 3 if key.isascii() else len(key.encode("utf-8")) + 3
+            if key in _COORDINATE_KEYS and isinstance(item, (list, PackedCoordinates)):
+                size += _coordinates_size(item, coordinate_bytes)
+            else:
+                size += _value_size(item, coordinate_bytes)
+        return size
+    if isinstance(value, (list, tuple)):
+        return (1 + len(value) if value else 2) + sum(_value_size(item, coordinate_bytes) for item in value)
+    if isinstance(value, str):
+        return len(value.encode("utf-8")) + 2
+    if isinstance(value, float):
+        return FLOAT_BYTES
+    return len(str(value))
+
+
+def _coordinates_size(coordinates: list | PackedCoordinates, coordinate_bytes: int) -> int:
+    """Estimate the serialized size of an array of vertices (depth 2) or of paths or rings (depth 3) from vertex
+    counts and dimensions"""
+    if isinstance(coordinates, PackedCoordinates):
+        vertex_size = coordinates.dims * (coordinate_bytes + 1) + 1  # Values, commas and brackets
+        if coordinates.ring_offsets is None:
+            return 1 + coordinates.vertex_count * (vertex_size + 1)
+        return 1 + len(coordinates) * 2 + coordinates.vertex_count * (vertex_size + 1)
+    if not coordinates:
+        return 2
+    if coordinates[0] and isinstance(coordinates[0][0], (list, tuple)):
+        return 1 + len(coordinates) + sum(_coordinates_size(path, coordinate_bytes) for path in coordinates)
+    dims = max(len(coordinates[0]), len(coordinates[-1]))
+    return 1 + len(coordinates) * (dims * (coordinate_bytes + 1) + 2)
@@ -1,4 +1,17 @@
-from .helpers import flatten_multipolygon_rings, orient_rings
+from collections.abc import Callable, Iterable, Iterator
+from functools import partial
+from time import perf_counter
+from typing import BinaryIO, TextIO
+
+from terraformer import jsonio
+from terraformer.cache import GeometryCache
+from terraformer.common import round_path, round_point, simplify_path
+from terraformer.packed import PackedCoordinates, unpack
+from terraformer.projection import is_web_mercator, wgs84_to_web_mercator_path, wgs84_to_web_mercator_point
+from terraformer.stats import current_stats
+from ._stream import iter_geojson_texts
+from .helpers import flatten_multipolygon_rings, matches_where, orient_rings
+from .quantization import quantize_geometry
 
 
 class GeoJSONError(Exception):
@@ -6,17 +19,58 @@ class GeoJSONError(Exception):
     pass
 
 
-def geojson_to_arcgis(geojson: dict, id_attribute: str = "OBJECTID", wkid: int = 4326) -> dict | list:
+def geojson_to_arcgis(
+    geojson: dict,
+    id_attribute: str = "OBJECTID",
+    wkid: int = 4326,
+    packed: bool = False,
+    copy: bool = True,
+    transform: dict = None,
+    cache: GeometryCache = None,
+    precision: int = None,
+    reproject: bool = False,
+    simplify: float = None,
+    fields: list[str] = None,
+    where: Callable[[dict], bool] = None,
+) -> dict | list:
     """Recursively converts a GeoJSON object to an Esri JSON object
 
     Args:
-        geojson (dict): Input GeoJSON object
+        geojson (dict): Input GeoJSON object. Geometry `coordinates` may be nested lists or PackedCoordinates.
         id_attribute (str, optional): Name of output ID attribute. Defaults to "OBJECTID".
         wkid (int, optional): WKID of the GeoJSON's spatial reference. Defaults to 4326 (WGS 84).
+        packed (bool, optional): Emit `points`, `paths` and `rings` as PackedCoordinates instead of nested lists.
+            With a `transform`, quantized coordinates are packed as integers (`array('q')`), and 3D/measured ones,
+            whose z/m values stay floats, are left as nested lists. Defaults to False.
+        copy (bool, optional): Copy coordinate arrays and properties into the output. If False, the output shares
+            every container the conversion doesn't need to change (e.g. paths, correctly oriented rings and properties)
+            with the input, so neither should be modified afterwards. Defaults to True.
+        transform (dict, optional): Esri JSON transform (see `quantization_transform`) to emit quantized,
+            delta-encoded coordinates with. The transform must be sent along with the output (e.g. as the FeatureSet's
+            `transform`) for it to be decoded. Defaults to None (real coordinates).
+        cache (GeometryCache, optional): Cache of converted geometries, for inputs that repeat geometries. Defaults
+            to None (no caching).
+        precision (int, optional): Round x and y coordinates to this many decimal places as they're converted,
+            dropping vertices that become identical to the previous one and rings that collapse (6 decimal places of
+            a degree is about 10 cm). Defaults to None (coordinates are kept as is). With `reproject`, precision
+            applies to the reprojected coordinates.
+        reproject (bool, optional): If `wkid` is Web Mercator (3857, 102100, 102113 or 900913), reproject the GeoJSON's
+            WGS 84 coordinates to it as they're converted. Defaults to False, in which case coordinates are assumed
+            to already be in `wkid`.
+        simplify (float, optional): Simplify paths and rings with the Douglas-Peucker algorithm as they're converted,
+            dropping vertices closer than this tolerance (in output coordinate units) to the simplified line, and
+            rings that collapse. Applied before `precision`. Defaults to None (no simplification).
+        fields (list[str], optional): Names of the properties to keep in features' attributes, in this order. Other
+            properties are never copied. The feature `id` is still added as `id_attribute`. Defaults to None (all
+            properties).
+        where (Callable[[dict], bool], optional): Predicate called with the properties of each Feature of a
+            FeatureCollection (or an empty dict) before anything else is converted. Features for which it returns
+            False are left out. Defaults to None (all features).
 
     Raises:
         GeoJSONError: If the GeoJSON object is invalid in some way. GeoJSON spec:
             <https://datatracker.ietf.org/doc/html/rfc7946>
+        ValueError: If `precision` or `simplify` is negative
 
     Returns:
         dict | list: An Esri JSON object (or list of objects if input is a FeatureCollection or GeometryCollection)
@@ -35,12 +89,50 @@ def geojson_to_arcgis(geojson: dict, id_attribute: str = "OBJECTID", wkid: int =
         "MultiPolygon",
     )
 
+    if cache is not None and is_geometry_object:
+        return cache.get_or_convert(
+            ("geojson_to_arcgis", geojson, wkid, packed, transform, precision, reproject, simplify),
+            partial(
+                geojson_to_arcgis,
+                geojson,
+                id_attribute,
+                wkid,
+                packed,
+                copy,
+                transform,
+                precision=precision,
+                reproject=reproject,
+                simplify=simplify,
+            ),
+            copy,
+        )
+
     if is_geometry_object:
         result["spatialReference"] = {"wkid": wkid}
         if not (coordinates := geojson.get("coordinates")):
             raise GeoJSONError(f"Missing/empty 'coordinates' property on {geojson_object_type} object")
-        if not isinstance(coordinates, list):
+        if not isinstance(coordinates, (list, PackedCoordinates)):
             raise GeoJSONError(f"Invalid 'coordinates' property: {coordinates}")
+        coordinates = unpack(coordinates)
+        if reproject and is_web_mercator(wkid):
+            coordinates = _map_coordinates(
+                geojson_object_type, coordinates, wgs84_to_web_mercator_point, wgs84_to_web_mercator_path
+            )
+            copy = False  # Reprojecting builds new coordinate lists
+        if simplify is not None and geojson_object_type not in ("Point", "MultiPoint"):
+            coordinates = _map_coordinates(
+                geojson_object_type, coordinates, None, partial(simplify_path, tolerance=simplify)
+            )
+            copy = False  # Simplifying builds new coordinate lists
+        if precision is not None:
+            coordinates = _map_coordinates(
+                geojson_object_type,
+                coordinates,
+                partial(round_point, precision=precision),
+                partial(_round_points if geojson_object_type == "MultiPoint" else round_path, precision=precision),
+            )
+        if transform is not None or precision is not None:
+            copy = False  # Rounding and quantizing build new coordinate lists anyway
 
     if geojson_object_type == "Point":
         result["x"] = coordinates[0]
@@ -49,7 +141,7 @@ def geojson_to_arcgis(geojson: dict, id_attribute: str = "OBJECTID", wkid: int =
             result["z"] = coordinates[2]
 
     elif geojson_object_type == "MultiPoint":
-        result["points"] = coordinates[:]
+        result["points"] = coordinates[:] if copy else coordinates
         try:
             if coordinates[0][2] is not None:
                 result["hasZ"] = True
@@ -57,7 +149,7 @@ def geojson_to_arcgis(geojson: dict, id_attribute: str = "OBJECTID", wkid: int =
             pass
 
     elif geojson_object_type == "LineString":
-        result["paths"] = [coordinates[:]]
+        result["paths"] = [coordinates[:] if copy else coordinates]
         try:
             if coordinates[0][2] is not None:
                 result["hasZ"] = True
@@ -65,7 +157,7 @@ def geojson_to_arcgis(geojson: dict, id_attribute: str = "OBJECTID", wkid: int =
             pass
 
     elif geojson_object_type == "MultiLineString":
-        result["paths"] = coordinates[:]
+        result["paths"] = coordinates[:] if copy else coordinates
         try:
             if coordinates[0][0][2] is not None:
                 result["hasZ"] = True
@@ -73,7 +165,7 @@ def geojson_to_arcgis(geojson: dict, id_attribute: str = "OBJECTID", wkid: int =
             pass
 
     elif geojson_object_type == "Polygon":
-        result["rings"] = orient_rings(coordinates[:])
+        result["rings"] = orient_rings(coordinates, copy)
         try:
             if coordinates[0][0][2] is not None:
                 result["hasZ"] = True
@@ -81,7 +173,7 @@ def geojson_to_arcgis(geojson: dict, id_attribute: str = "OBJECTID", wkid: int =
             pass
 
     elif geojson_object_type == "MultiPolygon":
-        result["rings"] = flatten_multipolygon_rings(coordinates[:])
+        result["rings"] = flatten_multipolygon_rings(coordinates, copy)
         try:
             if coordinates[0][0][0][2] is not None:
                 result["hasZ"] = True
@@ -97,26 +189,166 @@ def geojson_to_arcgis(geojson: dict, id_attribute: str = "OBJECTID", wkid: int =
             properties = geojson["properties"]
         except KeyError as e:
             raise GeoJSONError("Missing 'properties' property on Feature object") from e
+        start = perf_counter() if (stats := current_stats()) is not None else None
         if geometry:
-            result["geometry"] = geojson_to_arcgis(geometry, id_attribute, wkid)
-        if properties:
-            result["attributes"] = properties.copy()
-        if id_val := geojson.get("id"):
+            result["geometry"] = geojson_to_arcgis(
+                geometry, id_attribute, wkid, packed, copy, transform, cache, precision, reproject, simplify
+            )
+        id_val = geojson.get("id")
+        if properties and fields is not None:
+            result["attributes"] = {name: properties[name] for name in fields if name in properties}
+        elif properties:
+            # Properties are only shared when adding the ID wouldn't modify them
+            if copy or (id_val and properties.get(id_attribute) != id_val):
+                properties = properties.copy()
+            result["attributes"] = properties
+        if id_val:
             if "attributes" not in result:
                 result["attributes"] = {}
             result["attributes"][id_attribute] = id_val
+        if stats is not None:
+            stats.record_feature("geojson_to_arcgis", id_val, perf_counter() - start)
 
     elif geojson_object_type == "FeatureCollection":
         if not (features := geojson.get("features")):
             raise GeoJSONError("Missing/empty 'features' property on FeatureCollection object")
-        result = [geojson_to_arcgis(feature, id_attribute, wkid) for feature in features]
+        result = list(
+            geojson_to_arcgis_iter(
+                features,
+                id_attribute,
+                wkid,
+                packed=packed,
+                copy=copy,
+                transform=transform,
+                cache=cache,
+                precision=precision,
+                reproject=reproject,
+                simplify=simplify,
+                fields=fields,
+                where=where,
+            )
+        )
 
     elif geojson_object_type == "GeometryCollection":
         if not (geometries := geojson.get("geometries")):
             raise GeoJSONError("Missing/empty 'geometries' property on GeometryCollection object")
-        result = [geojson_to_arcgis(geometry, id_attribute, wkid) for geometry in geometries]
+        result = [
+            geojson_to_arcgis(
+                geometry, id_attribute, wkid, packed, copy, transform, cache, precision, reproject, simplify, fields
+            )
+            for geometry in geometries
+        ]
 
     else:
         raise GeoJSONError(f"Invalid 'type' property: {geojson_object_type}")
 
+    if transform is not None and is_geometry_object:
+        result = quantize_geometry(result, transform)
+
+    if packed and is_geometry_object:
+        typecode = "d" if transform is None else "q"
+        for key in ("points", "paths", "rings"):
+            if result.get(key):
+                try:
+                    result[key] = PackedCoordinates.from_coordinates(result[key], typecode)
+                except TypeError:
+                    pass  # Quantized x/y with float z/m values
+
     return result
+
+
+def geojson_to_arcgis_bytes(data: bytes | str, id_attribute: str = "OBJECTID", wkid: int = 4326, **options) -> bytes:
+    """Converts a raw GeoJSON document into a raw Esri JSON document. The document is parsed and the result
+    serialized with the fastest installed JSON backend (see `terraformer.jsonio`), and since the parsed input is
+    private to this call, it's converted without copying (`copy=False`).
+
+    Args:
+        data (bytes | str): GeoJSON document
+        id_attribute (str, optional): Name of output ID attribute. Defaults to "OBJECTID".
+        wkid (int, optional): WKID of the GeoJSON's spatial reference. Defaults to 4326 (WGS 84).
+        **options: Additional keyword arguments passed to `geojson_to_arcgis`
+
+    Raises:
+        GeoJSONError: If `data` is not valid JSON or the GeoJSON object is invalid in some way
+
+    Returns:
+        bytes: UTF-8 encoded Esri JSON document (an array if the input is a FeatureCollection or GeometryCollection)
+    """
+    geojson = _parse_geojson_text(data)
+    return jsonio.dumps(geojson_to_arcgis(geojson, id_attribute, wkid, **{"copy": False, **options}))
+
+
+def geojson_to_arcgis_iter(
+    source: dict | Iterable[dict] | BinaryIO | TextIO, id_attribute: str = "OBJECTID", wkid: int = 4326, **options
+) -> Iterator[dict]:
+    """Lazily converts GeoJSON Features to Esri JSON features, one at a time
+
+    Args:
+        source (dict | Iterable[dict] | BinaryIO | TextIO): A GeoJSON FeatureCollection object, an iterable of GeoJSON
+            Feature objects, or a file object containing a GeoJSON Text Sequence (RFC 8142) or newline-delimited GeoJSON
+        id_attribute (str, optional): Name of output ID attribute. Defaults to "OBJECTID".
+        wkid (int, optional): WKID of the GeoJSON's spatial reference. Defaults to 4326 (WGS 84).
+        **options: Additional keyword arguments passed to `geojson_to_arcgis`
+
+    Raises:
+        GeoJSONError: If `source` or any of its features is invalid in some way
+
+    Yields:
+        dict: Esri JSON feature objects
+    """
+    if isinstance(source, dict):
+        if source.get("type") != "FeatureCollection":
+            raise GeoJSONError(f"Expected a FeatureCollection object, got {source.get('type')!r}")
+        if not (source := source.get("features")):
+            raise GeoJSONError("Missing/empty 'features' property on FeatureCollection object")
+    elif hasattr(source, "read"):
+        source = map(_parse_geojson_text, iter_geojson_texts(source))
+    where = options.get("where")
+    for feature in source:
+        if where is None or matches_where(feature, where, "properties"):
+            yield geojson_to_arcgis(feature, id_attribute, wkid, **options)
+
+
+def _round_points(points: list, precision: int) -> list:
+    """Round each point of a MultiPoint, keeping duplicates (see `round_point`)"""
+    return [round_point(point, precision) for point in points]
+
+
+def _map_coordinates(geometry_type: str, coordinates: list, point_func: Callable, path_func: Callable) -> list:
+    """Apply a point function or path function to the coordinates of a GeoJSON geometry
+
+    Args:
+        geometry_type (str): GeoJSON geometry type
+        coordinates (list): Geometry coordinates
+        point_func (Callable): Function returning a new point, applied to Point coordinates
+        path_func (Callable): Function returning a new array of coordinates, applied to the coordinates of any other
+            geometry type, and to each of their paths or rings
+
+    Returns:
+        list: New coordinates
+    """
+    if geometry_type == "Point":
+        return point_func(coordinates)
+    if geometry_type in ("MultiPoint", "LineString"):
+        return path_func(coordinates)
+    if geometry_type in ("MultiLineString", "Polygon"):
+        return [path_func(path) for path in coordinates]
+    return [[path_func(ring) for ring in polygon] for polygon in coordinates]
+
+
+def _parse_geojson_text(text: str | bytes) -> dict:
+    """Parse a raw GeoJSON text
+
+    Args:
+        text (str | bytes): Raw GeoJSON text
+
+    Raises:
+        GeoJSONError: If `text` is not valid JSON
+
+    Returns:
+        dict: Parsed GeoJSON object
+    """
+    try:
+        return jsonio.loads(text)
+    except ValueError as e:
+        raise GeoJSONError(f"Invalid GeoJSON text: {text[:80]!r}") from e
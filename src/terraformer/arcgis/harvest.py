@@ -0,0 +1,233 @@
+"""Harvest every feature of an ArcGIS feature layer as GeoJSON with concurrent, paged REST API queries"""
+
+import http.client
+import ssl
+import threading
+from collections.abc import Iterator
+from concurrent.futures import ThreadPoolExecutor
+from functools import partial
+from urllib.parse import parse_qsl, urlencode, urlsplit, urlunsplit
+
+from terraformer import jsonio
+from ._stream import map_chunks
+from .arcgis import arcgis_to_geojson
+
+DEFAULT_PAGE_SIZE = 1000
+_STRATEGIES = ("ids", "offset")
+
+
+class HarvestError(Exception):
+    # Custom exception for failed requests and ArcGIS REST API error responses
+    pass
+
+
+def harvest_layer(
+    url: str,
+    where_clause: str = "1=1",
+    out_fields: str = "*",
+    page_size: int = None,
+    max_workers: int = 4,
+    strategy: str = "ids",
+    id_attribute: str = None,
+    params: dict = None,
+    timeout: float = 60.0,
+    **options,
+) -> Iterator[dict]:
+    """Query every feature of an ArcGIS feature layer (e.g. `https://host/arcgis/rest/services/Name/FeatureServer/0`)
+    and convert them to GeoJSON Features, yielded in object ID order as pages arrive.
+
+    Pages are planned up front, either from the object IDs matching `where_clause` (strategy "ids", which is robust to
+    edits during harvesting) or from the matching feature count (strategy "offset", which pages with `resultOffset`
+    for services that can't return IDs), and fetched concurrently by `max_workers` threads. Each thread keeps a
+    persistent HTTP connection per host. If the server returns fewer features than a page asked for
+    (`exceededTransferLimit`), the rest of the page is fetched before it's yielded.
+
+    Args:
+        url (str): Layer URL. Parameters in its query string (e.g. `token`) are sent with every request.
+        where_clause (str, optional): SQL where clause selecting features on the server. Defaults to "1=1" (all
+            features).
+        out_fields (str, optional): Comma-separated fields to return. The object ID field, which pages are tracked
+            by, is always added. Defaults to "*" (all fields).
+        page_size (int, optional): Features per page. Defaults to the layer's maxRecordCount, or 1000.
+        max_workers (int, optional): Number of pages fetched concurrently. Defaults to 4.
+        strategy (str, optional): Page planning strategy, "ids" or "offset". Defaults to "ids".
+        id_attribute (str, optional): Name of ID attribute (default: None)
+        params (dict, optional): Extra query parameters sent with every request (e.g. `token`, `outSR`), overriding
+            those in the URL's query string
+        timeout (float, optional): Socket timeout per request, in seconds. Defaults to 60.
+        **options: Additional keyword arguments passed to `arcgis_to_geojson` (e.g. a `where` predicate, applied to
+            the features the server returns)
+
+    Raises:
+        HarvestError: If a request fails or the server responds with an error
+        ValueError: If `strategy` is not recognized
+
+    Yields:
+        dict: GeoJSON Feature objects
+    """
+    if strategy not in _STRATEGIES:
+        raise ValueError(f"Unknown harvest strategy: {strategy}")
+    split = urlsplit(url)
+    url = urlunsplit(split._replace(query="", fragment="")).rstrip("/")
+    client = _Client(timeout)
+    try:
+        base = {**dict(parse_qsl(split.query)), **(params or {}), "f": "json"}
+        query = {"outSR": 4326, **base, "where": where_clause, "outFields": out_fields}
+        pages = _plan_pages(client, url, base, query, page_size, strategy)
+        fetch = partial(_fetch_page, client, url, query, id_attribute, options)
+        with ThreadPoolExecutor(max_workers) as executor:
+            yield from map_chunks(executor, fetch, pages, max_workers * 2)
+    finally:
+        client.close()
+
+
+def _plan_pages(client: "_Client", url: str, base: dict, query: dict, page_size: int, strategy: str) -> list[dict]:
+    """Plan the page queries needed to fetch every matching feature
+
+    Args:
+        client (_Client): HTTP client
+        url (str): Layer URL
+        base (dict): Parameters sent with every request
+        query (dict): Query parameters
+        page_size (int): Features per page, or None to use the layer's maxRecordCount
+        strategy (str): "ids" or "offset"
+
+    Returns:
+        list[dict]: Query parameters of each page
+    """
+    layer = None
+    if page_size is None or strategy == "offset":
+        layer = client.request(url, base)
+        page_size = page_size or layer.get("maxRecordCount") or DEFAULT_PAGE_SIZE
+
+    if strategy == "ids":
+        response = client.request(f"{url}/query", {**query, "returnIdsOnly": "true"})
+        ids = sorted(response.get("objectIds") or [])
+        oid_field = response.get("objectIdFieldName")
+        order = {}
+        if oid_field:
+            order = {"orderByFields": oid_field, "outFields": _with_field(query["outFields"], oid_field)}
+        return [{**order, "objectIds": ids[i : i + page_size]} for i in range(0, len(ids), page_size)]
+
+    count = client.request(f"{url}/query", {**query, "returnCountOnly": "true"}).get("count", 0)
+    oid_field = layer.get("objectIdField") or next(
+        (field["name"] for field in layer.get("fields") or [] if field.get("type") == "esriFieldTypeOID"), None
+    )
+    if not oid_field:
+        raise HarvestError(f"Layer {url} has no object ID field to order pages by")
+    order = {"orderByFields": oid_field, "outFields": _with_field(query["outFields"], oid_field)}
+    return [
+        {**order, "resultOffset": offset, "resultRecordCount": min(page_size, count - offset)}
+        for offset in range(0, count, page_size)
+    ]
+
+
+def _with_field(out_fields: str, field: str) -> str:
+    """Add a field to a comma-separated outFields list, unless it's already included (field names are
+    case-insensitive)"""
+    fields = {name.strip().lower() for name in out_fields.split(",")}
+    return out_fields if "*" in fields or field.lower() in fields else f"{out_fields},{field}"
+
+
+def _fetch_page(client: "_Client", url: str, query: dict, id_attribute: str, options: dict, page: dict) -> list[dict]:
+    """Fetch all features of a page, following up on truncated responses, and convert them to GeoJSON Features"""
+    page = page.copy()
+    expected = len(page["objectIds"]) if "objectIds" in page else page["resultRecordCount"]
+    features = []
+    while True:
+        params = {**query, **page}
+        if "objectIds" in params:
+            params["objectIds"] = ",".join(str(oid) for oid in params["objectIds"])
+        response = client.request(f"{url}/query", params)
+        batch = response.get("features") or []
+        features.extend(batch)
+        if not batch or len(features) >= expected or not response.get("exceededTransferLimit"):
+            break
+        # The server capped the page below its size; ask for the rest of it
+        if "objectIds" in page:
+            oid_field = response.get("objectIdFieldName") or page.get("orderByFields")
+            returned = {(feature.get("attributes") or {}).get(oid_field) for feature in batch}
+            if None in returned:
+                raise HarvestError(f"Truncated response from {url}/query has features without an object ID")
+            page["objectIds"] = [oid for oid in page["objectIds"] if oid not in returned]
+        else:
+            page["resultOffset"] += len(batch)
+            page["resultRecordCount"] -= len(batch)
+    response["features"] = features
+    return arcgis_to_geojson(response, id_attribute, **options).get("features", [])
+
+
+class _Client:
+    """Minimal ArcGIS REST API client that keeps one persistent HTTP connection per thread and host
+
+    Args:
+        timeout (float): Socket timeout per request, in seconds
+    """
+
+    def __init__(self, timeout: float):
+        self._timeout = timeout
+        self._local = threading.local()
+        self._connections = []
+        self._lock = threading.Lock()
+
+    def request(self, url: str, params: dict) -> dict:
+        """POST a form-encoded request and parse its JSON response
+
+        Args:
+            url (str): Request URL
+            params (dict): Form parameters
+
+        Raises:
+            HarvestError: If the request fails, or the response is not JSON or is an ArcGIS error response
+
+        Returns:
+            dict: Parsed response
+        """
+        split = urlsplit(url)
+        body = urlencode(params).encode("ascii")
+        headers = {"Content-Type": "application/x-www-form-urlencoded", "Accept": "application/json"}
+        for attempt in range(2):
+            connection = self._connection(split.scheme, split.netloc)
+            try:
+                connection.request("POST", split.path or "/", body, headers)
+                response = connection.getresponse()
+                data = response.read()
+                break
+            except (http.client.HTTPException, OSError) as e:
+                connection.close()  # Reconnects on next use; a kept-alive connection may have been closed by the server
+                if attempt:
+                    raise HarvestError(f"Request to {url} failed: {e}") from e
+        if response.status != 200:
+            raise HarvestError(f"Request to {url} failed: HTTP {response.status} {response.reason}")
+        try:
+            result = jsonio.loads(data)
+        except ValueError as e:
+            raise HarvestError(f"Invalid JSON response from {url}") from e
+        if isinstance(result, dict) and (error := result.get("error")):
+            raise HarvestError(f"Error response from {url}: {error.get('code')} {error.get('message')}")
+        return result
+
+    def _connection(self, scheme: str, netloc: str) -> http.client.HTTPConnection:
+        """Get this thread's connection to a host, opening it on first use"""
+        if not hasattr(self._local, "connections"):
+            self._local.connections = {}
+        if (connection := self._local.connections.get((scheme, netloc))) is None:
+            if scheme == "https":
+                connection = http.client.HTTPSConnection(
+                    netloc, timeout=self._timeout, context=ssl.create_default_context()
+                )
+            elif scheme == "http":
+                connection = http.client.HTTPConnection(netloc, timeout=self._timeout)
+            else:
+                raise HarvestError(f"Unsupported URL scheme: {scheme}")
+            self._local.connections[(scheme, netloc)] = connection
+            with self._lock:
+                self._connections.append(connection)
+        return connection
+
+    def close(self):
+        """Close the connections of all threads"""
+        with self._lock:
+            for connection in self._connections:
+                connection.close()
+            self._connections.clear()
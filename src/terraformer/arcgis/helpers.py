@@ -1,3 +1,7 @@
+from collections.abc import Callable
+from warnings import warn
+
+from terraformer import vectorized
 from terraformer.common import (
     LineStringCoords,
     MultiLineStringCoords,
@@ -5,6 +9,8 @@ from terraformer.common import (
     PolygonCoords,
     points_equal,
 )
+from terraformer.projection import is_web_mercator
+from terraformer.stats import current_stats
 
 
 def close_ring(ring: LineStringCoords) -> LineStringCoords:
@@ -18,6 +24,8 @@ def close_ring(ring: LineStringCoords) -> LineStringCoords:
         LineStringCoords: Closed ring of coordinates
     """
     if not points_equal(ring[0], ring[-1]):
+        if (stats := current_stats()) is not None:
+            stats.count("rings_closed")
         return [*ring, ring[0]]
     return ring
 
@@ -33,6 +41,9 @@ def ring_is_clockwise(ring: LineStringCoords) -> bool:
     Returns:
         bool: True if ring is clockwise, False if counter-clockwise
     """
+    if vectorized.is_array(ring):
+        if (result := vectorized.ring_is_clockwise(ring)) is not None:
+            return result
     total = 0
     p1 = ring[0]
     for p2 in ring[1:]:
@@ -41,44 +52,117 @@ def ring_is_clockwise(ring: LineStringCoords) -> bool:
     return total >= 0
 
 
-def orient_rings(polygon: PolygonCoords) -> PolygonCoords:
+def orient_rings(polygon: PolygonCoords, copy: bool = True) -> PolygonCoords:
     """Ensures that polygon's rings are oriented in the right direction for Esri JSON (i.e. outer rings are clockwise,
     holes are counterclockwise)
 
     Args:
         polygon (PolygonCoords): Input polygon to orient
+        copy (bool, optional): Copy rings that are already closed and correctly oriented. If False, such rings are
+            shared with `polygon`, and new lists are only allocated for rings that must be closed or reversed.
+            Defaults to True.
 
     Returns:
         PolygonCoords: Correctly oriented polygon
     """
     output = []
-    polygon = polygon[:]
-    outer_ring = close_ring(polygon.pop(0)[:])
+    outer_ring = close_ring(polygon[0])
     if len(outer_ring) >= 4:
-        if not ring_is_clockwise(outer_ring):
-            outer_ring.reverse()
-        output.append(outer_ring)
-        for hole in polygon:
-            hole = close_ring(hole[:])
+        output.append(_orient_ring(outer_ring, polygon[0], True, copy))
+        for i in range(1, len(polygon)):
+            hole = close_ring(polygon[i])
             if len(hole) >= 4:
-                if ring_is_clockwise(hole):
-                    hole.reverse()
-                output.append(hole)
+                output.append(_orient_ring(hole, polygon[i], False, copy))
     return output
 
 
-def flatten_multipolygon_rings(multipolygon: MultiPolygonCoords) -> MultiLineStringCoords:
+def flatten_multipolygon_rings(multipolygon: MultiPolygonCoords, copy: bool = True) -> MultiLineStringCoords:
     """Flattens holes in multipolygons to one array of polygons
 
     Args:
         multipolygon (MultiPolygonCoords): Input MultiPolygon to flatten
+        copy (bool, optional): Copy rings that are already closed and correctly oriented (see `orient_rings`).
+            Defaults to True.
 
     Returns:
         MultiLineStringCoords: Flattened list of rings
     """
     output = []
     for polygon in multipolygon:
-        clean_polygon = orient_rings(polygon)
-        for ring in clean_polygon[::-1]:
-            output.append(ring[:])
+        output.extend(reversed(orient_rings(polygon, copy)))
     return output
+
+
+def check_spatial_reference(spatial_reference: dict, reproject: bool = False, checked: set = None):
+    """Warn if a spatial reference is not WGS 84, which GeoJSON coordinates are assumed to be in
+
+    Args:
+        spatial_reference (dict): Esri JSON spatialReference object
+        reproject (bool, optional): Whether Web Mercator coordinates are reprojected to WGS 84. Defaults to False.
+        checked (set, optional): IDs of the spatial references checked already (see `spatial_reference_ids`),
+            updated in place. Spatial references sharing an ID with them aren't checked again, so each distinct CRS
+            warns once. Defaults to None (always checked).
+    """
+    if checked is not None:
+        if not (ids := spatial_reference_ids(spatial_reference)).isdisjoint(checked):
+            return
+        checked.update(ids)
+    if reproject and is_web_mercator(spatial_reference):
+        return
+    if (wkid := spatial_reference.get("wkid")) and wkid != 4326:
+        warn(f"Object converted in non-standard CRS - {spatial_reference}")
+
+
+def spatial_reference_ids(spatial_reference: dict) -> set:
+    """Get the IDs a spatial reference can be recognized by: its `wkid`, `latestWkid` and `wkt`, and 3857 for any of
+    the WKIDs of Web Mercator
+
+    Args:
+        spatial_reference (dict): Esri JSON spatialReference object
+
+    Returns:
+        set: WKIDs and WKT strings
+    """
+    ids = {value for key in ("wkid", "latestWkid", "wkt") if (value := spatial_reference.get(key)) is not None}
+    if is_web_mercator(spatial_reference):
+        ids.add(3857)
+    return ids
+
+
+def matches_where(feature: dict, where: Callable[[dict], bool], member: str) -> bool:
+    """Check if a feature satisfies a `where` predicate, counting the features that don't
+
+    Args:
+        feature (dict): Esri JSON or GeoJSON feature
+        where (Callable[[dict], bool]): Predicate called with the feature's attributes or properties (or an empty dict)
+        member (str): Member holding them, "attributes" (Esri JSON) or "properties" (GeoJSON)
+
+    Returns:
+        bool: True if the feature matches, False if not
+    """
+    if where(feature.get(member) or {}):
+        return True
+    if (stats := current_stats()) is not None:
+        stats.count("features_skipped")
+    return False
+
+
+def _orient_ring(ring: LineStringCoords, original: LineStringCoords, clockwise: bool, copy: bool) -> LineStringCoords:
+    """Orient a closed ring, reversing it into a new list if needed
+
+    Args:
+        ring (LineStringCoords): Closed ring of coordinates
+        original (LineStringCoords): Input ring that `ring` was closed from (the same list if it was already closed)
+        clockwise (bool): Whether the ring should be clockwise
+        copy (bool): Whether to copy `ring` if it's unchanged from `original`
+
+    Returns:
+        LineStringCoords: Correctly oriented ring
+    """
+    if ring_is_clockwise(ring) != clockwise:
+        if (stats := current_stats()) is not None:
+            stats.count("rings_reversed")
+        return ring[::-1]
+    if copy and ring is original:
+        return ring[:]
+    return ring
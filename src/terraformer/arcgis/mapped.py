@@ -0,0 +1,230 @@
+"""Memory-mapped reading of very large Esri JSON FeatureSet and GeoJSON FeatureCollection files"""
+
+import mmap
+import os
+from array import array
+from bisect import bisect_left
+from collections.abc import Iterator
+
+from terraformer import jsonio
+from terraformer.jsonscan import JSONScanError, JSONScanner
+from ._stream import apply_header, iter_raw_features, load_feature
+from .arcgis import arcgis_to_geojson
+from .geojson import geojson_to_arcgis
+from .helpers import matches_where
+
+FORMATS = ("esri", "geojson")
+
+
+class MappedFeatureFile:
+    """Esri JSON FeatureSet or GeoJSON FeatureCollection file that's memory-mapped and scanned for the raw JSON of
+    each feature (see `terraformer.jsonscan`), so that only the feature being converted is copied into Python objects.
+    The operating system pages the file in and out as it's scanned, so files much larger than memory can be read.
+
+    Scanning the file once, which `build_index()` does without parsing any feature, records the byte offsets of every
+    feature and parses the document's other members (its `header`). With the index, the file can be `split()` into byte
+    spans of about equal size, each of which can be read or converted by a different worker. MappedFeatureFiles can be
+    pickled to send them to worker processes: the path, format and header are sent along, but not the index or the
+    mapping, which each worker opens for itself.
+
+    Args:
+        path (str | os.PathLike): Path of the file
+        array_key (str, optional): Key of the top-level member containing the features. Defaults to "features".
+    """
+
+    def __init__(self, path: str | os.PathLike, array_key: str = "features"):
+        self.path = os.fspath(path)
+        self.array_key = array_key
+        self._file = None
+        self._map = None
+        self._format = None
+        self._header = None
+        self._starts = None  # Start offset of each feature, once indexed
+        self._ends = None  # End offset of each feature, once indexed
+
+    @property
+    def format(self) -> str:
+        """str: Format of the file, "geojson" if its top-level `type` is "FeatureCollection" or its first feature is a
+        GeoJSON Feature, else "esri". Detecting the format only scans up to the first feature."""
+        if self._format is None:
+            self._format = "esri"
+            for key, start, end in JSONScanner(self._buffer()).iter_member_spans(self.array_key):
+                if key == self.array_key:
+                    feature = jsonio.loads(self._map[start:end])
+                    if isinstance(feature, dict) and (feature.get("type") == "Feature" or "properties" in feature):
+                        self._format = "geojson"
+                    break
+                if key == "type" and jsonio.loads(self._map[start:end]) == "FeatureCollection":
+                    self._format = "geojson"
+                    break
+        return self._format
+
+    @property
+    def header(self) -> dict:
+        """dict: Every top-level member of the document except the features (e.g. `spatialReference`, `transform` or
+        `fields`). Getting it builds the index."""
+        if self._header is None:
+            self.build_index()
+        return self._header
+
+    def build_index(self) -> "MappedFeatureFile":
+        """Scan the file, recording the byte offsets of every feature and parsing the header. Features are only
+        delimited, not parsed. Does nothing if the file was already indexed.
+
+        Raises:
+            JSONScanError: If the file is not a JSON object or is malformed/truncated
+
+        Returns:
+            MappedFeatureFile: The file itself
+        """
+        if self._starts is not None:
+            return self
+        starts = array("q")
+        ends = array("q")
+        header = {}
+        for key, start, end in JSONScanner(self._buffer()).iter_member_spans(self.array_key):
+            if key == self.array_key:
+                starts.append(start)
+                ends.append(end)
+            else:
+                header[key] = jsonio.loads(self._map[start:end])
+        self._starts, self._ends, self._header = starts, ends, header
+        return self
+
+    def __len__(self) -> int:
+        """Number of features (builds the index)"""
+        self.build_index()
+        return len(self._starts)
+
+    def split(self, parts: int) -> list[tuple[int, int]]:
+        """Split the features into up to `parts` runs of consecutive features of about equal size in bytes (builds the
+        index)
+
+        Args:
+            parts (int): Number of runs
+
+        Raises:
+            ValueError: If `parts` is less than 1
+
+        Returns:
+            list[tuple[int, int]]: Start and end byte offsets of each run of features, in file order, to be passed to
+                `iter_raw` or `iter_converted` as `span`
+        """
+        if parts < 1:
+            raise ValueError("parts must be at least 1")
+        self.build_index()
+        starts, ends = self._starts, self._ends
+        if not starts:
+            return []
+        spans = []
+        first = 0
+        total = ends[-1] - starts[0]
+        for part in range(1, parts + 1):
+            # Index of the first feature starting at or after this part's share of the bytes
+            last = len(starts) if part == parts else bisect_left(starts, starts[0] + total * part // parts)
+            if last > first:
+                spans.append((starts[first], ends[last - 1]))
+                first = last
+        return spans
+
+    def iter_raw(self, span: tuple[int, int] = None) -> Iterator[bytes]:
+        """Iterate over the raw JSON of the features, in file order
+
+        Args:
+            span (tuple[int, int], optional): Start and end byte offsets of a run of features (see `split`). Defaults
+                to None (every feature).
+
+        Raises:
+            JSONScanError: If the file is malformed/truncated
+
+        Yields:
+            bytes: Raw JSON of each feature
+        """
+        buffer = self._buffer()
+        if span is not None:
+            for start, end in JSONScanner(buffer).iter_element_spans(*span):
+                yield buffer[start:end]
+        elif self._starts is not None:
+            for start, end in zip(self._starts, self._ends):
+                yield buffer[start:end]
+        else:
+            for key, start, end in JSONScanner(buffer).iter_member_spans(self.array_key):
+                if key == self.array_key:
+                    yield buffer[start:end]
+
+    def iter_converted(self, span: tuple[int, int] = None, id_attribute: str = None, **options) -> Iterator[dict]:
+        """Lazily convert the features, or a run of them, to the other format: Esri JSON features to GeoJSON Features
+        with `arcgis_to_geojson`, or GeoJSON Features to Esri JSON features with `geojson_to_arcgis`. For Esri JSON,
+        the header's `transform`, `spatialReference` and `geometryType` are applied to every feature. If the file
+        isn't indexed and no `span` is given, the features are streamed without scanning the file first, and these
+        members are applied as they're read, so they must precede the features (see `arcgis_to_geojson_iter`). Call
+        `build_index()` first to apply them wherever they are in the file.
+
+        Args:
+            span (tuple[int, int], optional): Start and end byte offsets of a run of features (see `split`). Defaults
+                to None (every feature).
+            id_attribute (str, optional): Name of ID attribute. Defaults to None, or "OBJECTID" for GeoJSON input.
+            **options: Additional keyword arguments passed to the converter
+
+        Raises:
+            JSONScanError: If the file is malformed/truncated
+            ValueError: If a feature is not a JSON object, or if the `transform` (or, with `reproject`, the
+                `spatialReference`) of a file that isn't indexed follows its features
+
+        Yields:
+            dict: Converted features, in file order
+        """
+        raw_features = self.iter_raw(span)
+        if self.format == "geojson":
+            convert, member = geojson_to_arcgis, "properties"
+            id_attribute = id_attribute or "OBJECTID"
+        else:
+            convert, member = arcgis_to_geojson, "attributes"
+            if span is not None or self._header is not None:
+                apply_header(self.header, options)
+            else:
+                raw_features = iter_raw_features(self._iter_members(), options, self.array_key)
+        where = options.get("where")
+        for raw in raw_features:
+            feature = load_feature(raw)
+            if where is None or matches_where(feature, where, member):
+                yield convert(feature, id_attribute, **options)
+
+    def close(self):
+        """Unmap and close the file. It's reopened if it's used again."""
+        if self._map is not None:
+            self._map.close()
+            self._file.close()
+            self._map = self._file = None
+
+    def _iter_members(self) -> Iterator[tuple[str, bytes]]:
+        """Scan the file for the raw JSON of its members, one per feature for `array_key`"""
+        buffer = self._buffer()
+        for key, start, end in JSONScanner(buffer).iter_member_spans(self.array_key):
+            yield key, buffer[start:end]
+
+    def _buffer(self) -> mmap.mmap:
+        """Map the file, unless it's mapped already"""
+        if self._map is None:
+            file = open(self.path, "rb")
+            try:
+                self._map = mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ)
+            except ValueError as e:  # Empty files can't be mapped
+                file.close()
+                raise JSONScanError(f"Empty document: {self.path}") from e
+            self._file = file
+        return self._map
+
+    def __enter__(self) -> "MappedFeatureFile":
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+    def __getstate__(self) -> dict:
+        return {"path": self.path, "array_key": self.array_key, "format": self._format, "header": self._header}
+
+    def __setstate__(self, state: dict):
+        self.__init__(state["path"], state["array_key"])
+        self._format = state["format"]
+        self._header = state["header"]
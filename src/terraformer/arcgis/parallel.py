@@ -0,0 +1,245 @@
+"""Parallel conversion of large feature collections across worker processes or threads"""
+
+import os
+import sys
+from collections.abc import Callable, Iterable, Iterator
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from contextvars import Context, copy_context
+from functools import partial
+from itertools import islice
+from typing import BinaryIO, TextIO
+
+from terraformer import jsonio
+from terraformer.jsonscan import JSONScanner
+from ._stream import apply_header, iter_geojson_texts, iter_raw_features, map_chunks
+from .arcgis import arcgis_to_geojson
+from .geojson import GeoJSONError, geojson_to_arcgis
+from .helpers import matches_where
+
+
+def arcgis_to_geojson_parallel(
+    source: dict | Iterable[dict] | BinaryIO | TextIO | bytes,
+    id_attribute: str = None,
+    max_workers: int = None,
+    chunk_size: int = 1000,
+    **options,
+) -> Iterator[dict]:
+    """Converts the features of an Esri JSON FeatureSet to GeoJSON Features in parallel worker processes, yielding
+    them in input order. Features are sent to workers in chunks of `chunk_size`. When `source` is a file object or
+    bytes, the raw JSON of each chunk is sent and parsed by the worker, so the calling process only scans the input.
+    Rebuilding nested coordinate lists from worker results is serial work for the calling process; pass `packed=True`
+    to receive PackedCoordinates instead, which are transferred as flat buffers at close to memory copy speed.
+
+    Args:
+        source (dict | Iterable[dict] | BinaryIO | TextIO | bytes): An Esri JSON FeatureSet, an iterable of Esri JSON
+            features, or a file object or bytes containing an Esri JSON FeatureSet
+        id_attribute (str, optional): Name of ID attribute (default: None)
+        max_workers (int, optional): Number of worker processes. Defaults to the number of CPUs.
+        chunk_size (int, optional): Number of features per chunk sent to a worker. Defaults to 1000.
+        **options: Additional keyword arguments passed to `arcgis_to_geojson`. A `where` predicate must be picklable
+            (e.g. a module-level function) to be sent to the workers.
+
+    Yields:
+        dict: GeoJSON Feature objects, in input order
+    """
+    chunks = _arcgis_chunks(source, chunk_size, options)
+    convert = partial(_convert_chunk, arcgis_to_geojson, "attributes", id_attribute)
+    max_workers = max_workers or os.cpu_count() or 1
+    with ProcessPoolExecutor(max_workers) as executor:
+        yield from map_chunks(executor, convert, chunks, max_workers * 2)
+
+
+def geojson_to_arcgis_parallel(
+    source: dict | Iterable[dict] | BinaryIO | TextIO,
+    id_attribute: str = "OBJECTID",
+    wkid: int = 4326,
+    max_workers: int = None,
+    chunk_size: int = 1000,
+    **options,
+) -> Iterator[dict]:
+    """Converts GeoJSON Features to Esri JSON features in parallel worker processes, yielding them in input order.
+    Features are sent to workers in chunks of `chunk_size`. When `source` is a file object, the raw GeoJSON texts of
+    each chunk are sent and parsed by the worker. Pass `packed=True` to receive PackedCoordinates, which are
+    transferred from workers much faster than nested coordinate lists.
+
+    Args:
+        source (dict | Iterable[dict] | BinaryIO | TextIO): A GeoJSON FeatureCollection object, an iterable of GeoJSON
+            Feature objects, or a file object containing a GeoJSON Text Sequence (RFC 8142) or newline-delimited GeoJSON
+        id_attribute (str, optional): Name of output ID attribute. Defaults to "OBJECTID".
+        wkid (int, optional): WKID of the GeoJSON's spatial reference. Defaults to 4326 (WGS 84).
+        max_workers (int, optional): Number of worker processes. Defaults to the number of CPUs.
+        chunk_size (int, optional): Number of features per chunk sent to a worker. Defaults to 1000.
+        **options: Additional keyword arguments passed to `geojson_to_arcgis`. A `where` predicate must be picklable
+            (e.g. a module-level function) to be sent to the workers.
+
+    Raises:
+        GeoJSONError: If `source` or any of its features is invalid in some way
+
+    Yields:
+        dict: Esri JSON feature objects, in input order
+    """
+    chunks = _with_options(_geojson_chunks(source, chunk_size), {"wkid": wkid, **options})
+    convert = partial(_convert_chunk, geojson_to_arcgis, "properties", id_attribute)
+    max_workers = max_workers or os.cpu_count() or 1
+    with ProcessPoolExecutor(max_workers) as executor:
+        yield from map_chunks(executor, convert, chunks, max_workers * 2)
+
+
+def arcgis_to_geojson_threaded(
+    source: dict | Iterable[dict] | BinaryIO | TextIO | bytes,
+    id_attribute: str = None,
+    max_workers: int = None,
+    chunk_size: int = 1000,
+    **options,
+) -> Iterator[dict]:
+    """Converts the features of an Esri JSON FeatureSet to GeoJSON Features in a pool of threads, yielding them in
+    input order. Like `arcgis_to_geojson_parallel`, but features and results are shared with the threads instead of
+    being pickled, so on free-threaded Python builds (3.13t and later) it uses multiple cores without the cost of
+    transferring data between processes. With the GIL, threads can't convert concurrently, so by default chunks are
+    converted in the calling thread.
+
+    Conversions run in a copy of the calling thread's context, so an active `collect_stats()` block records them.
+
+    Args:
+        source (dict | Iterable[dict] | BinaryIO | TextIO | bytes): An Esri JSON FeatureSet, an iterable of Esri JSON
+            features, or a file object or bytes containing an Esri JSON FeatureSet
+        id_attribute (str, optional): Name of ID attribute (default: None)
+        max_workers (int, optional): Number of threads. Defaults to the number of CPUs if the GIL is disabled, else 1
+            (no threads).
+        chunk_size (int, optional): Number of features per chunk given to a thread. Defaults to 1000.
+        **options: Additional keyword arguments passed to `arcgis_to_geojson`
+
+    Yields:
+        dict: GeoJSON Feature objects, in input order
+    """
+    chunks = _arcgis_chunks(source, chunk_size, options)
+    convert = partial(_convert_chunk, arcgis_to_geojson, "attributes", id_attribute)
+    yield from _map_chunks_threaded(convert, chunks, max_workers)
+
+
+def geojson_to_arcgis_threaded(
+    source: dict | Iterable[dict] | BinaryIO | TextIO,
+    id_attribute: str = "OBJECTID",
+    wkid: int = 4326,
+    max_workers: int = None,
+    chunk_size: int = 1000,
+    **options,
+) -> Iterator[dict]:
+    """Converts GeoJSON Features to Esri JSON features in a pool of threads, yielding them in input order. Like
+    `geojson_to_arcgis_parallel`, but without pickling, for free-threaded Python builds (see
+    `arcgis_to_geojson_threaded`).
+
+    Args:
+        source (dict | Iterable[dict] | BinaryIO | TextIO): A GeoJSON FeatureCollection object, an iterable of GeoJSON
+            Feature objects, or a file object containing a GeoJSON Text Sequence (RFC 8142) or newline-delimited GeoJSON
+        id_attribute (str, optional): Name of output ID attribute. Defaults to "OBJECTID".
+        wkid (int, optional): WKID of the GeoJSON's spatial reference. Defaults to 4326 (WGS 84).
+        max_workers (int, optional): Number of threads. Defaults to the number of CPUs if the GIL is disabled, else 1
+            (no threads).
+        chunk_size (int, optional): Number of features per chunk given to a thread. Defaults to 1000.
+        **options: Additional keyword arguments passed to `geojson_to_arcgis`
+
+    Raises:
+        GeoJSONError: If `source` or any of its features is invalid in some way
+
+    Yields:
+        dict: Esri JSON feature objects, in input order
+    """
+    chunks = _with_options(_geojson_chunks(source, chunk_size), {"wkid": wkid, **options})
+    convert = partial(_convert_chunk, geojson_to_arcgis, "properties", id_attribute)
+    yield from _map_chunks_threaded(convert, chunks, max_workers)
+
+
+def gil_enabled() -> bool:
+    """Check if the GIL is enabled, i.e. if threads can't run Python code concurrently. Free-threaded builds may enable
+    it at runtime, e.g. when importing an extension module that doesn't support running without it.
+
+    Returns:
+        bool: False on free-threaded builds running without the GIL, True otherwise
+    """
+    # Python 3.13+ (the GIL is always enabled before)
+    is_gil_enabled = getattr(sys, "_is_gil_enabled", lambda: True)
+    return is_gil_enabled()
+
+
+def _arcgis_chunks(source: dict | Iterable[dict] | BinaryIO | TextIO | bytes, size: int, options: dict) -> Iterator:
+    """Split an Esri JSON source into chunks of features (or raw JSON arrays of features), adding a FeatureSet's
+    `transform`, `spatialReference` and `geometryType` to the conversion `options`, and pair each chunk with the
+    options it's converted with (see `_with_options`)"""
+    if isinstance(source, dict):
+        apply_header(source, options)
+        chunks = _chunked(source.get("features") or [], size)
+    elif hasattr(source, "read") or isinstance(source, (bytes, bytearray)):
+        chunks = _raw_chunks(iter_raw_features(JSONScanner(source).iter_members("features"), options), size)
+    else:
+        options.setdefault("checked_spatial_references", set())
+        chunks = _chunked(source, size)
+    return _with_options(chunks, options)
+
+
+def _geojson_chunks(source: dict | Iterable[dict] | BinaryIO | TextIO, size: int) -> Iterator:
+    """Split a GeoJSON source into chunks of Features (or raw JSON arrays of Features)"""
+    if isinstance(source, dict):
+        if source.get("type") != "FeatureCollection":
+            raise GeoJSONError(f"Expected a FeatureCollection object, got {source.get('type')!r}")
+        if not (features := source.get("features")):
+            raise GeoJSONError("Missing/empty 'features' property on FeatureCollection object")
+        return _chunked(features, size)
+    if hasattr(source, "read"):
+        return _raw_chunks((text.encode("utf-8") for text in iter_geojson_texts(source)), size)
+    return _chunked(source, size)
+
+
+def _with_options(chunks: Iterator, options: dict) -> Iterator[tuple[dict, list[dict] | bytes]]:
+    """Pair each chunk with a copy of the conversion `options` taken once the chunk is read, so that workers never
+    share the options (or their set of checked spatial references) while reading later chunks still updates them"""
+    for chunk in chunks:
+        snapshot = options.copy()
+        if (checked := snapshot.get("checked_spatial_references")) is not None:
+            snapshot["checked_spatial_references"] = set(checked)
+        yield snapshot, chunk
+
+
+def _convert_chunk(
+    converter: Callable, member: str, id_attribute: str, job: tuple[dict, list[dict] | bytes]
+) -> list[dict]:
+    """Convert the features of a chunk whose `member` ("attributes" or "properties") matches the `where` option (if
+    any) in a worker. Jobs pair a chunk with its conversion options. Raw chunks are JSON arrays of features."""
+    options, chunk = job
+    if isinstance(chunk, bytes):
+        chunk = jsonio.loads(chunk)
+    if (where := options.get("where")) is not None:
+        chunk = [feature for feature in chunk if matches_where(feature, where, member)]
+    return [converter(feature, id_attribute, **options) for feature in chunk]
+
+
+def _map_chunks_threaded(convert: Callable, chunks: Iterator, max_workers: int = None) -> Iterator[dict]:
+    """Convert chunks in a thread pool (or in the calling thread if `max_workers` is 1), each in a copy of the calling
+    thread's context, and yield the converted features in input order"""
+    if max_workers is None:
+        max_workers = 1 if gil_enabled() else os.cpu_count() or 1
+    if max_workers == 1:
+        for chunk in chunks:
+            yield from convert(chunk)
+        return
+    convert = partial(_run_in_context, copy_context(), convert)
+    with ThreadPoolExecutor(max_workers) as executor:
+        yield from map_chunks(executor, convert, chunks, max_workers * 2)
+
+
+def _run_in_context(context: Context, function: Callable, *args):
+    # A context can only be entered by one thread at a time, so each call gets its own copy
+    return context.copy().run(function, *args)
+
+
+def _chunked(iterable: Iterable, size: int) -> Iterator[list]:
+    iterator = iter(iterable)
+    while chunk := list(islice(iterator, size)):
+        yield chunk
+
+
+def _raw_chunks(raw_features: Iterator[bytes], size: int) -> Iterator[bytes]:
+    """Join chunks of raw JSON features into raw JSON arrays"""
+    for chunk in _chunked(raw_features, size):
+        yield b"[" + b",".join(chunk) + b"]"
+
@@ -0,0 +1,361 @@
+"""Decode ArcGIS FeatureCollection protocol buffers (query responses requested with `f=pbf`) into GeoJSON"""
+
+from collections.abc import Iterator
+from struct import unpack_from
+from typing import BinaryIO
+
+from .arcgis import _convert_rings_to_geojson, _get_id
+from .helpers import check_spatial_reference
+
+# Wire types
+_VARINT = 0
+_FIXED64 = 1
+_LENGTH_DELIMITED = 2
+_FIXED32 = 5
+
+# FeatureCollectionPBuffer.GeometryType
+_POINT = 0
+_MULTIPOINT = 1
+_POLYLINE = 2
+_POLYGON = 3
+
+# FeatureCollectionPBuffer.QuantizeOriginPostion
+_UPPER_LEFT = 0
+
+
+class PBFError(ValueError):
+    # Custom exception for malformed or unsupported ArcGIS protocol buffers
+    pass
+
+
+def arcgis_pbf_to_geojson(source: bytes | BinaryIO, id_attribute: str = None) -> dict:
+    """Converts an ArcGIS FeatureCollection protocol buffer into a GeoJSON FeatureCollection, applying the same
+    conversion rules as `arcgis_to_geojson` without building intermediate Esri JSON objects
+
+    Args:
+        source (bytes | BinaryIO): Protocol buffer bytes, or a binary file object to read them from
+        id_attribute (str, optional): Name of ID attribute (default: None)
+
+    Raises:
+        PBFError: If `source` is malformed or is not a feature query result (e.g. a count or object ID result)
+
+    Returns:
+        dict: A GeoJSON FeatureCollection object
+    """
+    return {"type": "FeatureCollection", "features": list(arcgis_pbf_to_geojson_iter(source, id_attribute))}
+
+
+def arcgis_pbf_to_geojson_iter(source: bytes | BinaryIO, id_attribute: str = None) -> Iterator[dict]:
+    """Converts the features of an ArcGIS FeatureCollection protocol buffer into GeoJSON Features one at a time.
+
+    Coordinates are dequantized using the result's transform. M values are dropped, since GeoJSON has no M dimension.
+
+    Args:
+        source (bytes | BinaryIO): Protocol buffer bytes, or a binary file object to read them from
+        id_attribute (str, optional): Name of ID attribute (default: None)
+
+    Raises:
+        PBFError: If `source` is malformed or is not a feature query result (e.g. a count or object ID result)
+
+    Yields:
+        dict: GeoJSON Feature objects
+    """
+    buf = source if isinstance(source, (bytes, bytearray, memoryview)) else source.read()
+    result = _feature_result_span(buf)
+    header = _FeatureResultHeader()
+    feature_spans = []
+    for field, wire_type, value in _iter_fields(buf, *result):
+        if field == 15 and wire_type == _LENGTH_DELIMITED:
+            feature_spans.append(value)
+        else:
+            header.read_field(buf, field, wire_type, value)
+    if header.wkid:
+        check_spatial_reference({"wkid": header.wkid})
+    for span in feature_spans:
+        yield _convert_feature(buf, span, header, id_attribute)
+
+
+class _FeatureResultHeader:
+    """Collection-level properties of a FeatureResult message that are needed to decode its features"""
+
+    def __init__(self):
+        self.geometry_type = _POINT  # Protocol buffer enums default to their first value
+        self.wkid = None
+        self.has_z = False
+        self.has_m = False
+        self.fields = []
+        self.scale = (1.0, 1.0, 1.0)  # (x, y, z)
+        self.translate = (0.0, 0.0, 0.0)
+        self.upper_left = True
+
+    def read_field(self, buf: bytes, field: int, wire_type: int, value):
+        """Read one field of a FeatureResult message (other than its features)"""
+        if field == 7 and wire_type == _VARINT:
+            self.geometry_type = value
+        elif field == 8 and wire_type == _LENGTH_DELIMITED:
+            wkids = {}
+            for sr_field, sr_wire_type, sr_value in _iter_fields(buf, *value):
+                if sr_wire_type == _VARINT:
+                    wkids[sr_field] = sr_value
+            self.wkid = wkids.get(2) or wkids.get(1)  # latestWkid (2) takes precedence over wkid (1)
+        elif field == 10 and wire_type == _VARINT:
+            self.has_z = bool(value)
+        elif field == 11 and wire_type == _VARINT:
+            self.has_m = bool(value)
+        elif field == 12 and wire_type == _LENGTH_DELIMITED:
+            self._read_transform(buf, value)
+        elif field == 13 and wire_type == _LENGTH_DELIMITED:
+            name = ""
+            for field_field, field_wire_type, field_value in _iter_fields(buf, *value):
+                if field_field == 1 and field_wire_type == _LENGTH_DELIMITED:
+                    name = _string(buf, field_value)
+            self.fields.append(name)
+
+    def _read_transform(self, buf: bytes, span: tuple[int, int]):
+        """Read a Transform message: origin position (1), Scale (2) and Translate (3) with x (1), y (2) and z (4)"""
+        for field, wire_type, value in _iter_fields(buf, *span):
+            if field == 1 and wire_type == _VARINT:
+                self.upper_left = value == _UPPER_LEFT
+            elif field in (2, 3) and wire_type == _LENGTH_DELIMITED:
+                xyz = list(self.scale if field == 2 else self.translate)
+                for axis_field, axis_wire_type, axis_value in _iter_fields(buf, *value):
+                    if axis_wire_type == _FIXED64 and axis_field in (1, 2, 4):
+                        xyz[(axis_field - 1) if axis_field < 4 else 2] = axis_value
+                if field == 2:
+                    self.scale = tuple(xyz)
+                else:
+                    self.translate = tuple(xyz)
+
+
+def _feature_result_span(buf: bytes) -> tuple[int, int]:
+    """Find the FeatureResult message within a FeatureCollectionPBuffer message (queryResult (2) > featureResult (1))
+
+    Raises:
+        PBFError: If there is no FeatureResult
+
+    Returns:
+        tuple[int, int]: Start and end offsets of the FeatureResult message
+    """
+    for field, wire_type, value in _iter_fields(buf, 0, len(buf)):
+        if field == 2 and wire_type == _LENGTH_DELIMITED:
+            for result_field, result_wire_type, result_value in _iter_fields(buf, *value):
+                if result_field == 1 and result_wire_type == _LENGTH_DELIMITED:
+                    return result_value
+                raise PBFError(f"Protocol buffer is not a feature query result (result type {result_field})")
+    raise PBFError("Protocol buffer has no query result")
+
+
+def _convert_feature(buf: bytes, span: tuple[int, int], header: _FeatureResultHeader, id_attribute: str) -> dict:
+    """Convert a Feature message (attribute Values (1), Geometry (2)) into a GeoJSON Feature"""
+    values = []
+    geometry = None
+    for field, wire_type, value in _iter_fields(buf, *span):
+        if field == 1 and wire_type == _LENGTH_DELIMITED:
+            values.append(_value(buf, value))
+        elif field == 2 and wire_type == _LENGTH_DELIMITED:
+            geometry = _convert_geometry(buf, value, header)
+    attributes = dict(zip(header.fields, values))
+    feature = {"type": "Feature", "geometry": geometry, "properties": attributes or None}
+    if attributes:
+        try:
+            feature["id"] = _get_id(attributes, id_attribute)
+        except KeyError:
+            pass  # Don't set an (optional) id
+    return feature
+
+
+def _convert_geometry(buf: bytes, span: tuple[int, int], header: _FeatureResultHeader) -> dict | None:
+    """Convert a Geometry message (part lengths (2), delta-encoded quantized coordinates (3)) into a GeoJSON geometry
+
+    Returns:
+        dict | None: GeoJSON geometry object, or None if the geometry is empty or of an unsupported type
+    """
+    lengths = []
+    coords = []
+    for field, wire_type, value in _iter_fields(buf, *span):
+        if field == 2:
+            if wire_type == _LENGTH_DELIMITED:
+                lengths.extend(_packed_varints(buf, *value))
+            else:
+                lengths.append(value)
+        elif field == 3:
+            if wire_type == _LENGTH_DELIMITED:
+                coords.extend(_packed_varints(buf, *value))
+            else:
+                coords.append(value)
+    if not coords:
+        return None
+
+    parts = _dequantize(coords, lengths or [len(coords) // (2 + header.has_z + header.has_m)], header)
+    geometry_type = header.geometry_type
+    if geometry_type == _POINT:
+        coordinates = parts[0][0]
+        if len(coordinates) > 2 and not coordinates[2]:
+            del coordinates[2]  # As in arcgis_to_geojson, a zero z value is dropped from Points
+        return {"type": "Point", "coordinates": coordinates}
+    if geometry_type == _MULTIPOINT:
+        return {"type": "MultiPoint", "coordinates": [point for part in parts for point in part]}
+    if geometry_type == _POLYLINE:
+        if len(parts) == 1:
+            return {"type": "LineString", "coordinates": parts[0]}
+        return {"type": "MultiLineString", "coordinates": parts}
+    if geometry_type == _POLYGON:
+        return _convert_rings_to_geojson(parts)
+    return None
+
+
+def _dequantize(coords: list[int], lengths: list[int], header: _FeatureResultHeader) -> list[list[list[float]]]:
+    """Undo the zigzag, delta and quantization encoding of a flat coordinate array. Deltas continue across parts, i.e.
+    the first vertex of a part is relative to the last vertex of the previous part.
+
+    Args:
+        coords (list[int]): Zigzag-encoded coordinate deltas
+        lengths (list[int]): Number of vertices in each part
+        header (_FeatureResultHeader): Collection header with dimensions and transform
+
+    Returns:
+        list[list[list[float]]]: Parts of [x, y] or [x, y, z] vertices
+    """
+    dims = 2 + header.has_z + header.has_m
+    x_scale, y_scale, z_scale = header.scale
+    x_translate, y_translate, z_translate = header.translate
+    if header.upper_left:
+        y_scale = -y_scale
+    has_z = header.has_z
+    x = y = z = 0
+    i = 0
+    parts = []
+    for length in lengths:
+        part = []
+        for _ in range(length):
+            dx = coords[i]
+            dy = coords[i + 1]
+            x += (dx >> 1) ^ -(dx & 1)
+            y += (dy >> 1) ^ -(dy & 1)
+            if has_z:
+                dz = coords[i + 2]
+                z += (dz >> 1) ^ -(dz & 1)
+                part.append([x * x_scale + x_translate, y * y_scale + y_translate, z * z_scale + z_translate])
+            else:
+                part.append([x * x_scale + x_translate, y * y_scale + y_translate])
+            i += dims
+        parts.append(part)
+    if i > len(coords):
+        raise PBFError("Geometry part lengths exceed its coordinates")
+    return parts
+
+
+def _value(buf: bytes, span: tuple[int, int]) -> str | float | int | bool | None:
+    """Decode a Value message, a oneof of string (1), float (2), double (3), sint32 (4), uint32 (5), int64 (6),
+    uint64 (7), sint64 (8) and bool (9). An empty Value is a null attribute."""
+    for field, wire_type, value in _iter_fields(buf, *span):
+        if field == 1 and wire_type == _LENGTH_DELIMITED:
+            return _string(buf, value)
+        if field in (2, 3) and wire_type in (_FIXED32, _FIXED64):
+            return value
+        if wire_type != _VARINT:
+            continue  # Unknown field, or a known field with the wrong wire type
+        if field in (5, 7):
+            return value
+        if field in (4, 8):
+            return (value >> 1) ^ -(value & 1)
+        if field == 6:
+            return value - (1 << 64) if value >= 1 << 63 else value
+        if field == 9:
+            return bool(value)
+    return None
+
+
+def _string(buf: bytes, span: tuple[int, int]) -> str:
+    """Decode a UTF-8 string field"""
+    return bytes(buf[span[0] : span[1]]).decode("utf-8")
+
+
+def _iter_fields(buf: bytes, start: int, end: int) -> Iterator[tuple[int, int, object]]:
+    """Iterate over the fields of a protocol buffer message
+
+    Args:
+        buf (bytes): Buffer containing the message
+        start (int): Offset of the start of the message
+        end (int): Offset of the end of the message
+
+    Raises:
+        PBFError: If the message is truncated or uses an unsupported wire type
+
+    Yields:
+        tuple[int, int, object]: Field number, wire type and value: an int for varints, a float for 64-bit (double)
+            and 32-bit (float) fields, and a (start, end) span for length-delimited fields
+    """
+    pos = start
+    while pos < end:
+        key, pos = _varint(buf, pos)
+        wire_type = key & 7
+        if wire_type == _VARINT:
+            value, pos = _varint(buf, pos)
+        elif wire_type == _LENGTH_DELIMITED:
+            length, pos = _varint(buf, pos)
+            value = (pos, pos + length)
+            pos += length
+        elif wire_type == _FIXED64:
+            value = unpack_from("<d", buf, pos)[0] if pos + 8 <= end else None
+            pos += 8
+        elif wire_type == _FIXED32:
+            value = unpack_from("<f", buf, pos)[0] if pos + 4 <= end else None
+            pos += 4
+        else:
+            raise PBFError(f"Unsupported wire type {wire_type} at offset {pos}")
+        if pos > end:
+            raise PBFError(f"Truncated protocol buffer message at offset {start}")
+        yield key >> 3, wire_type, value
+
+
+def _varint(buf: bytes, pos: int) -> tuple[int, int]:
+    """Decode a varint
+
+    Returns:
+        tuple[int, int]: Value and offset just after the varint
+    """
+    try:
+        byte = buf[pos]
+        if byte < 0x80:
+            return byte, pos + 1
+        value = byte & 0x7F
+        shift = 7
+        while True:
+            pos += 1
+            byte = buf[pos]
+            value |= (byte & 0x7F) << shift
+            if byte < 0x80:
+                return value, pos + 1
+            shift += 7
+    except IndexError:
+        raise PBFError(f"Truncated varint at offset {pos}") from None
+
+
+def _packed_varints(buf: bytes, start: int, end: int) -> list[int]:
+    """Decode a packed repeated varint field"""
+    values = []
+    append = values.append
+    pos = start
+    try:
+        while pos < end:
+            byte = buf[pos]
+            pos += 1
+            if byte < 0x80:
+                append(byte)
+                continue
+            value = byte & 0x7F
+            shift = 7
+            while True:
+                byte = buf[pos]
+                pos += 1
+                value |= (byte & 0x7F) << shift
+                if byte < 0x80:
+                    break
+                shift += 7
+            append(value)
+    except IndexError:
+        raise PBFError(f"Truncated packed field at offset {start}") from None
+    if pos != end:
+        raise PBFError(f"Truncated packed field at offset {start}")
+    return values
@@ -0,0 +1,163 @@
+"""Quantized, delta-encoded Esri JSON coordinates, as returned by ArcGIS queries made with `quantizationParameters`.
+
+Quantized x and y values are integer offsets from the transform's `translate` origin in units of its `scale`, with y
+pointing down from an upper-left origin (the default) or up from a lower-left origin. The vertices of each path, ring
+or multipoint are delta-encoded: the first vertex is absolute and each following vertex is relative to the previous
+one. Points are not delta-encoded. Other dimensions (z, m) are not quantized.
+"""
+
+from terraformer.common import BBox, LineStringCoords, MultiLineStringCoords, coordinates_contain_point
+from terraformer.packed import unpack
+from .helpers import ring_is_clockwise
+
+_COORDINATE_KEYS = ("points", "paths", "rings")
+
+
+def quantization_transform(extent: BBox, tolerance: float, origin_position: str = "upperLeft") -> dict:
+    """Build an Esri JSON transform that quantizes coordinates within `extent` to a grid of `tolerance` units
+
+    Args:
+        extent (BBox): Extent of the coordinates to quantize, as (xmin, ymin, xmax, ymax)
+        tolerance (float): Grid cell size, in coordinate units
+        origin_position (str, optional): "upperLeft" or "lowerLeft". Defaults to "upperLeft".
+
+    Raises:
+        ValueError: If `tolerance` is not positive or `origin_position` is not recognized
+
+    Returns:
+        dict: Esri JSON transform object
+    """
+    if tolerance <= 0:
+        raise ValueError(f"Quantization tolerance must be positive, got {tolerance}")
+    xmin, ymin, _, ymax = extent
+    if origin_position == "upperLeft":
+        translate = [xmin, ymax]
+    elif origin_position == "lowerLeft":
+        translate = [xmin, ymin]
+    else:
+        raise ValueError(f"Unknown quantization origin position: {origin_position}")
+    return {"originPosition": origin_position, "scale": [tolerance, tolerance], "translate": translate}
+
+
+def dequantize_geometry(geometry: dict, transform: dict) -> dict:
+    """Convert the quantized coordinates of an Esri JSON geometry to real coordinates
+
+    Args:
+        geometry (dict): Esri JSON object. Objects without `x`/`y`, `points`, `paths` or `rings` are returned as is.
+            Coordinates may be nested lists or PackedCoordinates.
+        transform (dict): Esri JSON transform object
+
+    Returns:
+        dict: Shallow copy of `geometry` with new, real coordinate lists (or `geometry` itself if it has no coordinates)
+    """
+    x_scale, y_scale, x_translate, y_translate = _transform_parameters(transform)
+    result = None
+    if isinstance(x := geometry.get("x"), (int, float)) and isinstance(y := geometry.get("y"), (int, float)):
+        result = geometry.copy()
+        result["x"] = x * x_scale + x_translate
+        result["y"] = y * y_scale + y_translate
+    for key in _COORDINATE_KEYS:
+        if parts := unpack(geometry.get(key)):
+            result = result or geometry.copy()
+            if key == "points":
+                result[key] = _dequantize_path(parts, x_scale, y_scale, x_translate, y_translate)
+            else:
+                result[key] = [_dequantize_path(part, x_scale, y_scale, x_translate, y_translate) for part in parts]
+    return geometry if result is None else result
+
+
+def quantize_geometry(geometry: dict, transform: dict) -> dict:
+    """Convert the real coordinates of an Esri JSON geometry to quantized, delta-encoded coordinates. Consecutive
+    vertices that fall in the same grid cell are merged, keeping the last vertex of each part so that rings stay
+    closed. Paths left with fewer than 2 vertices and rings left with fewer than 4 are dropped, along with the rings
+    inside a dropped outer ring, so a geometry whose parts all collapse becomes empty.
+
+    Args:
+        geometry (dict): Esri JSON geometry object
+        transform (dict): Esri JSON transform object
+
+    Returns:
+        dict: Shallow copy of `geometry` with new, quantized coordinate lists
+    """
+    x_scale, y_scale, x_translate, y_translate = _transform_parameters(transform)
+    result = geometry.copy()
+    if isinstance(x := geometry.get("x"), (int, float)) and isinstance(y := geometry.get("y"), (int, float)):
+        result["x"] = round((x - x_translate) / x_scale)
+        result["y"] = round((y - y_translate) / y_scale)
+    for key in _COORDINATE_KEYS:
+        if parts := geometry.get(key):
+            if key == "points":
+                result[key] = _quantize_path(parts, x_scale, y_scale, x_translate, y_translate)
+            elif key == "paths":
+                paths = [_quantize_path(part, x_scale, y_scale, x_translate, y_translate) for part in parts]
+                result[key] = [path for path in paths if len(path) >= 2]
+            else:
+                result[key] = _quantize_rings(parts, x_scale, y_scale, x_translate, y_translate)
+    return result
+
+
+def _transform_parameters(transform: dict) -> tuple[float, float, float, float]:
+    """Get the x scale, signed y scale, x translation and y translation of a transform, so that real coordinates are
+    `x = X * x_scale + x_translate` and `y = Y * y_scale + y_translate` for quantized coordinates X and Y"""
+    x_scale, y_scale, *_ = transform["scale"]
+    x_translate, y_translate, *_ = transform["translate"]
+    if transform.get("originPosition", "upperLeft") == "upperLeft":
+        y_scale = -y_scale
+    return x_scale, y_scale, x_translate, y_translate
+
+
+def _dequantize_path(
+    path: LineStringCoords, x_scale: float, y_scale: float, x_translate: float, y_translate: float
+) -> LineStringCoords:
+    """Decode a delta-encoded, quantized path into a new list of real coordinates"""
+    output = []
+    x = y = 0
+    for point in path:
+        x += point[0]
+        y += point[1]
+        vertex = [x * x_scale + x_translate, y * y_scale + y_translate]
+        if len(point) > 2:
+            vertex.extend(point[2:])
+        output.append(vertex)
+    return output
+
+
+def _quantize_rings(
+    rings: MultiLineStringCoords, x_scale: float, y_scale: float, x_translate: float, y_translate: float
+) -> MultiLineStringCoords:
+    """Quantize the rings of a polygon, dropping rings that collapse to fewer than 4 vertices, and the rings inside
+    collapsed outer (clockwise) rings"""
+    quantized = [_quantize_path(ring, x_scale, y_scale, x_translate, y_translate) for ring in rings]
+    collapsed_outer_rings = [
+        ring for ring, output in zip(rings, quantized) if len(output) < 4 and ring_is_clockwise(ring)
+    ]
+    return [
+        output
+        for ring, output in zip(rings, quantized)
+        if len(output) >= 4
+        and not any(coordinates_contain_point(outer_ring, ring[0]) for outer_ring in collapsed_outer_rings)
+    ]
+
+
+def _quantize_path(
+    path: LineStringCoords, x_scale: float, y_scale: float, x_translate: float, y_translate: float
+) -> LineStringCoords:
+    """Encode a path of real coordinates into a new list of quantized, delta-encoded coordinates"""
+    vertices = []
+    last = len(path) - 1
+    for i, point in enumerate(path):
+        vertex = [round((point[0] - x_translate) / x_scale), round((point[1] - y_translate) / y_scale)]
+        if vertices and vertex[0] == vertices[-1][0] and vertex[1] == vertices[-1][1]:
+            if i != last:
+                continue  # Same grid cell as the previous vertex
+            vertices.pop()  # The last vertex replaces the previous one, so rings stay closed
+        if len(point) > 2:
+            vertex.extend(point[2:])
+        vertices.append(vertex)
+    previous_x = previous_y = 0
+    for vertex in vertices:
+        x, y = vertex[0], vertex[1]
+        vertex[0] = x - previous_x
+        vertex[1] = y - previous_y
+        previous_x, previous_y = x, y
+    return vertices
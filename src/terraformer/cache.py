@@ -0,0 +1,163 @@
+"""Bounded LRU cache of converted geometries, for inputs that repeat the same geometry many times"""
+
+import marshal
+import sys
+import threading
+from collections import OrderedDict
+from collections.abc import Callable
+from hashlib import blake2b
+
+from terraformer.stats import current_stats
+
+# Marshal format version 3+ flags objects referenced more than once, which makes the output depend on reference counts.
+# Version 2 serializes equal objects identically.
+_MARSHAL_VERSION = 2
+# Approximate memory used by a cache entry besides its value (fingerprint and OrderedDict node)
+_ENTRY_OVERHEAD = 120
+
+
+class GeometryCache:
+    """Least-recently-used cache of converted geometries, keyed by a fingerprint of the input geometry and the
+    conversion options that affect it. Geometries that can't be fingerprinted (e.g. PackedCoordinates or NumPy arrays)
+    bypass the cache.
+
+    Hits follow the converters' `copy` option: with `copy=True` every hit gets its own geometry dict and coordinate
+    lists down to the ring/path level, which can be modified safely, while the innermost point lists are shared with
+    the cache (just as converted geometries share them with their input). With `copy=False` hits return the cached
+    geometry itself, which must not be modified. A deep copy per hit would cost about as much as converting again.
+
+    Fingerprinting a geometry costs about as much as converting a simple GeoJSON geometry to Esri JSON, so the cache
+    mostly pays off converting Esri JSON polygons (whose rings need orienting and holes need assigning) to GeoJSON.
+
+    Pass a cache to `arcgis_to_geojson(..., cache=cache)` or `geojson_to_arcgis(..., cache=cache)`. A cache may be
+    shared between threads. It is not shared between processes: pickling it (e.g. to send it to a worker process)
+    creates an empty cache with the same budgets.
+
+    Args:
+        max_entries (int, optional): Maximum number of cached geometries. Defaults to 10,000.
+        max_bytes (int, optional): Approximate maximum memory used by cached geometries. Defaults to 64 MiB.
+    """
+
+    def __init__(self, max_entries: int = 10_000, max_bytes: int = 64 << 20):
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.uncacheable = 0
+        self._entries = OrderedDict()
+        self._bytes = 0
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def __reduce__(self):
+        return type(self), (self.max_entries, self.max_bytes)
+
+    @property
+    def nbytes(self) -> int:
+        """int: Approximate memory used by cached geometries"""
+        return self._bytes
+
+    def get_or_convert(self, key: tuple, convert: Callable[[], dict], copy: bool = True) -> dict:
+        """Get a cached conversion result, or convert and cache it
+
+        Args:
+            key (tuple): Input geometry along with the direction and options of the conversion. Must consist of
+                dicts, lists, tuples, strings, numbers, booleans and None to be fingerprinted.
+            convert (Callable[[], dict]): Function that converts the geometry
+            copy (bool, optional): Return a copy of the cached geometry's containers rather than the cached geometry
+                itself. Defaults to True.
+
+        Returns:
+            dict: Converted geometry
+        """
+        try:
+            fingerprint = blake2b(marshal.dumps(key, _MARSHAL_VERSION), digest_size=16).digest()
+        except ValueError:
+            with self._lock:
+                self.uncacheable += 1
+            return convert()
+
+        with self._lock:
+            value = self._entries.get(fingerprint)
+            if value is not None:
+                self._entries.move_to_end(fingerprint)
+                self.hits += 1
+            else:
+                self.misses += 1
+        if (stats := current_stats()) is not None:
+            stats.count("cache_hits" if value is not None else "cache_misses")
+        if value is None:
+            result = convert()
+            self._store(fingerprint, result)
+        else:
+            result = value[0]
+        return _copy_containers(result) if copy else result
+
+    def _store(self, fingerprint: bytes, result: dict):
+        """Add an entry, evicting least recently used entries to stay within the budgets"""
+        size = _sizeof(result) + _ENTRY_OVERHEAD
+        if size > self.max_bytes or self.max_entries < 1:
+            return
+        with self._lock:
+            if (previous := self._entries.pop(fingerprint, None)) is not None:
+                self._bytes -= previous[1]
+            self._entries[fingerprint] = (result, size)
+            self._bytes += size
+            while len(self._entries) > self.max_entries or self._bytes > self.max_bytes:
+                _, (_, evicted_size) = self._entries.popitem(last=False)
+                self._bytes -= evicted_size
+                self.evictions += 1
+
+    def clear(self):
+        """Remove all cached geometries and reset the statistics"""
+        with self._lock:
+            self._entries.clear()
+            self._bytes = 0
+            self.hits = self.misses = self.evictions = self.uncacheable = 0
+
+    def info(self) -> dict:
+        """Get the cache's statistics
+
+        Returns:
+            dict: Hits, misses, hit rate, evictions, uncacheable geometries, entries and bytes used
+        """
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": self.hits / lookups if lookups else None,
+                "evictions": self.evictions,
+                "uncacheable": self.uncacheable,
+                "entries": len(self._entries),
+                "bytes": self._bytes,
+                "max_entries": self.max_entries,
+                "max_bytes": self.max_bytes,
+            }
+
+
+def _copy_containers(value):
+    """Copy a converted geometry's dicts and coordinate lists, sharing its point lists and scalars"""
+    if isinstance(value, dict):
+        return {key: _copy_containers(item) for key, item in value.items()}
+    if isinstance(value, list) and value and isinstance(value[0], list):
+        if isinstance(value[0][0], list):
+            return [_copy_containers(item) for item in value]
+        return value[:]  # List of points
+    return value
+
+
+def _sizeof(value) -> int:
+    """Approximate the memory used by a converted geometry"""
+    if isinstance(value, dict):
+        return sys.getsizeof(value) + sum(sys.getsizeof(key) + _sizeof(item) for key, item in value.items())
+    if isinstance(value, list):
+        if value and not isinstance(value[0], (list, dict)):
+            return sys.getsizeof(value) + len(value) * sys.getsizeof(value[0])  # Point
+        return sys.getsizeof(value) + sum(_sizeof(item) for item in value)
+    if hasattr(value, "nbytes"):  # PackedCoordinates
+        return value.nbytes
+    return sys.getsizeof(value)
@@ -1,13 +1,149 @@
 """Shared Terraformer utility functions and type aliases"""
 
+from operator import itemgetter
 from typing import TypeAlias
 
+from terraformer import vectorized
+from terraformer.stats import current_stats
+
 PointCoords: TypeAlias = list[float]  # [x, y, ?z]
 MultiPointCoords: TypeAlias = list[PointCoords]
 LineStringCoords: TypeAlias = list[PointCoords]
 MultiLineStringCoords: TypeAlias = list[LineStringCoords]
 PolygonCoords: TypeAlias = list[LineStringCoords]
 MultiPolygonCoords: TypeAlias = list[PolygonCoords]
+BBox: TypeAlias = tuple[float, float, float, float]  # (xmin, ymin, xmax, ymax)
+
+# Below this many edge pairs, checking every pair is faster than sorting edges for a sweep
+_SWEEP_MIN_EDGE_PAIRS = 16
+
+
+class BBoxIndex:
+    """Uniform grid index of bounding boxes, used to narrow down which rings can possibly contain or intersect another
+    ring before running exact (and much more expensive) geometric tests.
+
+    The grid is laid out on the first query, with cells the average width and height of the boxes indexed so far.
+    Each box is listed in every cell it overlaps, so a containment query only looks at the boxes of the cell holding
+    the query's lower left corner, and an intersection query at those of the cells it overlaps. Boxes overlapping
+    more than `_MAX_CELLS` cells (e.g. one outer ring around many holes), or with non-finite bounds, are kept apart and
+    checked by every query. Boxes inserted after the first query are added to the grid as is.
+    """
+
+    _MAX_CELLS = 64  # Per box, beyond which it's checked by every query instead
+
+    def __init__(self):
+        self._entries = []  # (key, bbox), in insertion order
+        self._cells = None  # {(column, row): [(key, bbox), ...]}, once laid out
+        self._large = []  # Entries checked by every query
+        self._cell_width = self._cell_height = 1.0
+
+    def insert(self, key: int, bbox: BBox):
+        """Add a bounding box to the index
+
+        Args:
+            key (int): Key identifying the bounding box, returned by queries
+            bbox (BBox): Bounding box to add
+        """
+        self._entries.append((key, bbox))
+        if self._cells is not None:
+            self._add_to_grid((key, bbox))
+
+    def containing(self, bbox: BBox) -> list[int]:
+        """Find the indexed bounding boxes that contain `bbox` (boundaries included)
+
+        Args:
+            bbox (BBox): Bounding box to query
+
+        Returns:
+            list[int]: Keys of matching bounding boxes, in descending order
+        """
+        xmin, ymin, xmax, ymax = bbox
+        if (cell := self._cell(xmin, ymin)) is None:
+            candidates = self._entries
+        else:
+            candidates = [*self._cells.get(cell, ()), *self._large]
+        keys = [
+            key
+            for key, (b_xmin, b_ymin, b_xmax, b_ymax) in candidates
+            if b_xmin <= xmin and b_xmax >= xmax and b_ymin <= ymin and b_ymax >= ymax
+        ]
+        keys.sort(reverse=True)
+        return keys
+
+    def intersecting(self, bbox: BBox) -> list[int]:
+        """Find the indexed bounding boxes that intersect or touch `bbox`
+
+        Args:
+            bbox (BBox): Bounding box to query
+
+        Returns:
+            list[int]: Keys of matching bounding boxes, in descending order
+        """
+        xmin, ymin, xmax, ymax = bbox
+        cells = self._cell_range(bbox)
+        if cells is None or len(cells[0]) * len(cells[1]) > self._MAX_CELLS:
+            candidates = self._entries
+        else:
+            grid = self._cells
+            candidates = [entry for column in cells[0] for row in cells[1] for entry in grid.get((column, row), ())]
+            candidates += self._large
+        keys = {
+            key
+            for key, (b_xmin, b_ymin, b_xmax, b_ymax) in candidates
+            if b_xmin <= xmax and b_xmax >= xmin and b_ymin <= ymax and b_ymax >= ymin
+        }
+        return sorted(keys, reverse=True)
+
+    def _layout(self):
+        """Size the grid's cells from the boxes indexed so far, and add them to it"""
+        self._cells = {}
+        if self._entries:
+            width = height = 0.0
+            for _, (xmin, ymin, xmax, ymax) in self._entries:
+                width += xmax - xmin
+                height += ymax - ymin
+            # Degenerate (or non-finite) averages leave the cells at their default size
+            if 0 < (width := width / len(self._entries)) < float("inf"):
+                self._cell_width = width
+            if 0 < (height := height / len(self._entries)) < float("inf"):
+                self._cell_height = height
+        for entry in self._entries:
+            self._add_to_grid(entry)
+
+    def _add_to_grid(self, entry: tuple[int, BBox]):
+        """List an entry in the cells its box overlaps, or apart from the grid if there are too many of them"""
+        cells = self._cell_range(entry[1], layout=False)
+        if cells is None or len(cells[0]) * len(cells[1]) > self._MAX_CELLS:
+            self._large.append(entry)
+            return
+        grid = self._cells
+        for column in cells[0]:
+            for row in cells[1]:
+                if (cell := grid.get((column, row))) is None:
+                    grid[(column, row)] = [entry]
+                else:
+                    cell.append(entry)
+
+    def _cell(self, x: float, y: float) -> tuple[int, int] | None:
+        """Get the cell holding a point (laying out the grid if needed), or None if the point isn't finite"""
+        if self._cells is None:
+            self._layout()
+        try:
+            return int(x // self._cell_width), int(y // self._cell_height)
+        except (OverflowError, ValueError):  # Infinite or NaN
+            return None
+
+    def _cell_range(self, bbox: BBox, layout: bool = True) -> tuple[range, range] | None:
+        """Get the columns and rows of the cells a box overlaps, or None if its bounds aren't finite"""
+        if layout and self._cells is None:
+            self._layout()
+        xmin, ymin, xmax, ymax = bbox
+        try:
+            columns = range(int(xmin // self._cell_width), int(xmax // self._cell_width) + 1)
+            rows = range(int(ymin // self._cell_height), int(ymax // self._cell_height) + 1)
+        except (OverflowError, ValueError):  # Infinite or NaN
+            return None
+        return columns, rows
 
 
 def array_intersects_array(a: LineStringCoords, b: LineStringCoords) -> bool:
@@ -20,11 +156,90 @@ def array_intersects_array(a: LineStringCoords, b: LineStringCoords) -> bool:
     Returns:
         bool: True if arrays intersect, False if not
     """
-    for i in range(len(a) - 1):
-        for j in range(len(b) - 1):
-            if _edge_intersects_edge(a[i], a[i + 1], b[j], b[j + 1]):
-                return True
-    return False
+    stats = current_stats()
+    pairs = (len(a) - 1) * (len(b) - 1)
+    if vectorized.is_array(a) and vectorized.is_array(b):
+        if (result := vectorized.array_intersects_array(a, b)) is not None:
+            if stats is not None:
+                stats.count("edge_comparisons", pairs)
+            return result
+    if pairs < _SWEEP_MIN_EDGE_PAIRS:
+        for i in range(len(a) - 1):
+            for j in range(len(b) - 1):
+                if _edge_intersects_edge(a[i], a[i + 1], b[j], b[j + 1]):
+                    if stats is not None:
+                        stats.count("edge_comparisons", i * (len(b) - 1) + j + 1)
+                    return True
+        if stats is not None:
+            stats.count("edge_comparisons", pairs)
+        return False
+    result, comparisons = _sweep_intersects(a, b)
+    if stats is not None:
+        stats.count("edge_comparisons", comparisons)
+    return result
+
+
+def _sweep_intersects(a: LineStringCoords, b: LineStringCoords) -> tuple[bool, int]:
+    """Checks if two arrays of coordinates intersect by sweeping a vertical line across their edges in order of
+    minimum x. Only edges of opposite arrays whose x-intervals overlap the sweep line at the same time, and whose
+    bounding boxes overlap, are compared with `_edge_intersects_edge`. Bounding box comparisons are inclusive, so
+    edges that merely touch are still compared exactly as in the nested loop.
+
+    Args:
+        a (LineStringCoords): First array of coordinates
+        b (LineStringCoords): Second array of coordinates
+
+    Returns:
+        tuple[bool, int]: True if arrays intersect, False if not, and the number of exact edge comparisons made
+    """
+    comparisons = 0
+    edges = _sweep_edges(a, 0) + _sweep_edges(b, 1)
+    edges.sort(key=itemgetter(0))
+    active = ([], [])
+    for edge in edges:
+        xmin, _, ymin, ymax, p1, p2, side = edge
+        still_active = []
+        for other in active[1 - side]:
+            if other[1] < xmin:
+                continue  # Other edge ends before the sweep line, so it can't intersect this or any later edge
+            still_active.append(other)
+            if other[2] <= ymax and other[3] >= ymin:
+                comparisons += 1
+                if _edge_intersects_edge(p1, p2, other[4], other[5]):
+                    return True, comparisons
+        active[1 - side][:] = still_active
+        active[side].append(edge)
+    return False, comparisons
+
+
+def _sweep_edges(coordinates: LineStringCoords, side: int) -> list[tuple]:
+    """Build (xmin, xmax, ymin, ymax, start, end, side) tuples for each edge of an array of coordinates"""
+    edges = []
+    for i in range(len(coordinates) - 1):
+        p1 = coordinates[i]
+        p2 = coordinates[i + 1]
+        x1, y1, *_ = p1
+        x2, y2, *_ = p2
+        if x1 > x2:
+            x1, x2 = x2, x1
+        if y1 > y2:
+            y1, y2 = y2, y1
+        edges.append((x1, x2, y1, y2, p1, p2, side))
+    return edges
+
+
+def coordinates_bbox(coordinates: LineStringCoords) -> BBox:
+    """Compute the bounding box of an array of coordinates
+
+    Args:
+        coordinates (LineStringCoords): Array of coordinates
+
+    Returns:
+        BBox: Bounding box as (xmin, ymin, xmax, ymax)
+    """
+    xs = [point[0] for point in coordinates]
+    ys = [point[1] for point in coordinates]
+    return min(xs), min(ys), max(xs), max(ys)
 
 
 def coordinates_contain_point(coordinates: LineStringCoords, point: PointCoords) -> bool:
@@ -37,6 +252,9 @@ def coordinates_contain_point(coordinates: LineStringCoords, point: PointCoords)
     Returns:
         bool: True if point is contained, False if not
     """
+    if vectorized.is_array(coordinates) or (vectorized.available and len(coordinates) >= vectorized.MIN_VERTICES):
+        if (result := vectorized.coordinates_contain_point(coordinates, point)) is not None:
+            return result
     contains = False
     x_p, y_p, *_ = point
     for i in range(n := len(coordinates)):
@@ -68,6 +286,136 @@ def points_equal(a: PointCoords, b: PointCoords) -> bool:
     return True
 
 
+def round_point(point: PointCoords, precision: int) -> PointCoords:
+    """Round a point's x and y to `precision` decimal places. Other dimensions (z, m) are kept as is.
+
+    Args:
+        point (PointCoords): Input point
+        precision (int): Number of decimal places
+
+    Raises:
+        ValueError: If `precision` is negative
+
+    Returns:
+        PointCoords: New, rounded point
+    """
+    scale = _precision_scale(precision)
+    return [round(point[0] * scale) / scale, round(point[1] * scale) / scale, *point[2:]]
+
+
+def round_path(path: LineStringCoords, precision: int) -> LineStringCoords:
+    """Round a path's x and y coordinates to `precision` decimal places, dropping vertices that become identical to
+    the previous vertex. A path of two or more vertices that collapses to a single position keeps two copies of it, so
+    it's still a valid LineString. Rings stay closed unless they collapse, and should be passed through `close_ring`.
+
+    Args:
+        path (LineStringCoords): Input path or ring
+        precision (int): Number of decimal places
+
+    Raises:
+        ValueError: If `precision` is negative
+
+    Returns:
+        LineStringCoords: New, rounded path
+    """
+    scale = _precision_scale(precision)
+    output = []
+    previous = None
+    for point in path:
+        # Rounding the scaled value is ~2x faster than round(value, precision), and dividing the resulting integer by
+        # a power of ten gives the float closest to the rounded decimal, so it serializes just as short
+        vertex = [round(point[0] * scale) / scale, round(point[1] * scale) / scale]
+        if len(point) > 2:
+            vertex.extend(point[2:])
+        if vertex != previous:
+            output.append(vertex)
+            previous = vertex
+    if len(output) < len(path):
+        if len(output) == 1:
+            output.append(output[0][:])
+        if (stats := current_stats()) is not None:
+            stats.count("vertices_merged", len(path) - len(output))
+    return output
+
+
+def simplify_path(path: LineStringCoords, tolerance: float) -> LineStringCoords:
+    """Simplify a path or ring with the Douglas-Peucker algorithm: vertices are dropped unless they're further than
+    `tolerance` from the line between the vertices kept on either side. The first and last vertices are always kept,
+    so rings stay closed; rings simplified to fewer than 4 vertices should be dropped. Only x and y are considered.
+
+    The algorithm runs with an explicit stack rather than recursion, so paths of any length can be simplified.
+
+    Args:
+        path (LineStringCoords): Input path or ring
+        tolerance (float): Maximum distance of dropped vertices from the simplified path, in coordinate units
+
+    Raises:
+        ValueError: If `tolerance` is negative
+
+    Returns:
+        LineStringCoords: New list of the kept vertices (which are shared with `path`)
+    """
+    if tolerance < 0:
+        raise ValueError(f"Simplification tolerance must not be negative, got {tolerance}")
+    if len(path) < 3:
+        return path[:]
+    keep = [False] * len(path)
+    keep[0] = keep[-1] = True
+    sq_tolerance = tolerance * tolerance
+    xy = vectorized.as_xy(path) if vectorized.available and len(path) >= vectorized.MIN_VERTICES else None
+    stack = [(0, len(path) - 1)]
+    while stack:
+        first, last = stack.pop()
+        # NumPy only pays off for long spans; the many short spans near the end are faster in pure Python
+        if xy is not None and last - first > vectorized.MIN_VERTICES:
+            index = vectorized.farthest_vertex(xy, first, last, sq_tolerance)
+        else:
+            index = _farthest_vertex(path, first, last, sq_tolerance)
+        if index is not None:
+            keep[index] = True
+            stack.append((first, index))
+            stack.append((index, last))
+
+    output = [point for point, kept in zip(path, keep) if kept]
+    if len(output) < len(path) and (stats := current_stats()) is not None:
+        stats.count("vertices_simplified", len(path) - len(output))
+    return output
+
+
+def _farthest_vertex(path: LineStringCoords, first: int, last: int, sq_tolerance: float) -> int | None:
+    """Find the vertex between `first` and `last` furthest from the segment between them, if it's further than the
+    tolerance (see `simplify_path`)"""
+    x_a, y_a, *_ = path[first]
+    x_b, y_b, *_ = path[last]
+    dx = x_b - x_a
+    dy = y_b - y_a
+    length = dx * dx + dy * dy
+    max_distance = sq_tolerance
+    index = None
+    for i in range(first + 1, last):
+        x_p, y_p, *_ = path[i]
+        # Squared distance from the vertex to the nearest point of the segment (or to its start, if it's a point)
+        t = ((x_p - x_a) * dx + (y_p - y_a) * dy) / length if length else 0.0
+        if t < 0:
+            t = 0.0
+        elif t > 1:
+            t = 1.0
+        x_d = x_a + t * dx - x_p
+        y_d = y_a + t * dy - y_p
+        distance = x_d * x_d + y_d * y_d
+        if distance > max_distance:
+            max_distance = distance
+            index = i
+    return index
+
+
+def _precision_scale(precision: int) -> float:
+    """Get the factor that scales coordinates rounded to `precision` decimal places to integers"""
+    if precision < 0:
+        raise ValueError(f"Coordinate precision must not be negative, got {precision}")
+    return 10.0**precision
+
+
 def _edge_intersects_edge(a1: PointCoords, a2: PointCoords, b1: PointCoords, b2: PointCoords) -> bool:
     """Checks if two edges intersect
 
@@ -0,0 +1,125 @@
+"""Pluggable JSON parsing and serialization, using the fastest installed backend (orjson, then ujson, then the
+standard library `json` module) unless one is selected with `set_json_backend`"""
+
+import json
+
+from terraformer.lazy import LazyValue
+from terraformer.packed import PackedCoordinates
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+try:
+    import ujson
+except ImportError:
+    ujson = None
+
+BACKENDS = ("orjson", "ujson", "json")
+
+
+def _default(obj):
+    """Serialize objects the JSON backends don't support natively"""
+    if isinstance(obj, PackedCoordinates):
+        return obj.to_coordinates()
+    if isinstance(obj, LazyValue):  # Pending values of LazyFeatures, which the backends read without resolving
+        return obj.resolve()
+    if hasattr(obj, "tolist"):  # NumPy arrays and scalars
+        return obj.tolist()
+    raise TypeError(f"Object of type {type(obj).__name__} is not JSON serializable")
+
+
+def _orjson_dumps(obj) -> bytes:
+    return orjson.dumps(obj, default=_default)
+
+
+def _ujson_dumps(obj) -> bytes:
+    return ujson.dumps(obj, ensure_ascii=False, escape_forward_slashes=False, default=_default).encode("utf-8")
+
+
+def _json_dumps(obj) -> bytes:
+    return json.dumps(obj, ensure_ascii=False, separators=(",", ":"), default=_default).encode("utf-8")
+
+
+_IMPLEMENTATIONS = {
+    "orjson": (orjson and orjson.loads, _orjson_dumps),
+    "ujson": (ujson and ujson.loads, _ujson_dumps),
+    "json": (json.loads, _json_dumps),
+}
+# Selected backend, kept in one mutable mapping so `set_json_backend` doesn't rebind module globals
+_selected = {"name": "json", "loads": json.loads, "dumps": _json_dumps}
+
+
+def available_backends() -> list[str]:
+    """List the installed JSON backends, fastest first
+
+    Returns:
+        list[str]: Names of installed backends
+    """
+    return [name for name in BACKENDS if _IMPLEMENTATIONS[name][0] is not None]
+
+
+def set_json_backend(name: str = None):
+    """Select the JSON backend used by `loads` and `dumps`
+
+    Args:
+        name (str, optional): "orjson", "ujson" or "json". Defaults to None, which selects the fastest installed
+            backend.
+
+    Raises:
+        ValueError: If the backend is unknown or not installed
+    """
+    if name is None:
+        name = available_backends()[0]
+    if name not in _IMPLEMENTATIONS:
+        raise ValueError(f"Unknown JSON backend: {name}")
+    if _IMPLEMENTATIONS[name][0] is None:
+        raise ValueError(f"JSON backend {name} is not installed")
+    _selected["name"] = name
+    _selected["loads"], _selected["dumps"] = _IMPLEMENTATIONS[name]
+
+
+def get_json_backend() -> str:
+    """Get the name of the selected JSON backend
+
+    Returns:
+        str: "orjson", "ujson" or "json"
+    """
+    return _selected["name"]
+
+
+def loads(data: bytes | bytearray | memoryview | str):
+    """Parse JSON with the selected backend
+
+    Args:
+        data (bytes | bytearray | memoryview | str): JSON document
+
+    Raises:
+        ValueError: If `data` is not valid JSON (each backend raises its own ValueError subclass)
+
+    Returns:
+        Parsed JSON value
+    """
+    if isinstance(data, memoryview):
+        data = data.tobytes()
+    return _selected["loads"](data)
+
+
+def dumps(obj) -> bytes:
+    """Serialize to compact, UTF-8 encoded JSON with the selected backend. PackedCoordinates are serialized as nested
+    coordinate lists, and LazyFeatures as the dicts they resolve to.
+
+    Args:
+        obj: JSON-serializable object
+
+    Raises:
+        TypeError: If `obj` contains objects that can't be serialized
+
+    Returns:
+        bytes: JSON document
+    """
+    return _selected["dumps"](obj)
+
+
+set_json_backend()
@@ -0,0 +1,229 @@
+"""Incremental scanning of large JSON documents without parsing them in full"""
+
+import json
+import mmap
+import re
+from collections.abc import Iterator
+
+_QUOTE = ord('"')
+_BACKSLASH = ord("\\")
+_OPENERS = (ord("{"), ord("["))
+_WHITESPACE = b" \t\r\n"
+
+# Only the bracket type that opened a container affects its depth, so objects are scanned for quotes and braces only
+# and arrays for quotes and square brackets only. This skips the many brackets of coordinate arrays inside features.
+_OBJECT_STRUCTURE = re.compile(rb'["{}]')
+_ARRAY_STRUCTURE = re.compile(rb'["\[\]]')
+_STRING_END = re.compile(rb'["\\]')
+_SCALAR_END = re.compile(rb"[\s,\]}]")
+
+
+class JSONScanError(ValueError):
+    # Custom exception for malformed or truncated JSON documents
+    pass
+
+
+class JSONScanner:
+    """Scans a JSON object document member by member, yielding the raw bytes of each value so that only one value has
+    to be held in memory at a time. Elements of one designated array member (e.g. "features") are yielded one by one.
+
+    Args:
+        source: A binary or text file object to read incrementally, or a bytes-like object (bytes, bytearray, mmap)
+            that is already fully addressable
+        chunk_size (int, optional): Number of bytes/characters to read from a file object at a time. Defaults to 64 KiB.
+    """
+
+    def __init__(self, source, chunk_size: int = 1 << 16):
+        if hasattr(source, "read") and not isinstance(source, mmap.mmap):
+            self._stream = source
+            self._buf = bytearray()
+        else:
+            self._stream = None
+            self._buf = source
+        self._chunk_size = chunk_size
+        self._pos = 0
+        self._offset = 0  # Absolute offset of self._buf[0] within the document
+
+    def iter_members(self, array_key: str = "features") -> Iterator[tuple[str, bytes]]:
+        """Iterate over the members of the top-level JSON object
+
+        Args:
+            array_key (str, optional): Key of the array member whose elements should be yielded individually.
+                Defaults to "features".
+
+        Raises:
+            JSONScanError: If the document is not a JSON object or is malformed/truncated
+
+        Yields:
+            tuple[str, bytes]: Member key and raw JSON value (one tuple per element for the `array_key` member, and
+                none if it's not an array)
+        """
+        for key, start, end in self._iter_member_spans(array_key):
+            yield key, bytes(self._buf[start:end])
+            self._compact()
+
+    def iter_member_spans(self, array_key: str = "features") -> Iterator[tuple[str, int, int]]:
+        """Like `iter_members`, but yield the start and end offsets of each value within a bytes-like source instead
+        of copying it
+
+        Args:
+            array_key (str, optional): Key of the array member whose elements should be yielded individually.
+                Defaults to "features".
+
+        Raises:
+            JSONScanError: If the source is a file object, or the document is not a JSON object or is
+                malformed/truncated
+
+        Yields:
+            tuple[str, int, int]: Member key, and start and end offsets of the raw JSON value
+        """
+        if self._stream is not None:
+            raise JSONScanError("Spans can only be scanned in bytes-like sources")
+        yield from self._iter_member_spans(array_key)
+
+    def iter_element_spans(self, start: int, end: int) -> Iterator[tuple[int, int]]:
+        """Yield the start and end offsets of the consecutive array elements between two offsets of a bytes-like
+        source, e.g. a run of features found with `iter_member_spans`
+
+        Args:
+            start (int): Start offset of the first element
+            end (int): End offset of the last element
+
+        Raises:
+            JSONScanError: If the source is a file object, or the elements are malformed
+
+        Yields:
+            tuple[int, int]: Start and end offsets of each raw JSON element
+        """
+        if self._stream is not None:
+            raise JSONScanError("Spans can only be scanned in bytes-like sources")
+        self._pos = start
+        while self._pos < end:
+            yield self._scan_value()
+            if self._pos < end and self._next_separator(b"]"):
+                return
+
+    def _iter_member_spans(self, array_key: str) -> Iterator[tuple[str, int, int]]:
+        self._expect(b"{")
+        if self._peek() == ord("}"):
+            return
+        while True:
+            if self._peek() != _QUOTE:
+                raise JSONScanError(f"Expected object key at offset {self._offset + self._pos}")
+            start, end = self._scan_value()
+            key = json.loads(bytes(self._buf[start:end]))
+            self._expect(b":")
+            if key == array_key:
+                if self._peek() == ord("["):
+                    yield from self._iter_array_spans(key)
+                else:
+                    self._scan_value()  # Not an array (e.g. null), so it has no elements
+            else:
+                yield key, *self._scan_value()
+            if self._next_separator(b"}"):
+                return
+
+    def _iter_array_spans(self, key: str) -> Iterator[tuple[str, int, int]]:
+        self._expect(b"[")
+        if self._peek() == ord("]"):
+            self._pos += 1
+            return
+        while True:
+            yield key, *self._scan_value()
+            if self._next_separator(b"]"):
+                return
+
+    def _fill(self) -> bool:
+        """Read the next chunk from the underlying stream into the buffer. Returns False at end of input."""
+        if self._stream is None:
+            return False
+        chunk = self._stream.read(self._chunk_size)
+        if not chunk:
+            return False
+        if isinstance(chunk, str):
+            chunk = chunk.encode("utf-8")
+        self._buf += chunk
+        return True
+
+    def _compact(self):
+        """Discard already consumed input so that memory use stays flat while streaming"""
+        if self._stream is not None and self._pos >= self._chunk_size:
+            del self._buf[: self._pos]
+            self._offset += self._pos
+            self._pos = 0
+
+    def _peek(self) -> int | None:
+        """Skip whitespace and return the next byte without consuming it (None at end of input)"""
+        while True:
+            while self._pos < len(self._buf):
+                if self._buf[self._pos] not in _WHITESPACE:
+                    return self._buf[self._pos]
+                self._pos += 1
+            if not self._fill():
+                return None
+
+    def _expect(self, token: bytes):
+        if self._peek() != token[0]:
+            raise JSONScanError(f"Expected {token.decode()!r} at offset {self._offset + self._pos}")
+        self._pos += 1
+
+    def _next_separator(self, closer: bytes) -> bool:
+        """Consume a "," (returns False) or the closing bracket of the current container (returns True)"""
+        char = self._peek()
+        if char == closer[0]:
+            self._pos += 1
+            return True
+        self._expect(b",")
+        return False
+
+    def _scan_value(self) -> tuple[int, int]:
+        """Find the value starting at the current position, advance past it and return its start and end indices"""
+        if (first := self._peek()) is None:
+            raise JSONScanError("Unexpected end of input")
+        start = self._pos
+        if first == _QUOTE:
+            end = self._string_end(start + 1)
+        elif first in _OPENERS:
+            end = self._container_end(start)
+        else:
+            end = self._scalar_end(start)
+        self._pos = end
+        return start, end
+
+    def _string_end(self, i: int) -> int:
+        while True:
+            if (match := _STRING_END.search(self._buf, i)) is None:
+                i = len(self._buf)
+                if not self._fill():
+                    raise JSONScanError("Unterminated string")
+                continue
+            if self._buf[match.start()] == _BACKSLASH:
+                i = match.start() + 2  # Skip the escaped character
+                if i > len(self._buf) and not self._fill():
+                    raise JSONScanError("Unterminated string")
+                continue
+            return match.start() + 1
+
+    def _container_end(self, i: int) -> int:
+        structure = _OBJECT_STRUCTURE if self._buf[i] == _OPENERS[0] else _ARRAY_STRUCTURE
+        depth = 0
+        while True:
+            if (match := structure.search(self._buf, i)) is None:
+                i = len(self._buf)
+                if not self._fill():
+                    raise JSONScanError("Unterminated object or array")
+                continue
+            char = self._buf[match.start()]
+            if char == _QUOTE:
+                i = self._string_end(match.start() + 1)
+                continue
+            depth += 1 if char in _OPENERS else -1
+            i = match.start() + 1
+            if depth == 0:
+                return i
+
+    def _scalar_end(self, i: int) -> int:
+        while (match := _SCALAR_END.search(self._buf, i)) is None:
+            if not self._fill():
+                return len(self._buf)
+        return match.start()
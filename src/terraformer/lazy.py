@@ -0,0 +1,134 @@
+"""Dictionaries with values that are only computed when they're first accessed"""
+
+from collections.abc import Callable
+
+
+class LazyValue:
+    """Placeholder for a value computed on first use, then kept
+
+    Args:
+        compute (Callable[[], object]): Function computing the value
+    """
+
+    __slots__ = ("_compute", "_value")
+
+    def __init__(self, compute: Callable[[], object]):
+        self._compute = compute
+        self._value = None
+
+    def resolve(self):
+        """Compute the value, unless it already was
+
+        Returns:
+            The value
+        """
+        # Threads racing to resolve may each compute the value, but never see a half-resolved placeholder
+        if (compute := self._compute) is not None:
+            self._value = compute()
+            self._compute = None
+        return self._value
+
+    @property
+    def resolved(self) -> bool:
+        """bool: Whether the value has been computed"""
+        return self._compute is None
+
+    def __repr__(self) -> str:
+        return f"LazyValue({repr(self._value) if self.resolved else 'pending'})"
+
+
+class LazyFeature(dict):
+    """GeoJSON Feature whose values (e.g. `geometry`) may be LazyValue placeholders, which are resolved when they're
+    accessed (by key, `get`, `items`, `values`, `==`, ...) and replaced with their value. Otherwise it behaves like the
+    plain dict it becomes once every value is resolved, and serializes as one, with `json` and with
+    `terraformer.jsonio` (whose backends resolve placeholders they find themselves).
+
+    Keys and other values are available without resolving anything, e.g. `feature["properties"]` and
+    `"geometry" in feature`.
+    """
+
+    __slots__ = ()
+
+    def __getitem__(self, key):
+        value = dict.__getitem__(self, key)
+        if type(value) is LazyValue:
+            value = value.resolve()
+            dict.__setitem__(self, key, value)
+        return value
+
+    def get(self, key, default=None):
+        return self[key] if key in self else default
+
+    def pop(self, key, *default):
+        if key in self:
+            value = self[key]
+            del self[key]
+            return value
+        return dict.pop(self, key, *default)
+
+    def setdefault(self, key, default=None):
+        if key in self:
+            return self[key]
+        self[key] = default
+        return default
+
+    def resolve(self) -> "LazyFeature":
+        """Resolve every pending value
+
+        Returns:
+            LazyFeature: The feature itself
+        """
+        for key, value in list(dict.items(self)):
+            if type(value) is LazyValue:
+                dict.__setitem__(self, key, value.resolve())
+        return self
+
+    def is_resolved(self, key: str) -> bool:
+        """Check if a value has been computed
+
+        Args:
+            key (str): Key of the value
+
+        Returns:
+            bool: False if the value is a pending placeholder, True otherwise
+        """
+        value = dict.get(self, key)
+        return type(value) is not LazyValue or value.resolved
+
+    def items(self):
+        return dict.items(self.resolve())
+
+    def values(self):
+        return dict.values(self.resolve())
+
+    def popitem(self):
+        return dict.popitem(self.resolve())
+
+    def copy(self) -> "LazyFeature":
+        # Placeholders are shared, so each value is still only computed once
+        return LazyFeature(dict.items(self))
+
+    def __iter__(self):
+        # Not inheriting dict's iterator makes dict(feature) and {**feature} look values up through __getitem__
+        return dict.__iter__(self)
+
+    def __eq__(self, other) -> bool:
+        if isinstance(other, LazyFeature):
+            other.resolve()
+        return dict.__eq__(self.resolve(), other)
+
+    def __ne__(self, other) -> bool:
+        result = self.__eq__(other)
+        return result if result is NotImplemented else not result
+
+    def __or__(self, other):
+        return dict.__or__(self.resolve(), other)
+
+    def __ror__(self, other):
+        return dict.__ror__(self.resolve(), other)
+
+    def __repr__(self) -> str:
+        return dict.__repr__(self.resolve())
+
+    def __reduce__(self):
+        return dict, (dict(self.resolve()),)
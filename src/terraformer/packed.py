@@ -0,0 +1,154 @@
+"""Compact flat-buffer representation of nested coordinate arrays"""
+
+from array import array
+from itertools import chain
+
+from terraformer.common import LineStringCoords, MultiLineStringCoords, MultiPolygonCoords
+
+
+class PackedCoordinates:
+    """Nested coordinate arrays (LineString/MultiPoint, MultiLineString/Polygon/rings or MultiPolygon coordinates)
+    stored as one flat `array('d')` of interleaved vertex values plus offset arrays, instead of a list per vertex.
+    Each 2D vertex takes 16 bytes instead of roughly 120 as a list of floats. Quantized coordinates are stored in an
+    `array('q')` instead, so they unpack and serialize as integers.
+
+    Args:
+        coords (array): Interleaved vertex values, e.g. x0, y0, x1, y1, ...
+        dims (int): Number of values per vertex (2 for x/y, 3 for x/y/z, ...)
+        ring_offsets (array, optional): Start vertex of each ring/path plus the total vertex count (nesting depth 3+)
+        part_offsets (array, optional): Start ring of each polygon plus the total ring count (nesting depth 4)
+    """
+
+    __slots__ = ("coords", "dims", "ring_offsets", "part_offsets")
+
+    def __init__(self, coords: array, dims: int, ring_offsets: array = None, part_offsets: array = None):
+        if part_offsets is not None and ring_offsets is None:
+            raise ValueError("part_offsets require ring_offsets")
+        self.coords = coords
+        self.dims = dims
+        self.ring_offsets = ring_offsets
+        self.part_offsets = part_offsets
+
+    @classmethod
+    def from_coordinates(
+        cls, coordinates: LineStringCoords | MultiLineStringCoords | MultiPolygonCoords, typecode: str = "d"
+    ) -> "PackedCoordinates":
+        """Pack nested coordinate lists. The nesting depth is taken from the first vertex.
+
+        Args:
+            coordinates (LineStringCoords | MultiLineStringCoords | MultiPolygonCoords): Nested coordinate lists
+            typecode (str, optional): `array` typecode of the vertex values, e.g. "q" for integer (quantized)
+                coordinates. Defaults to "d".
+
+        Raises:
+            ValueError: If `coordinates` is empty, not consistently nested, or vertices have different dimensions
+            TypeError: If a vertex value can't be stored with `typecode` (e.g. a float in an integer array)
+
+        Returns:
+            PackedCoordinates: Packed coordinates
+        """
+        depth = 0
+        probe = coordinates
+        while isinstance(probe, (list, tuple)):
+            if not probe:
+                raise ValueError("Cannot pack empty coordinate arrays")
+            probe = probe[0]
+            depth += 1
+        if depth < 2 or depth > 4:
+            raise ValueError(f"Cannot pack coordinates nested {depth} levels deep")
+
+        if depth == 4:
+            part_offsets = array("q", [0])
+            rings = []
+            for polygon in coordinates:
+                rings.extend(polygon)
+                part_offsets.append(len(rings))
+        else:
+            part_offsets = None
+            rings = coordinates if depth == 3 else [coordinates]
+
+        dims = len(rings[0][0])
+        ring_offsets = array("q", [0])
+        vertex_count = 0
+        for ring in rings:
+            if any(len(vertex) != dims for vertex in ring):
+                raise ValueError(f"Cannot pack vertices with mixed dimensions (expected {dims})")
+            vertex_count += len(ring)
+            ring_offsets.append(vertex_count)
+        coords = array(typecode, chain.from_iterable(chain.from_iterable(rings)))
+        return cls(coords, dims, ring_offsets if depth >= 3 else None, part_offsets)
+
+    @property
+    def depth(self) -> int:
+        """int: Nesting depth of the equivalent coordinate lists (2, 3 or 4)"""
+        if self.part_offsets is not None:
+            return 4
+        return 3 if self.ring_offsets is not None else 2
+
+    @property
+    def vertex_count(self) -> int:
+        """int: Total number of vertices"""
+        return len(self.coords) // self.dims
+
+    @property
+    def nbytes(self) -> int:
+        """int: Number of bytes used by the coordinate and offset buffers"""
+        return sum(
+            len(buffer) * buffer.itemsize
+            for buffer in (self.coords, self.ring_offsets, self.part_offsets)
+            if buffer is not None
+        )
+
+    def to_coordinates(self) -> LineStringCoords | MultiLineStringCoords | MultiPolygonCoords:
+        """Unpack to nested coordinate lists
+
+        Returns:
+            LineStringCoords | MultiLineStringCoords | MultiPolygonCoords: Nested coordinate lists
+        """
+        flat = self.coords.tolist()
+        dims = self.dims
+        if self.ring_offsets is None:
+            return [flat[i : i + dims] for i in range(0, len(flat), dims)]
+        offsets = self.ring_offsets
+        rings = [
+            [flat[i : i + dims] for i in range(offsets[r] * dims, offsets[r + 1] * dims, dims)]
+            for r in range(len(offsets) - 1)
+        ]
+        if self.part_offsets is None:
+            return rings
+        parts = self.part_offsets
+        return [rings[parts[p] : parts[p + 1]] for p in range(len(parts) - 1)]
+
+    def __len__(self) -> int:
+        if self.part_offsets is not None:
+            return len(self.part_offsets) - 1
+        if self.ring_offsets is not None:
+            return len(self.ring_offsets) - 1
+        return self.vertex_count
+
+    def __eq__(self, other) -> bool:
+        if not isinstance(other, PackedCoordinates):
+            return NotImplemented
+        return (
+            self.dims == other.dims
+            and self.coords == other.coords
+            and self.ring_offsets == other.ring_offsets
+            and self.part_offsets == other.part_offsets
+        )
+
+    def __repr__(self) -> str:
+        return f"PackedCoordinates(depth={self.depth}, dims={self.dims}, vertices={self.vertex_count})"
+
+
+def unpack(coordinates):
+    """Return nested coordinate lists for packed or already nested coordinates
+
+    Args:
+        coordinates: PackedCoordinates or nested coordinate lists
+
+    Returns:
+        Nested coordinate lists
+    """
+    if isinstance(coordinates, PackedCoordinates):
+        return coordinates.to_coordinates()
+    return coordinates
@@ -0,0 +1,142 @@
+"""Reprojection between WGS 84 (EPSG:4326) longitude/latitude and spherical Web Mercator (EPSG:3857 and its Esri
+aliases) x/y coordinates, in meters. Only x and y are reprojected; other dimensions (z, m) are kept as is.
+
+Long paths of 2D coordinates are reprojected with NumPy when it's installed. NumPy's transcendental functions may
+differ from the `math` module's in the last bit, so results can differ by about a nanometer between the two paths."""
+
+import math
+
+from terraformer import vectorized
+from terraformer.common import LineStringCoords, PointCoords
+from terraformer.packed import unpack
+
+EARTH_RADIUS = 6378137.0  # Meters, WGS 84 semi-major axis
+MAX_LATITUDE = 85.0511287798066  # Web Mercator's latitude bounds, at which its extent is square
+WEB_MERCATOR_WKIDS = frozenset((3857, 102100, 102113, 900913))
+
+_DEGREES_PER_METER = 180 / (math.pi * EARTH_RADIUS)  # Of longitude
+_METERS_PER_DEGREE = math.pi * EARTH_RADIUS / 180
+_DEGREES_PER_HALF_RADIAN = 360 / math.pi
+_HALF_RADIANS_PER_DEGREE = math.pi / 360
+
+_COORDINATE_KEYS = ("points", "paths", "rings")
+_ENVELOPE_KEYS = ("xmin", "ymin", "xmax", "ymax")
+
+
+def is_web_mercator(spatial_reference: dict | int) -> bool:
+    """Check if an Esri JSON spatialReference object (or a WKID) is Web Mercator
+
+    Args:
+        spatial_reference (dict | int): Esri JSON spatialReference object or WKID
+
+    Returns:
+        bool: True if the spatial reference is Web Mercator, False if not
+    """
+    if isinstance(spatial_reference, dict):
+        return (
+            spatial_reference.get("wkid") in WEB_MERCATOR_WKIDS
+            or spatial_reference.get("latestWkid") in WEB_MERCATOR_WKIDS
+        )
+    return spatial_reference in WEB_MERCATOR_WKIDS
+
+
+def web_mercator_to_wgs84_point(point: PointCoords) -> PointCoords:
+    """Reproject a Web Mercator point to WGS 84
+
+    Args:
+        point (PointCoords): Web Mercator point
+
+    Returns:
+        PointCoords: New WGS 84 point
+    """
+    return [
+        point[0] * _DEGREES_PER_METER,
+        90 - math.atan(math.exp(-point[1] / EARTH_RADIUS)) * _DEGREES_PER_HALF_RADIAN,
+        *point[2:],
+    ]
+
+
+def wgs84_to_web_mercator_point(point: PointCoords) -> PointCoords:
+    """Reproject a WGS 84 point to Web Mercator. Latitudes beyond Web Mercator's bounds are clamped to them.
+
+    Args:
+        point (PointCoords): WGS 84 point
+
+    Returns:
+        PointCoords: New Web Mercator point
+    """
+    latitude = max(-MAX_LATITUDE, min(MAX_LATITUDE, point[1]))
+    return [
+        point[0] * _METERS_PER_DEGREE,
+        math.log(math.tan(math.pi / 4 + latitude * _HALF_RADIANS_PER_DEGREE)) * EARTH_RADIUS,
+        *point[2:],
+    ]
+
+
+def web_mercator_to_wgs84_path(path: LineStringCoords) -> LineStringCoords:
+    """Reproject an array of Web Mercator coordinates to WGS 84
+
+    Args:
+        path (LineStringCoords): Array of Web Mercator coordinates
+
+    Returns:
+        LineStringCoords: New array of WGS 84 coordinates
+    """
+    if vectorized.available and len(path) >= vectorized.MIN_VERTICES:
+        if (projected := vectorized.web_mercator_to_wgs84(path, EARTH_RADIUS)) is not None:
+            return projected
+    # 2D points are projected inline, saving a call and the unpacking of other dimensions per point
+    atan, exp = math.atan, math.exp
+    return [
+        (
+            [point[0] * _DEGREES_PER_METER, 90 - atan(exp(-point[1] / EARTH_RADIUS)) * _DEGREES_PER_HALF_RADIAN]
+            if len(point) == 2
+            else web_mercator_to_wgs84_point(point)
+        )
+        for point in path
+    ]
+
+
+def wgs84_to_web_mercator_path(path: LineStringCoords) -> LineStringCoords:
+    """Reproject an array of WGS 84 coordinates to Web Mercator
+
+    Args:
+        path (LineStringCoords): Array of WGS 84 coordinates
+
+    Returns:
+        LineStringCoords: New array of Web Mercator coordinates
+    """
+    if vectorized.available and len(path) >= vectorized.MIN_VERTICES:
+        if (projected := vectorized.wgs84_to_web_mercator(path, EARTH_RADIUS, MAX_LATITUDE)) is not None:
+            return projected
+    return [wgs84_to_web_mercator_point(point) for point in path]
+
+
+def web_mercator_to_wgs84_geometry(geometry: dict) -> dict:
+    """Reproject the coordinates of a Web Mercator Esri JSON geometry to WGS 84
+
+    Args:
+        geometry (dict): Esri JSON object. Objects without `x`/`y`, `points`, `paths`, `rings` or envelope bounds are
+            returned as is. Coordinates may be nested lists or PackedCoordinates.
+
+    Returns:
+        dict: Shallow copy of `geometry` with new, WGS 84 coordinate lists (or `geometry` itself if it has no
+            coordinates). The copy's `spatialReference` is not updated.
+    """
+    result = None
+    if isinstance(x := geometry.get("x"), (int, float)) and isinstance(y := geometry.get("y"), (int, float)):
+        result = geometry.copy()
+        result["x"] = x * _DEGREES_PER_METER
+        result["y"] = 90 - math.atan(math.exp(-y / EARTH_RADIUS)) * _DEGREES_PER_HALF_RADIAN
+    for key in _COORDINATE_KEYS:
+        if key in geometry and (parts := unpack(geometry[key])):
+            result = result or geometry.copy()
+            if key == "points":
+                result[key] = web_mercator_to_wgs84_path(parts)
+            else:
+                result[key] = [web_mercator_to_wgs84_path(part) for part in parts]
+    if "xmin" in geometry and all(isinstance(geometry.get(key), (int, float)) for key in _ENVELOPE_KEYS):
+        result = result or geometry.copy()
+        result["xmin"], result["ymin"] = web_mercator_to_wgs84_point([geometry["xmin"], geometry["ymin"]])
+        result["xmax"], result["ymax"] = web_mercator_to_wgs84_point([geometry["xmax"], geometry["ymax"]])
+    return geometry if result is None else result
@@ -0,0 +1,129 @@
+"""Opt-in conversion statistics for diagnosing slow conversions"""
+
+import heapq
+import threading
+from collections import Counter
+from collections.abc import Callable, Iterator
+from contextlib import contextmanager
+from contextvars import ContextVar
+
+_active_stats: ContextVar["ConversionStats | None"] = ContextVar("terraformer_conversion_stats", default=None)
+
+
+class ConversionStats:
+    """Counters and timings recorded by the converters while a `collect_stats()` block is active
+
+    Counters:
+        rings_closed: Rings whose first and last points differed and that were closed by `close_ring`
+        rings_reversed: Rings reversed by `orient_rings` because they were wound the wrong way for Esri JSON
+        holes_contained: Holes assigned to the outer ring containing them
+        holes_intersected: Holes assigned to an outer ring they intersect (no outer ring contains them)
+        holes_promoted: Holes that don't touch any outer ring and were promoted to outer rings
+        edge_comparisons: Pairs of edges compared by `array_intersects_array`
+        features: Features converted
+        features_skipped: Features left out of a conversion because they didn't match its `where` predicate
+
+    Args:
+        slowest (int, optional): Number of slowest features to keep track of. Defaults to 10.
+        on_feature (Callable, optional): Called with the ID (or None) and conversion time in seconds of every feature
+    """
+
+    def __init__(self, slowest: int = 10, on_feature: Callable[[object, float], None] = None):
+        self.counters = Counter()
+        self.timings = {}
+        self._slowest_count = slowest
+        self._slowest = []  # Min-heap of (seconds, sequence number, feature id)
+        self._sequence = 0
+        self._on_feature = on_feature
+        self._lock = threading.Lock()
+
+    def count(self, name: str, value: int = 1):
+        """Increment a counter
+
+        Args:
+            name (str): Counter name
+            value (int, optional): Amount to increment by. Defaults to 1.
+        """
+        with self._lock:
+            self.counters[name] += value
+
+    def add_time(self, name: str, seconds: float):
+        """Record the duration of one call
+
+        Args:
+            name (str): Timing name
+            seconds (float): Duration in seconds
+        """
+        with self._lock:
+            timing = self.timings.setdefault(name, {"calls": 0, "seconds": 0.0, "max_seconds": 0.0})
+            timing["calls"] += 1
+            timing["seconds"] += seconds
+            timing["max_seconds"] = max(timing["max_seconds"], seconds)
+
+    def record_feature(self, name: str, feature_id, seconds: float):
+        """Record the conversion of one feature
+
+        Args:
+            name (str): Timing name (e.g. the converter's name)
+            feature_id: ID of the feature, or None
+            seconds (float): Conversion time in seconds
+        """
+        self.add_time(name, seconds)
+        with self._lock:
+            self.counters["features"] += 1
+            self._sequence += 1
+            entry = (seconds, self._sequence, feature_id)
+            if len(self._slowest) < self._slowest_count:
+                heapq.heappush(self._slowest, entry)
+            elif self._slowest and seconds > self._slowest[0][0]:
+                heapq.heapreplace(self._slowest, entry)
+        if self._on_feature is not None:
+            self._on_feature(feature_id, seconds)
+
+    @property
+    def slowest_features(self) -> list[tuple[object, float]]:
+        """list[tuple[object, float]]: IDs and conversion times of the slowest features, slowest first"""
+        with self._lock:
+            return [(feature_id, seconds) for seconds, _, feature_id in sorted(self._slowest, reverse=True)]
+
+    def to_dict(self) -> dict:
+        """Export the statistics as plain, JSON-serializable data
+
+        Returns:
+            dict: Counters, timings and slowest features
+        """
+        slowest = [{"id": feature_id, "seconds": seconds} for feature_id, seconds in self.slowest_features]
+        with self._lock:
+            return {
+                "counters": dict(self.counters),
+                "timings": {name: dict(timing) for name, timing in self.timings.items()},
+                "slowest_features": slowest,
+            }
+
+
+@contextmanager
+def collect_stats(stats: ConversionStats = None) -> Iterator[ConversionStats]:
+    """Record conversion statistics for all conversions in the current thread/context within a `with` block. When
+    no block is active, the converters only pay for one context variable lookup per feature or polygon.
+
+    Args:
+        stats (ConversionStats, optional): Statistics object to record into. Defaults to a new ConversionStats.
+
+    Yields:
+        ConversionStats: The statistics being recorded
+    """
+    stats = stats if stats is not None else ConversionStats()
+    token = _active_stats.set(stats)
+    try:
+        yield stats
+    finally:
+        _active_stats.reset(token)
+
+
+def current_stats() -> ConversionStats | None:
+    """Get the statistics being recorded in the current context
+
+    Returns:
+        ConversionStats | None: Active statistics, or None if statistics aren't being collected
+    """
+    return _active_stats.get()
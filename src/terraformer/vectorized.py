@@ -0,0 +1,162 @@
+"""Optional NumPy-vectorized versions of the ring geometry kernels in `terraformer.common` and
+`terraformer.arcgis.helpers`, of path simplification and of the reprojections in `terraformer.projection`, used
+automatically when NumPy is installed.
+
+The kernels perform the same floating point operations in the same order as the pure-Python kernels, so results are
+identical for float coordinates (integer coordinates are computed as float64, which is exact for any real-world
+coordinate range). Copying nested Python lists into an array costs about as much as the pure-Python shoelace sum, so
+for list input only the point-in-polygon test is vectorized, and only for large rings. Coordinates that are already
+NumPy arrays skip that copy and use every vectorized kernel. Each kernel returns None when its input can't be
+converted (ragged dimensions or non-numeric values), in which case callers fall back to the pure-Python kernels."""
+
+from itertools import chain
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+available = np is not None
+
+# Minimum ring length (vertices) for which the point-in-polygon test is vectorized for list input
+MIN_VERTICES = 128
+# Number of edge pairs evaluated per block of the edge intersection matrix, to bound temporary array memory
+_BLOCK_EDGE_PAIRS = 1 << 16
+
+
+def is_array(coordinates) -> bool:
+    """Check if coordinates are already a NumPy array
+
+    Args:
+        coordinates: Array of coordinates
+
+    Returns:
+        bool: True if NumPy is available and `coordinates` is a NumPy array, False otherwise
+    """
+    return available and isinstance(coordinates, np.ndarray)
+
+
+def ring_is_clockwise(ring) -> bool | None:
+    """Vectorized shoelace sum, see `terraformer.arcgis.helpers.ring_is_clockwise`"""
+    if (xy := _as_xy(ring)) is None:
+        return None
+    x = xy[:, 0]
+    y = xy[:, 1]
+    terms = (x[1:] - x[:-1]) * (y[1:] + y[:-1])
+    # cumsum adds terms sequentially, unlike sum()'s pairwise summation, so rounding matches the pure-Python loop
+    return bool(len(terms) == 0 or np.cumsum(terms)[-1] >= 0)
+
+
+def coordinates_contain_point(coordinates, point) -> bool | None:
+    """Vectorized even-odd point-in-polygon test, see `terraformer.common.coordinates_contain_point`"""
+    if (xy := _as_xy(coordinates)) is None:
+        return None
+    x_p, y_p, *_ = point
+    x_i = xy[:, 0]
+    y_i = xy[:, 1]
+    x_j = np.roll(x_i, 1)
+    y_j = np.roll(y_i, 1)
+    crosses = ((y_i <= y_p) & (y_p < y_j)) | ((y_j <= y_p) & (y_p < y_i))
+    with np.errstate(divide="ignore", invalid="ignore"):
+        crosses &= x_p < (x_j - x_i) * (y_p - y_i) / (y_j - y_i) + x_i
+    return bool(np.count_nonzero(crosses) % 2)
+
+
+def array_intersects_array(a, b) -> bool | None:
+    """Evaluate `terraformer.common._edge_intersects_edge` for every pair of edges of `a` and `b` as a matrix of
+    vectorized operations, see `terraformer.common.array_intersects_array`"""
+    if (xy_a := _as_xy(a)) is None or (xy_b := _as_xy(b)) is None:
+        return None
+    x_b1 = xy_b[:-1, 0]
+    y_b1 = xy_b[:-1, 1]
+    x_b2 = xy_b[1:, 0]
+    y_b2 = xy_b[1:, 1]
+    rows = max(1, _BLOCK_EDGE_PAIRS // max(1, len(x_b1)))
+    for start in range(0, len(xy_a) - 1, rows):
+        block = xy_a[start : start + rows + 1]
+        x_a1 = block[:-1, 0, None]
+        y_a1 = block[:-1, 1, None]
+        x_a2 = block[1:, 0, None]
+        y_a2 = block[1:, 1, None]
+        ua_t = (x_b2 - x_b1) * (y_a1 - y_b1) - (y_b2 - y_b1) * (x_a1 - x_b1)
+        ub_t = (x_a2 - x_a1) * (y_a1 - y_b1) - (y_a2 - y_a1) * (x_a1 - x_b1)
+        u_b = (y_b2 - y_b1) * (x_a2 - x_a1) - (x_b2 - x_b1) * (y_a2 - y_a1)
+        with np.errstate(divide="ignore", invalid="ignore"):
+            u_a = ua_t / u_b
+            u_b_ratio = ub_t / u_b
+        hits = (u_b != 0) & (u_a >= 0) & (u_a <= 1) & (u_b_ratio >= 0) & (u_b_ratio <= 1)
+        if hits.any():
+            return True
+    return False
+
+
+def as_xy(coordinates):
+    """Convert an array of coordinates to an (n, 2) float64 array of x/y values
+
+    Args:
+        coordinates: Array of coordinates
+
+    Returns:
+        ndarray | None: Array of x/y values, or None if the coordinates have mixed dimensions or non-numeric values
+    """
+    return _as_xy(coordinates)
+
+
+def farthest_vertex(xy, first: int, last: int, sq_tolerance: float) -> int | None:
+    """Vectorized search for the vertex furthest from a segment, see `terraformer.common.simplify_path`"""
+    x_a, y_a = xy[first]
+    dx = xy[last, 0] - x_a
+    dy = xy[last, 1] - y_a
+    length = dx * dx + dy * dy
+    x_p = xy[first + 1 : last, 0]
+    y_p = xy[first + 1 : last, 1]
+    if length:
+        t = np.clip(((x_p - x_a) * dx + (y_p - y_a) * dy) / length, 0.0, 1.0)
+    else:
+        t = np.zeros_like(x_p)
+    x_d = x_a + t * dx - x_p
+    y_d = y_a + t * dy - y_p
+    distances = x_d * x_d + y_d * y_d
+    # argmax returns the first of equal maxima, like the strict comparison of the pure-Python loop
+    i = int(np.argmax(distances))
+    return first + 1 + i if distances[i] > sq_tolerance else None
+
+
+def web_mercator_to_wgs84(path, radius: float) -> list | None:
+    """Vectorized Web Mercator to WGS 84 reprojection of 2D coordinates, see
+    `terraformer.projection.web_mercator_to_wgs84_path`"""
+    if len(path[0]) != 2 or (xy := _as_xy(path)) is None:
+        return None
+    output = np.empty_like(xy)
+    output[:, 0] = xy[:, 0] * (180 / (np.pi * radius))
+    output[:, 1] = 90 - np.arctan(np.exp(-xy[:, 1] / radius)) * (360 / np.pi)
+    return output.tolist()
+
+
+def wgs84_to_web_mercator(path, radius: float, max_latitude: float) -> list | None:
+    """Vectorized WGS 84 to Web Mercator reprojection of 2D coordinates, see
+    `terraformer.projection.wgs84_to_web_mercator_path`"""
+    if len(path[0]) != 2 or (xy := _as_xy(path)) is None:
+        return None
+    output = np.empty_like(xy)
+    output[:, 0] = xy[:, 0] * (np.pi * radius / 180)
+    latitude = np.clip(xy[:, 1], -max_latitude, max_latitude)
+    output[:, 1] = np.log(np.tan(np.pi / 4 + latitude * (np.pi / 360))) * radius
+    return output.tolist()
+
+
+def _as_xy(coordinates):
+    """Convert an array of coordinates to an (n, 2) float64 array of x/y values, or None if the coordinates have mixed
+    dimensions or non-numeric values"""
+    if isinstance(coordinates, np.ndarray):
+        if coordinates.ndim != 2 or coordinates.shape[1] < 2:
+            return None
+        return coordinates[:, :2].astype(np.float64, copy=False)
+    dims = len(coordinates[0])
+    if dims < 2 or any(len(point) != dims for point in coordinates):
+        return None
+    try:
+        flat = np.fromiter(chain.from_iterable(coordinates), np.float64, count=dims * len(coordinates))
+    except (TypeError, ValueError):
+        return None
+    return flat.reshape(-1, dims)[:, :2]
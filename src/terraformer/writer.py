@@ -0,0 +1,195 @@
+"""Incremental writing of GeoJSON features to files, as a FeatureCollection, a GeoJSON Text Sequence (RFC 8142) or
+newline-delimited GeoJSON, so that exports of any size are written with flat memory use"""
+
+import gzip
+import io
+import os
+from collections.abc import Iterable
+from typing import BinaryIO, TextIO
+
+from terraformer import jsonio
+
+FORMATS = ("FeatureCollection", "seq", "ndjson")
+_RECORD_SEPARATOR = b"\x1e"
+_FEATURE_COLLECTION_HEADER = b'{"type":"FeatureCollection","features":[\n'
+_FEATURE_COLLECTION_FOOTER = b"\n]}\n"
+
+
+class GeoJSONWriter:
+    """Writes GeoJSON features to a file one at a time, serialized with the selected JSON backend (see
+    `terraformer.jsonio`). Output is buffered in blocks of `buffer_size` bytes, so each feature only needs to be held
+    in memory while it's being serialized.
+
+    Formats:
+        - "FeatureCollection": One GeoJSON FeatureCollection object, with one feature per line. The object is only
+          complete once the writer is closed.
+        - "seq": GeoJSON Text Sequence (RFC 8142): each feature is preceded by an RS character and followed by a line
+          feed.
+        - "ndjson": Newline-delimited GeoJSON: one feature per line.
+
+    Use the writer as a context manager, or call `close()` when done. If the `with` block raises an exception, the
+    file is closed without completing the FeatureCollection, so that a failed export can't be mistaken for a complete
+    one (for the line-based formats, features that were written are kept either way).
+
+    Args:
+        file (BinaryIO | TextIO | str | os.PathLike): File object or path to write to. Paths are opened (and closed
+            by the writer) in binary mode.
+        output_format (str, optional): "FeatureCollection", "seq" or "ndjson". Defaults to "FeatureCollection".
+        compress (bool, optional): Gzip the output as it's written. Defaults to None, in which case paths ending in
+            ".gz" are compressed and file objects are not.
+        compresslevel (int, optional): Gzip compression level, from 1 (fastest) to 9 (smallest). Defaults to 6.
+        buffer_size (int, optional): Number of bytes collected before they're written to the file (or compressor).
+            Defaults to 256 KiB.
+
+    Raises:
+        ValueError: If `output_format` is unknown, or compressed output is requested for a text file object
+    """
+
+    def __init__(
+        self,
+        file: BinaryIO | TextIO | str | os.PathLike,
+        output_format: str = "FeatureCollection",
+        compress: bool = None,
+        compresslevel: int = 6,
+        buffer_size: int = 1 << 18,
+    ):
+        if output_format not in FORMATS:
+            raise ValueError(f"Unknown GeoJSON output format: {output_format}")
+        self.format = output_format
+        self.features_written = 0
+        self._flushed_bytes = 0
+        self._buffer = bytearray()
+        self._buffer_size = buffer_size
+        self._closed = False
+
+        if isinstance(file, (str, os.PathLike)):
+            if compress is None:
+                compress = os.fspath(file).endswith(".gz")
+            self._file = open(file, "wb")
+            self._owns_file = True
+        else:
+            self._file = file
+            self._owns_file = False
+        self._text = isinstance(self._file, io.TextIOBase)
+        if compress and self._text:
+            raise ValueError("Compressed GeoJSON output requires a binary file object")
+        self._counter = _CountingWriter(self._file) if compress else None
+        self._gzip = gzip.GzipFile(fileobj=self._counter, mode="wb", compresslevel=compresslevel) if compress else None
+
+        if output_format == "FeatureCollection":
+            self._buffer += _FEATURE_COLLECTION_HEADER
+
+    @property
+    def bytes_written(self) -> int:
+        """int: Number of (uncompressed) GeoJSON bytes written so far, including buffered output"""
+        return self._flushed_bytes + len(self._buffer)
+
+    @property
+    def compressed_bytes_written(self) -> int | None:
+        """int | None: Number of compressed bytes written to the file so far, or None if output isn't compressed"""
+        return self._counter.count if self._counter is not None else None
+
+    def write(self, feature: dict):
+        """Write a GeoJSON feature
+
+        Args:
+            feature (dict): GeoJSON Feature object
+
+        Raises:
+            ValueError: If the writer is closed
+            TypeError: If the feature contains objects that can't be serialized
+        """
+        if self._closed:
+            raise ValueError("Cannot write to a closed GeoJSONWriter")
+        data = jsonio.dumps(feature)
+        buffer = self._buffer
+        if self.format == "FeatureCollection":
+            if self.features_written:
+                buffer += b",\n"
+            buffer += data
+        elif self.format == "seq":
+            buffer += _RECORD_SEPARATOR
+            buffer += data
+            buffer += b"\n"
+        else:
+            buffer += data
+            buffer += b"\n"
+        self.features_written += 1
+        if len(buffer) >= self._buffer_size:
+            self._flush_buffer()
+
+    def write_all(self, features: Iterable[dict]) -> int:
+        """Write every GeoJSON feature of an iterable (e.g. `arcgis_to_geojson_iter(...)`), consuming it lazily
+
+        Args:
+            features (Iterable[dict]): GeoJSON Feature objects
+
+        Returns:
+            int: Number of features written
+        """
+        count = self.features_written
+        for feature in features:
+            self.write(feature)
+        return self.features_written - count
+
+    def flush(self):
+        """Write buffered output to the file. Compressed output may still be held back by the compressor."""
+        self._flush_buffer()
+        if self._gzip is not None:
+            self._gzip.flush()
+        self._file.flush()
+
+    def close(self):
+        """Complete the output (e.g. close the FeatureCollection) and finish writing it. The file is closed if the
+        writer opened it. Closing a closed writer has no effect."""
+        self._close(complete=True)
+
+    def _close(self, complete: bool):
+        if self._closed:
+            return
+        self._closed = True
+        try:
+            if complete and self.format == "FeatureCollection":
+                self._buffer += _FEATURE_COLLECTION_FOOTER
+            self._flush_buffer()
+            if self._gzip is not None:
+                self._gzip.close()  # Writes the gzip trailer; doesn't close the underlying file
+            self._file.flush()
+        finally:
+            if self._owns_file:
+                self._file.close()
+
+    def _flush_buffer(self):
+        """Write the buffered bytes to the compressor or file"""
+        if not self._buffer:
+            return
+        data = bytes(self._buffer)
+        self._buffer.clear()
+        self._flushed_bytes += len(data)
+        if self._gzip is not None:
+            self._gzip.write(data)
+        elif self._text:
+            self._file.write(data.decode("utf-8"))
+        else:
+            self._file.write(data)
+
+    def __enter__(self) -> "GeoJSONWriter":
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self._close(complete=exc_type is None)
+
+
+class _CountingWriter:
+    """Binary file wrapper that counts the bytes written through it"""
+
+    def __init__(self, file: BinaryIO):
+        self.file = file
+        self.count = 0
+
+    def write(self, data) -> int:
+        self.count += len(data)
+        return self.file.write(data)
+
+    def flush(self):
+        self.file.flush()
@@ -0,0 +1,207 @@
+import io
+import struct
+import unittest
+import warnings
+
+from terraformer.arcgis import arcgis_pbf_to_geojson, arcgis_pbf_to_geojson_iter, arcgis_to_geojson
+from terraformer.arcgis.pbf import PBFError
+
+GEOMETRY_TYPES = {
+    "esriGeometryPoint": 0,
+    "esriGeometryMultipoint": 1,
+    "esriGeometryPolyline": 2,
+    "esriGeometryPolygon": 3,
+}
+SCALE = 0.5
+TRANSLATE = (-10.0, 20.0)
+
+
+def _varint(value):
+    out = bytearray()
+    while True:
+        byte = value & 0x7F
+        value >>= 7
+        if value:
+            out.append(byte | 0x80)
+        else:
+            out.append(byte)
+            return bytes(out)
+
+
+def _zigzag(value):
+    return (value << 1) ^ (value >> 63)
+
+
+def _varint_field(field, value):
+    return _varint(field << 3) + _varint(value)
+
+
+def _bytes_field(field, data):
+    return _varint(field << 3 | 2) + _varint(len(data)) + data
+
+
+def _double_field(field, value):
+    return _varint(field << 3 | 1) + struct.pack("<d", value)
+
+
+def _value(value):
+    if value is None:
+        return b""
+    if isinstance(value, bool):
+        return _varint_field(9, value)
+    if isinstance(value, str):
+        return _bytes_field(1, value.encode("utf-8"))
+    if isinstance(value, float):
+        return _double_field(3, value)
+    return _varint_field(8, _zigzag(value))
+
+
+def _geometry(parts, has_z):
+    """Quantize and delta-encode parts of real coordinates (which must be multiples of SCALE from TRANSLATE)"""
+    coords = []
+    previous = [0, 0, 0]
+    for part in parts:
+        for point in part:
+            quantized = [round((point[0] - TRANSLATE[0]) / SCALE), round((TRANSLATE[1] - point[1]) / SCALE)]
+            if has_z:
+                quantized.append(round(point[2]))
+            for i, value in enumerate(quantized):
+                coords.append(_zigzag(value - previous[i]))
+                previous[i] = value
+    packed_lengths = b"".join(_varint(len(part)) for part in parts)
+    return _bytes_field(2, packed_lengths) + _bytes_field(3, b"".join(_varint(c) for c in coords))
+
+
+def _encode(featureset, has_z=False):
+    """Encode an Esri JSON FeatureSet as an ArcGIS FeatureCollection protocol buffer"""
+    geometry_type = featureset["geometryType"]
+    fields = list(featureset["features"][0]["attributes"])
+    transform = (
+        _varint_field(1, 0)
+        + _bytes_field(2, _double_field(1, SCALE) + _double_field(2, SCALE) + _double_field(4, 1.0))
+        + _bytes_field(3, _double_field(1, TRANSLATE[0]) + _double_field(2, TRANSLATE[1]))
+    )
+    result = (
+        _bytes_field(1, b"OBJECTID")
+        + _varint_field(7, GEOMETRY_TYPES[geometry_type])
+        + _bytes_field(8, _varint_field(1, featureset["spatialReference"]["wkid"]))
+        + _varint_field(10, has_z)
+        + _bytes_field(12, transform)
+        + b"".join(_bytes_field(13, _bytes_field(1, name.encode("utf-8"))) for name in fields)
+    )
+    for feature in featureset["features"]:
+        geometry = feature["geometry"]
+        if geometry_type == "esriGeometryPoint":
+            parts = [[[geometry["x"], geometry["y"]] + ([geometry["z"]] if has_z else [])]]
+        else:
+            parts = geometry.get("rings") or geometry.get("paths") or [geometry["points"]]
+        encoded = b"".join(_bytes_field(1, _value(feature["attributes"][name])) for name in fields)
+        encoded += _bytes_field(2, _geometry(parts, has_z))
+        result += _bytes_field(15, encoded)
+    return _bytes_field(1, b"1.0") + _bytes_field(2, _bytes_field(1, result))
+
+
+def _featureset(geometry_type, geometries, wkid=4326):
+    return {
+        "geometryType": geometry_type,
+        "spatialReference": {"wkid": wkid},
+        "features": [
+            {
+                "geometry": geometry,
+                "attributes": {"OBJECTID": i + 1, "name": f"né {i}", "value": i * 1.5, "flag": None},
+            }
+            for i, geometry in enumerate(geometries)
+        ],
+    }
+
+
+class TestArcGISPBFToGeoJSON(unittest.TestCase):
+
+    def assert_same_as_json(self, featureset, has_z=False):
+        expected = arcgis_to_geojson(featureset)
+        self.assertEqual(arcgis_pbf_to_geojson(_encode(featureset, has_z)), expected)
+
+    def test_points(self):
+        """Should decode quantized Points with upper-left origin"""
+        self.assert_same_as_json(_featureset("esriGeometryPoint", [{"x": 1.5, "y": 2.0}, {"x": -10.0, "y": 20.0}]))
+
+    def test_points_z(self):
+        """Should decode Point z values, dropping zero z values like arcgis_to_geojson"""
+        featureset = _featureset("esriGeometryPoint", [{"x": 1.5, "y": 2.0, "z": 3}, {"x": 0.5, "y": 1.0, "z": 0}])
+        self.assert_same_as_json(featureset, has_z=True)
+
+    def test_multipoints(self):
+        """Should decode MultiPoints"""
+        self.assert_same_as_json(_featureset("esriGeometryMultipoint", [{"points": [[1.0, 2.0], [3.5, -4.0]]}]))
+
+    def test_polylines(self):
+        """Should decode single-path and multi-path Polylines, with deltas continuing across paths"""
+        self.assert_same_as_json(
+            _featureset(
+                "esriGeometryPolyline",
+                [
+                    {"paths": [[[1.0, 2.0], [3.0, 4.0]]]},
+                    {"paths": [[[1.0, 2.0], [3.0, 4.0]], [[-5.0, 6.5], [7.0, 8.0]]]},
+                ],
+            )
+        )
+
+    def test_polygons(self):
+        """Should decode Polygons through the same hole-matching rules as arcgis_to_geojson"""
+        outer = [[0.0, 0.0], [0.0, 10.0], [10.0, 10.0], [10.0, 0.0], [0.0, 0.0]]
+        hole = [[2.0, 2.0], [4.0, 2.0], [4.0, 4.0], [2.0, 4.0], [2.0, 2.0]]
+        other = [[20.0, 0.0], [20.0, 5.0], [25.0, 5.0], [25.0, 0.0], [20.0, 0.0]]
+        featureset = _featureset("esriGeometryPolygon", [{"rings": [outer, hole]}, {"rings": [outer, other]}])
+        self.assert_same_as_json(featureset)
+
+    def test_attribute_types(self):
+        """Should decode every Value type, ignoring fields with the wrong wire type"""
+        values = (
+            _bytes_field(1, b"text"),
+            _varint(2 << 3 | 5) + struct.pack("<f", 0.5),
+            _double_field(3, 2.25),
+            _varint_field(4, _zigzag(-3)),
+            _varint_field(5, 4),
+            _varint_field(6, (1 << 64) - 5),
+            _varint_field(7, 1 << 40),
+            _varint_field(8, _zigzag(-(1 << 40))),
+            _varint_field(9, 1),
+            b"",
+            _varint_field(1, 7) + _bytes_field(4, b"x"),  # Wrong wire types are skipped
+        )
+        names = [f"f{i}" for i in range(len(values))]
+        result = b"".join(_bytes_field(13, _bytes_field(1, name.encode())) for name in names)
+        result += _bytes_field(15, b"".join(_bytes_field(1, value) for value in values))
+        feature = arcgis_pbf_to_geojson(_bytes_field(2, _bytes_field(1, result)))["features"][0]
+        self.assertEqual(
+            list(feature["properties"].values()), ["text", 0.5, 2.25, -3, 4, -5, 1 << 40, -(1 << 40), True, None, None]
+        )
+        self.assertIsNone(feature["geometry"])
+
+    def test_iter_and_file(self):
+        """Should yield features one at a time from a binary file object"""
+        featureset = _featureset("esriGeometryPoint", [{"x": 1.5, "y": 2.0}, {"x": 2.5, "y": 3.0}])
+        features = list(arcgis_pbf_to_geojson_iter(io.BytesIO(_encode(featureset)), id_attribute="OBJECTID"))
+        self.assertEqual(features, arcgis_to_geojson(featureset)["features"])
+
+    def test_spatial_reference_warning(self):
+        """Should warn once if the result is not in WGS 84"""
+        featureset = _featureset("esriGeometryPoint", [{"x": 1.5, "y": 2.0}, {"x": 2.5, "y": 3.0}], wkid=3857)
+        with warnings.catch_warnings(record=True) as caught:
+            warnings.simplefilter("always")
+            arcgis_pbf_to_geojson(_encode(featureset))
+        self.assertEqual(len(caught), 1)
+
+    def test_errors(self):
+        """Should raise PBFError on truncated input and non-feature results"""
+        data = _encode(_featureset("esriGeometryPoint", [{"x": 1.5, "y": 2.0}]))
+        with self.assertRaises(PBFError):
+            arcgis_pbf_to_geojson(data[:-3])
+        with self.assertRaises(PBFError):
+            arcgis_pbf_to_geojson(_bytes_field(2, _bytes_field(2, _varint_field(1, 10))))  # countResult
+        with self.assertRaises(PBFError):
+            arcgis_pbf_to_geojson(b"")
+
+
+if __name__ == "__main__":
+    unittest.main()
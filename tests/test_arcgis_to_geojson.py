@@ -1,7 +1,8 @@
 import json
 import unittest
+import warnings
 
-from terraformer.arcgis import arcgis_to_geojson
+from terraformer.arcgis import arcgis_to_geojson, arcgis_to_geojson_iter
 
 
 class TestArcGISToGeoJSON(unittest.TestCase):
@@ -358,6 +359,26 @@ class TestArcGISToGeoJSON(unittest.TestCase):
             },
         )
 
+    def test_polygon_many_shells_and_holes(self):
+        """Should assign each hole to the outer ring containing it, and promote holes no outer ring touches"""
+        rings = []
+        expected = []
+        for x in range(0, 100, 10):
+            for y in range(0, 100, 10):
+                rings.append([[x, y], [x, y + 8], [x + 8, y + 8], [x + 8, y], [x, y]])
+                rings.append([[x + 2, y + 2], [x + 6, y + 2], [x + 6, y + 6], [x + 2, y + 6], [x + 2, y + 2]])
+                expected.append(
+                    [
+                        [[x, y], [x + 8, y], [x + 8, y + 8], [x, y + 8], [x, y]],
+                        [[x + 2, y + 2], [x + 2, y + 6], [x + 6, y + 6], [x + 6, y + 2], [x + 2, y + 2]],
+                    ]
+                )
+        rings.append([[200, 200], [210, 200], [210, 210], [200, 210], [200, 200]])
+        expected.append([[[200, 200], [210, 200], [210, 210], [200, 210], [200, 200]]])
+        output = arcgis_to_geojson({"rings": rings})
+        self.assertEqual(output["type"], "MultiPolygon")
+        self.assertCountEqual(output["coordinates"], expected)
+
     def test_feature(self):
         """Should parse an ArcGIS Feature into a GeoJSON Feature"""
         in_json = {
@@ -639,6 +660,19 @@ class TestArcGISToGeoJSON(unittest.TestCase):
         arcgis_to_geojson(in_json)
         self.assertEqual(json.dumps(in_json), original)
 
+    def test_no_copy(self):
+        """Should share unchanged coordinate arrays and attributes with the input when copy=False"""
+        path = [[6.6796875, 47.8125], [-65.390625, 52.3828125], [-52.3828125, 42.5390625]]
+        attributes = {"OBJECTID": 1, "foo": "bar"}
+        in_json = {"geometry": {"paths": [path]}, "attributes": attributes}
+        expected = arcgis_to_geojson(in_json)
+        output = arcgis_to_geojson(in_json, copy=False)
+        self.assertEqual(output, expected)
+        self.assertIs(output["geometry"]["coordinates"], path)
+        self.assertIs(output["properties"], attributes)
+        self.assertIsNot(expected["geometry"]["coordinates"], path)
+        self.assertIsNot(expected["properties"], attributes)
+
     def test_envelope(self):
         """Should parse an ArcGIS Envelope into a GeoJSON Polygon"""
         in_json = {
@@ -665,6 +699,141 @@ class TestArcGISToGeoJSON(unittest.TestCase):
             },
         )
 
+    def test_precision(self):
+        """Should round coordinates, drop merged vertices and collapsed rings, and keep rings closed"""
+        in_json = {
+            "rings": [
+                [[0.00001, 0.00002], [0.00004, 10.0], [10.0, 10.0], [10.000001, 10.000002], [10.0, 0.0]],
+                [[2.0, 2.0], [2.0000001, 2.0000001], [2.0000002, 2.0], [2.0, 2.0]],
+            ]
+        }
+        output = arcgis_to_geojson(in_json, precision=3)
+        self.assertEqual(
+            output,
+            {"type": "Polygon", "coordinates": [[[0.0, 0.0], [10.0, 0.0], [10.0, 10.0], [0.0, 10.0], [0.0, 0.0]]]},
+        )
+        output = arcgis_to_geojson({"x": -87.62979843159, "y": 41.8781136123, "z": 181.4321}, precision=5)
+        self.assertEqual(output["coordinates"], [-87.6298, 41.87811, 181.4321])
+        output = arcgis_to_geojson({"paths": [[[0.12, 0.0], [0.14, 0.0], [1.0, 1.0]]]}, precision=1)
+        self.assertEqual(output, {"type": "LineString", "coordinates": [[0.1, 0.0], [1.0, 1.0]]})
+
+    def test_simplify(self):
+        """Should simplify paths and rings, dropping rings that collapse"""
+        in_json = {
+            "rings": [
+                [[0, 0], [0, 5], [0.01, 10], [10, 10], [10, 0], [0, 0]],
+                [[2, 2], [2.01, 2.01], [2.02, 2], [2, 2]],
+            ]
+        }
+        output = arcgis_to_geojson(in_json, simplify=0.1)
+        self.assertEqual(output, {"type": "Polygon", "coordinates": [[[0, 0], [10, 0], [10, 10], [0.01, 10], [0, 0]]]})
+        output = arcgis_to_geojson({"paths": [[[0, 0], [1, 0.01], [2, 0]]]}, simplify=0.1, precision=0)
+        self.assertEqual(output, {"type": "LineString", "coordinates": [[0.0, 0.0], [2.0, 0.0]]})
+
+    def test_fields_where(self):
+        """Should skip features rejected by the predicate without converting them, and keep only the selected fields"""
+        featureset = {
+            "features": [
+                {"geometry": {"x": 1, "y": 2}, "attributes": {"OBJECTID": 1, "kind": "a", "name": "one"}},
+                {"geometry": {"rings": "not converted"}, "attributes": {"OBJECTID": 2, "kind": "b", "name": "two"}},
+                {"geometry": {"x": 3, "y": 4}},
+            ]
+        }
+        output = arcgis_to_geojson(featureset, fields=["name", "missing"], where=lambda a: a.get("kind") != "b")
+        self.assertEqual(
+            output["features"],
+            [
+                {
+                    "type": "Feature",
+                    "geometry": {"type": "Point", "coordinates": [1, 2]},
+                    "properties": {"name": "one"},
+                    "id": 1,
+                },
+                {"type": "Feature", "geometry": {"type": "Point", "coordinates": [3, 4]}, "properties": None},
+            ],
+        )
+        self.assertEqual(featureset["features"][0]["attributes"], {"OBJECTID": 1, "kind": "a", "name": "one"})
+        output = arcgis_to_geojson_iter(json.dumps(featureset).encode(), where=lambda a: a.get("OBJECTID") == 1)
+        self.assertEqual([feature["id"] for feature in output], [1])
+
+    def test_declared_geometry_type(self):
+        """Should convert geometries of a FeatureSet's declared geometryType as with probing, falling back to probing
+        for geometries without the type's members, and for geometries that also have the members of a type probed
+        after it"""
+        geometry_types = {
+            "esriGeometryPoint": [
+                {"x": 1, "y": 2},
+                {"x": 1.5, "y": 2.5, "z": 3},
+                {"x": None, "y": 2},
+                {"x": 1, "y": 2, "paths": [[[0, 0], [1, 1]]]},
+            ],
+            "esriGeometryMultipoint": [{"points": [[1, 2], [3, 4]]}, {"points": []}],
+            "esriGeometryPolyline": [
+                {"paths": [[[0, 0], [1, 1.01], [2, 2]]]},
+                {"paths": [[[0, 0], [1, 1]], [[2, 2], [3, 3]]]},
+                {"paths": [[[0, 0], [1, 1]]], "rings": [[[0, 0], [0, 1], [1, 1], [0, 0]]]},
+                {"points": [[1, 2]], "paths": [[[0, 0], [1, 1]]]},
+            ],
+            "esriGeometryPolygon": [
+                {"rings": [[[0, 0], [0, 10], [10, 10], [10, 0], [0, 0]], [[2, 2], [4, 2], [4, 4], [2, 2]]]},
+                {"x": 1, "y": 2},
+            ],
+            "esriGeometryEnvelope": [{"xmin": 1, "ymin": 2, "xmax": 3, "ymax": 4}, {"xmin": 0, "ymin": 2}],
+        }
+        for geometry_type, geometries in geometry_types.items():
+            features = [{"geometry": geometry, "attributes": {"OBJECTID": i}} for i, geometry in enumerate(geometries)]
+            featureset = {"geometryType": geometry_type, "features": features}
+            for options in ({}, {"precision": 1}, {"simplify": 0.1}, {"packed": True}, {"lazy": True}):
+                with self.subTest(geometry_type=geometry_type, options=options):
+                    expected = arcgis_to_geojson({"features": features}, **options)
+                    self.assertEqual(arcgis_to_geojson(featureset, **options), expected)
+                    output = arcgis_to_geojson_iter(json.dumps(featureset).encode(), **options)
+                    self.assertEqual(list(output), expected["features"])
+
+    def test_declared_spatial_reference(self):
+        """Should warn once for a FeatureSet's spatial reference, repeated by its geometries, and reproject them"""
+        featureset = {
+            "geometryType": "esriGeometryPoint",
+            "spatialReference": {"wkid": 102100},
+            "features": [
+                {"geometry": {"x": 1113194.9079327357, "y": 0, "spatialReference": {"wkid": 102100}}},
+                {"geometry": {"x": 1113194.9079327357, "y": 0}},
+            ],
+        }
+        with warnings.catch_warnings(record=True) as caught:
+            warnings.simplefilter("always")
+            output = arcgis_to_geojson(featureset)
+        self.assertEqual(len(caught), 1)
+        self.assertEqual([f["geometry"]["coordinates"] for f in output["features"]], [[1113194.9079327357, 0]] * 2)
+        output = arcgis_to_geojson(featureset, reproject=True)
+        for feature in output["features"]:
+            self.assertAlmostEqual(feature["geometry"]["coordinates"][0], 10.0)
+        featureset["features"][0]["geometry"]["spatialReference"] = {"wkid": 27700}
+        with self.assertWarns(UserWarning):  # Other spatial references are still checked
+            arcgis_to_geojson(featureset)
+
+
+    def test_spatial_reference_warns_once(self):
+        """Should warn once for each distinct CRS of a FeatureSet, comparing WKIDs rather than spatialReference
+        objects"""
+        web_mercator = {"wkid": 102100}
+        features = [{"geometry": {"x": i, "y": i, "spatialReference": web_mercator}} for i in range(5)]
+        featuresets = {
+            "undeclared": {"features": features},
+            "latestWkid": {"spatialReference": {"wkid": 102100, "latestWkid": 3857}, "features": features},
+        }
+        for name, featureset in featuresets.items():
+            for convert in (arcgis_to_geojson, lambda f: list(arcgis_to_geojson_iter(json.dumps(f).encode()))):
+                with self.subTest(featureset=name, convert=convert):
+                    with warnings.catch_warnings(record=True) as caught:
+                        warnings.simplefilter("always")
+                        convert(featureset)
+                    self.assertEqual(len(caught), 1)
+        mixed = {"features": [*features, {"geometry": {"x": 1, "y": 2, "spatialReference": {"wkid": 27700}}}]}
+        with warnings.catch_warnings(record=True) as caught:
+            warnings.simplefilter("always")
+            arcgis_to_geojson(mixed)
+        self.assertEqual(len(caught), 2)
 
 if __name__ == "__main__":
     unittest.main()
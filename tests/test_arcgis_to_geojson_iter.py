@@ -0,0 +1,116 @@
+import io
+import json
+import unittest
+import warnings
+
+from terraformer.arcgis import arcgis_to_geojson, arcgis_to_geojson_iter
+from terraformer.jsonscan import JSONScanError
+
+FEATURESET = {
+    "objectIdFieldName": "OBJECTID",
+    "geometryType": "esriGeometryPolygon",
+    "spatialReference": {"wkid": 4326},
+    "fields": [{"name": "OBJECTID", "type": "esriFieldTypeOID"}, {"name": "name", "type": "esriFieldTypeString"}],
+    "features": [
+        {
+            "geometry": {
+                "rings": [
+                    [[-122.63, 45.52], [-122.57, 45.53], [-122.52, 45.50], [-122.49, 45.48], [-122.63, 45.52]],
+                    [[-83.0, 42.0], [-82.0, 42.0], [-82.0, 41.0], [-83.0, 42.0]],
+                ]
+            },
+            "attributes": {"OBJECTID": 1, "name": 'Escaped "quotes", {braces} and [brackets] \\\\'},
+        },
+        {"geometry": {"x": -66.796875, "y": 20.0390625}, "attributes": {"OBJECTID": 2, "name": "ünïcödé"}},
+        {"geometry": {"paths": [[[6.67, 47.81], [-65.39, 52.38]]]}, "attributes": {"OBJECTID": 3, "name": None}},
+        {"geometry": None, "attributes": {"OBJECTID": 4, "name": "no geometry"}},
+    ],
+    "exceededTransferLimit": False,
+}
+
+
+class CountingReader(io.BytesIO):
+    """Binary stream that records how many bytes have been read from it"""
+
+    def __init__(self, data):
+        super().__init__(data)
+        self.bytes_read = 0
+
+    def read(self, size=-1):
+        chunk = super().read(size)
+        self.bytes_read += len(chunk)
+        return chunk
+
+
+class TestArcGISToGeoJSONIter(unittest.TestCase):
+
+    def test_matches_dict_api(self):
+        """Should yield the same features as arcgis_to_geojson() does for the whole FeatureSet"""
+        expected = arcgis_to_geojson(FEATURESET)["features"]
+        output = list(arcgis_to_geojson_iter(io.BytesIO(json.dumps(FEATURESET).encode())))
+        self.assertEqual(output, expected)
+
+    def test_small_chunks(self):
+        """Should handle values, strings and escapes that span chunk boundaries"""
+        expected = arcgis_to_geojson(FEATURESET)["features"]
+        data = json.dumps(FEATURESET, indent=2, ensure_ascii=False).encode()
+        for chunk_size in (1, 3, 7, 64):
+            output = list(arcgis_to_geojson_iter(io.BytesIO(data), chunk_size=chunk_size))
+            self.assertEqual(output, expected)
+
+    def test_text_stream_and_bytes(self):
+        """Should accept text file objects and byte strings"""
+        expected = arcgis_to_geojson(FEATURESET)["features"]
+        text = json.dumps(FEATURESET, ensure_ascii=False)
+        self.assertEqual(list(arcgis_to_geojson_iter(io.StringIO(text), chunk_size=5)), expected)
+        self.assertEqual(list(arcgis_to_geojson_iter(text.encode())), expected)
+
+    def test_custom_id(self):
+        """Should pass id_attribute through to each converted feature"""
+        data = json.dumps({"features": [{"attributes": {"OBJECTID": 1, "code": "a"}}]}).encode()
+        output = list(arcgis_to_geojson_iter(data, id_attribute="code"))
+        self.assertEqual(
+            output, [{"type": "Feature", "geometry": None, "properties": {"OBJECTID": 1, "code": "a"}, "id": "a"}]
+        )
+
+    def test_lazy(self):
+        """Should yield the first feature before the whole stream has been read"""
+        featureset = {"features": [FEATURESET["features"][1]] * 5000}
+        stream = CountingReader(json.dumps(featureset).encode())
+        features = arcgis_to_geojson_iter(stream, chunk_size=1024)
+        next(features)
+        self.assertLess(stream.bytes_read, 4096)
+        self.assertEqual(sum(1 for _ in features), 4999)
+
+    def test_empty_features(self):
+        """Should yield nothing for an empty or missing features array"""
+        self.assertEqual(list(arcgis_to_geojson_iter(b'{"features": []}')), [])
+        self.assertEqual(list(arcgis_to_geojson_iter(b"{}")), [])
+
+    def test_warns_once_for_featureset_crs(self):
+        """Should warn once for a non-standard FeatureSet spatial reference, not once per feature"""
+        featureset = {"spatialReference": {"wkid": 102100}, "features": FEATURESET["features"]}
+        with warnings.catch_warnings(record=True) as caught:
+            warnings.simplefilter("always")
+            list(arcgis_to_geojson_iter(json.dumps(featureset).encode()))
+        self.assertEqual(len(caught), 1)
+
+    def test_invalid_features(self):
+        """Should yield nothing for a non-array features member, and raise ValueError for non-object features"""
+        for data in (b'{"features": null}', b'{"features": {"geometry": null}}', b'{"features": 1}'):
+            with self.subTest(data=data):
+                self.assertEqual(list(arcgis_to_geojson_iter(data)), [])
+        for data in (b'{"features": [null]}', b'{"features": [1]}', b'{"features": [{}, []]}'):
+            with self.subTest(data=data), self.assertRaises(ValueError):
+                list(arcgis_to_geojson_iter(data))
+
+    def test_malformed(self):
+        """Should raise JSONScanError for malformed or truncated documents"""
+        with self.assertRaises(JSONScanError):
+            list(arcgis_to_geojson_iter(b"[]"))
+        with self.assertRaises(JSONScanError):
+            list(arcgis_to_geojson_iter(json.dumps(FEATURESET).encode()[:-40]))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,55 @@
+import random
+import unittest
+
+from terraformer import jsonio
+from terraformer.arcgis import batch_features, estimate_feature_size, geojson_to_arcgis_iter
+
+
+def _features(count, seed=0):
+    rng = random.Random(seed)
+    for i in range(count):
+        path = [[rng.uniform(-180, 180), rng.uniform(-90, 90), rng.uniform(0, 100)] for _ in range(rng.randint(2, 50))]
+        yield {
+            "type": "Feature",
+            "geometry": {"type": "MultiLineString", "coordinates": [path, path[:2]]},
+            "properties": {"name": f"Café {i}", "value": rng.random(), "flag": i % 2 == 0, "note": None, "tags": []},
+            "id": i + 1,
+        }
+
+
+class TestBatchFeatures(unittest.TestCase):
+
+    def test_estimate_feature_size(self):
+        """Should estimate at least the serialized size of features, within a factor of 1.5"""
+        for packed in (False, True):
+            for feature in geojson_to_arcgis_iter(_features(100), packed=packed):
+                with self.subTest(packed=packed, feature=feature["attributes"]["OBJECTID"]):
+                    size = len(jsonio.dumps(feature))
+                    self.assertGreaterEqual(estimate_feature_size(feature), size)
+                    self.assertLess(estimate_feature_size(feature), size * 1.5)
+        point = {"geometry": {"x": 1, "y": 2, "spatialReference": {"wkid": 4326}}, "attributes": {}}
+        self.assertEqual(estimate_feature_size(point), len(jsonio.dumps(point)))
+
+    def test_batch_features(self):
+        """Should split features into batches within the count and estimated size limits, in order"""
+        features = list(geojson_to_arcgis_iter(_features(500)))
+        batches = list(batch_features(iter(features), max_features=50, max_bytes=20_000))
+        self.assertEqual([feature for batch in batches for feature in batch], features)
+        for batch in batches:
+            self.assertLessEqual(len(batch), 50)
+            self.assertLessEqual(len(jsonio.dumps(batch)), 20_000)
+        self.assertGreater(len(batches), 10)
+
+        self.assertEqual([len(batch) for batch in batch_features(features[:7], max_features=3)], [3, 3, 1])
+        self.assertEqual(list(batch_features([])), [])
+
+    def test_oversized_feature(self):
+        """Should yield a feature larger than the size limit as a batch of its own"""
+        features = list(geojson_to_arcgis_iter(_features(3)))
+        self.assertEqual(list(batch_features(features, max_bytes=10)), [[feature] for feature in features])
+        with self.assertRaises(ValueError):
+            list(batch_features(features, max_features=0))
+
+
+if __name__ == "__main__":
+    unittest.main()
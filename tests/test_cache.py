@@ -0,0 +1,117 @@
+import pickle
+import unittest
+import warnings
+
+from terraformer.arcgis import arcgis_to_geojson, geojson_to_arcgis
+from terraformer.cache import GeometryCache
+from terraformer.packed import PackedCoordinates
+from terraformer.stats import collect_stats
+
+FOOTPRINT = {
+    "rings": [
+        [[0, 0], [0, 10], [10, 10], [10, 0], [0, 0]],
+        [[2, 2], [4, 2], [4, 4], [2, 4], [2, 2]],
+    ]
+}
+
+
+def _featureset(count, distinct):
+    return {
+        "features": [
+            {
+                "geometry": {"rings": [[[x + i % distinct for x in p] for p in r] for r in FOOTPRINT["rings"]]},
+                "attributes": {"OBJECTID": i + 1},
+            }
+            for i in range(count)
+        ]
+    }
+
+
+class TestGeometryCache(unittest.TestCase):
+
+    def test_arcgis_to_geojson(self):
+        """Should convert repeated geometries once and return identical output"""
+        featureset = _featureset(100, 10)
+        cache = GeometryCache()
+        self.assertEqual(arcgis_to_geojson(featureset, cache=cache), arcgis_to_geojson(featureset))
+        self.assertEqual((cache.hits, cache.misses, len(cache)), (90, 10, 10))
+        info = cache.info()
+        self.assertEqual(info["hit_rate"], 0.9)
+        self.assertGreater(info["bytes"], 0)
+
+    def test_geojson_to_arcgis(self):
+        """Should cache GeoJSON geometries, keyed by the options that affect them"""
+        feature_collection = arcgis_to_geojson(_featureset(50, 5))
+        cache = GeometryCache()
+        self.assertEqual(geojson_to_arcgis(feature_collection, cache=cache), geojson_to_arcgis(feature_collection))
+        self.assertEqual((cache.hits, cache.misses), (45, 5))
+        output = geojson_to_arcgis(feature_collection, wkid=3857, cache=cache)
+        self.assertEqual(output[0]["geometry"]["spatialReference"], {"wkid": 3857})
+        self.assertEqual(cache.misses, 10)
+
+    def test_hits_are_copies(self):
+        """Should return fresh containers on each hit unless copy is False, so output changes don't affect the cache"""
+        cache = GeometryCache()
+        expected = arcgis_to_geojson(FOOTPRINT, cache=cache)
+        expected["coordinates"][0][0] = [999, 999]
+        hit = arcgis_to_geojson(FOOTPRINT, cache=cache)
+        self.assertEqual(hit["coordinates"][0][0], [0, 0])
+        hit["coordinates"][0][0] = [999, 999]
+        hit["coordinates"][1].clear()
+        hit["type"] = "MultiPolygon"
+        self.assertEqual(arcgis_to_geojson(FOOTPRINT, cache=cache), arcgis_to_geojson(FOOTPRINT))
+        shared = arcgis_to_geojson(FOOTPRINT, copy=False, cache=cache)
+        self.assertIs(arcgis_to_geojson(FOOTPRINT, copy=False, cache=cache), shared)
+        self.assertEqual(cache.hits, 4)
+
+    def test_eviction(self):
+        """Should evict least recently used geometries to stay within the entry and byte budgets"""
+        cache = GeometryCache(max_entries=3)
+        geometries = [{"x": i, "y": i} for i in range(5)]
+        for geometry in geometries:
+            arcgis_to_geojson(geometry, cache=cache)
+        self.assertEqual((len(cache), cache.evictions), (3, 2))
+        arcgis_to_geojson(geometries[0], cache=cache)
+        self.assertEqual(cache.misses, 6)  # Evicted
+        arcgis_to_geojson(geometries[4], cache=cache)
+        self.assertEqual(cache.hits, 1)
+
+        cache = GeometryCache(max_bytes=500)
+        for geometry in geometries:
+            arcgis_to_geojson(geometry, cache=cache)
+        self.assertLessEqual(cache.nbytes, 500)
+        self.assertLess(len(cache), 5)
+
+    def test_uncacheable(self):
+        """Should bypass the cache for geometries that can't be fingerprinted"""
+        cache = GeometryCache()
+        geometry = {"rings": PackedCoordinates.from_coordinates(FOOTPRINT["rings"])}
+        self.assertEqual(arcgis_to_geojson(geometry, cache=cache), arcgis_to_geojson(FOOTPRINT))
+        self.assertEqual((cache.uncacheable, len(cache)), (1, 0))
+
+    def test_stats_and_pickle(self):
+        """Should count hits and misses in conversion statistics, and pickle as an empty cache"""
+        cache = GeometryCache(max_entries=7)
+        with collect_stats() as stats:
+            arcgis_to_geojson(_featureset(4, 2), cache=cache)
+        self.assertEqual((stats.counters["cache_hits"], stats.counters["cache_misses"]), (2, 2))
+        clone = pickle.loads(pickle.dumps(cache))
+        self.assertEqual((len(clone), clone.max_entries), (0, 7))
+        cache.clear()
+        self.assertEqual((len(cache), cache.hits, cache.nbytes), (0, 0, 0))
+
+    def test_spatial_reference_warning(self):
+        """Should warn for a geometry's non-standard spatial reference on every conversion, cached or not"""
+        cache = GeometryCache()
+        geometry = {"x": 1, "y": 2, "spatialReference": {"wkid": 3857}}
+        feature = {"geometry": geometry, "attributes": {"OBJECTID": 1}}
+        for arcgis in (geometry, geometry, feature, {"features": [feature]}):
+            with warnings.catch_warnings(record=True) as caught:
+                warnings.simplefilter("always")
+                arcgis_to_geojson(arcgis, cache=cache)
+            self.assertEqual(len(caught), 1)
+        self.assertEqual((cache.hits, cache.misses), (3, 1))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,120 @@
+import random
+import unittest
+
+from terraformer.common import (
+    BBoxIndex,
+    _edge_intersects_edge,
+    array_intersects_array,
+    round_path,
+    round_point,
+    simplify_path,
+)
+
+
+def _nested_loop_intersects(a, b):
+    for i in range(len(a) - 1):
+        for j in range(len(b) - 1):
+            if _edge_intersects_edge(a[i], a[i + 1], b[j], b[j + 1]):
+                return True
+    return False
+
+
+class TestArrayIntersectsArray(unittest.TestCase):
+
+    def test_matches_nested_loop(self):
+        """Should give the same result as comparing every pair of edges, including touching and collinear edges"""
+        rng = random.Random(42)
+        for _ in range(2000):
+            # Small integer grids produce many shared vertices, touching edges and collinear overlaps
+            a = [[rng.randint(0, 6), rng.randint(0, 6)] for _ in range(rng.randint(2, 25))]
+            b = [[rng.randint(0, 6), rng.randint(0, 6)] for _ in range(rng.randint(2, 25))]
+            self.assertEqual(array_intersects_array(a, b), _nested_loop_intersects(a, b), (a, b))
+
+    def test_touching_vertex(self):
+        """Should treat arrays that only touch at a vertex as intersecting"""
+        a = [[0, 0], [1, 1], [2, 0], [3, 1], [4, 0], [5, 1]]
+        b = [[5, 1], [6, 3], [7, 1], [8, 3], [9, 1], [10, 3]]
+        self.assertTrue(array_intersects_array(a, b))
+
+    def test_collinear(self):
+        """Should not treat collinear overlapping edges as intersecting"""
+        a = [[0, 0], [1, 0], [2, 0], [3, 0], [4, 0], [5, 0]]
+        b = [[2, 0], [3, 0], [4, 0], [5, 0], [6, 0], [7, 0]]
+        self.assertFalse(array_intersects_array(a, b))
+
+    def test_nested_rings(self):
+        """Should not find intersections between a large ring and a ring nested inside it"""
+        outer = [[x, 0] for x in range(1000)] + [[999, 10], [0, 10], [0, 0]]
+        inner = [[x, 5] for x in range(10, 990)] + [[989, 6], [10, 6], [10, 5]]
+        self.assertFalse(array_intersects_array(outer, inner))
+        self.assertTrue(array_intersects_array(outer, inner + [[500, 20]]))
+
+
+class TestRounding(unittest.TestCase):
+
+    def test_round_point(self):
+        """Should round x and y, keeping other dimensions as is"""
+        self.assertEqual(round_point([-87.62979843159, 41.8781136123], 6), [-87.629798, 41.878114])
+        self.assertEqual(round_point([1.23456, 2.34567, 3.45678], 2), [1.23, 2.35, 3.45678])
+
+    def test_round_path(self):
+        """Should drop vertices that become identical to the previous vertex, keeping two vertices of collapsed paths"""
+        path = [[0.0, 0.0], [0.001, 0.002], [1.0, 1.0], [1.004, 0.996], [0.0, 0.0]]
+        self.assertEqual(round_path(path, 2), [[0.0, 0.0], [1.0, 1.0], [0.0, 0.0]])
+        self.assertEqual(round_path([[0.001, 0.0], [0.002, 0.0], [0.003, 0.0]], 1), [[0.0, 0.0], [0.0, 0.0]])
+        self.assertEqual(round_path([[0.001, 0.0]], 1), [[0.0, 0.0]])
+
+
+class TestSimplifyPath(unittest.TestCase):
+
+    def test_simplify(self):
+        """Should drop vertices within the tolerance of the simplified line and keep the endpoints"""
+        path = [[0, 0], [1, 0.1], [2, -0.1], [3, 5], [4, 6], [5, 7], [6, 8.1], [7, 9], [8, 9], [9, 9]]
+        self.assertEqual(simplify_path(path, 0.5), [[0, 0], [2, -0.1], [3, 5], [7, 9], [9, 9]])
+        self.assertEqual(simplify_path(path, 0), path[:4] + path[5:8] + path[9:])  # Only collinear vertices
+        self.assertEqual(simplify_path(path, 100), [[0, 0], [9, 9]])
+        self.assertEqual(simplify_path([[0, 0], [1, 1]], 1), [[0, 0], [1, 1]])
+        with self.assertRaises(ValueError):
+            simplify_path(path, -1)
+
+    def test_ring(self):
+        """Should keep rings closed, measuring from their start vertex"""
+        ring = [[0, 0], [0, 10], [0.1, 10.1], [10, 10], [10, 0], [0, 0]]
+        self.assertEqual(simplify_path(ring, 0.5), [[0, 0], [0, 10], [10, 10], [10, 0], [0, 0]])
+        self.assertEqual(simplify_path(ring, 20), [[0, 0], [0, 0]])
+
+    def test_long_path(self):
+        """Should simplify paths far longer than the recursion limit"""
+        path = [[i, (i % 2) * 0.01] for i in range(20000)]
+        self.assertEqual(simplify_path(path, 0.1), [[0, 0], [19999, 0.01]])
+
+
+class TestBBoxIndex(unittest.TestCase):
+
+    def test_matches_exhaustive_search(self):
+        """Should find the same boxes as checking every one, including boxes inserted after the first query"""
+        rng = random.Random(0)
+
+        def box(size):
+            x, y = rng.uniform(-100, 100), rng.uniform(-100, 100)
+            return (x, y, x + rng.expovariate(1 / size), y + rng.expovariate(1 / size))
+
+        boxes = [box(5) for _ in range(300)] + [box(200) for _ in range(5)] + [(1, 1, 1, 1), (-1, 0, float("inf"), 1)]
+        index = BBoxIndex()
+        for key, bbox in enumerate(boxes[:200]):
+            index.insert(key, bbox)
+        for i in range(300):
+            if i % 3 == 0 and 200 + i // 3 < len(boxes):
+                index.insert(200 + i // 3, boxes[200 + i // 3])
+            indexed = list(enumerate(boxes[: 200 + i // 3 + 1]))
+            query = box(2) if i % 10 else (0, 0, 1, float("nan"))
+            xmin, ymin, xmax, ymax = query
+            containing = [k for k, b in indexed if b[0] <= xmin and b[1] <= ymin and b[2] >= xmax and b[3] >= ymax]
+            intersecting = [k for k, b in indexed if b[0] <= xmax and b[1] <= ymax and b[2] >= xmin and b[3] >= ymin]
+            self.assertEqual(index.containing(query), containing[::-1])
+            self.assertEqual(index.intersecting(query), intersecting[::-1])
+        self.assertEqual(BBoxIndex().intersecting((0, 0, 1, 1)), [])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -1,7 +1,8 @@
 import json
 import unittest
 
-from terraformer.arcgis import geojson_to_arcgis
+from terraformer.arcgis import geojson_to_arcgis, geojson_to_arcgis_iter
+from terraformer.arcgis.geojson import GeoJSONError
 
 
 class TestGeoJSONToArcGIS(unittest.TestCase):
@@ -537,6 +538,100 @@ class TestGeoJSONToArcGIS(unittest.TestCase):
         geojson_to_arcgis(in_geojson)
         self.assertEqual(json.dumps(in_geojson), original)
 
+    def test_no_copy(self):
+        """Should share unchanged coordinate arrays and properties with the input when copy=False"""
+        ring = [[100.0, 0.0], [100.0, 1.0], [101.0, 1.0], [101.0, 0.0], [100.0, 0.0]]
+        hole = [[100.2, 0.2], [100.8, 0.2], [100.8, 0.8], [100.2, 0.2]]
+        reversed_hole = [[100.2, 0.2], [100.8, 0.8], [100.8, 0.2], [100.2, 0.2]]
+        properties = {"prop0": "value0"}
+        in_geojson = {
+            "type": "Feature",
+            "geometry": {"type": "Polygon", "coordinates": [ring, reversed_hole]},
+            "properties": properties,
+        }
+        expected = geojson_to_arcgis(in_geojson)
+        output = geojson_to_arcgis(in_geojson, copy=False)
+        self.assertEqual(output, expected)
+        self.assertIs(output["geometry"]["rings"][0], ring)
+        self.assertEqual(output["geometry"]["rings"][1], hole)  # Re-wound, so not shared
+        self.assertIsNot(output["geometry"]["rings"][1], reversed_hole)
+        self.assertIs(output["attributes"], properties)
+        self.assertIsNot(expected["geometry"]["rings"][0], ring)
+
+        in_geojson = {"type": "LineString", "coordinates": ring}
+        self.assertIs(geojson_to_arcgis(in_geojson, copy=False)["paths"][0], ring)
+
+    def test_no_copy_input_unchanged(self):
+        """Should copy properties when copy=False if adding the ID would otherwise modify them"""
+        properties = {"prop0": "value0"}
+        in_geojson = {"type": "Feature", "id": 7, "geometry": None, "properties": properties}
+        output = geojson_to_arcgis(in_geojson, copy=False)
+        self.assertEqual(output, {"attributes": {"prop0": "value0", "OBJECTID": 7}})
+        self.assertEqual(properties, {"prop0": "value0"})
+
+    def test_precision(self):
+        """Should round coordinates, drop merged vertices and collapsed rings, and keep rings closed"""
+        in_geojson = {
+            "type": "MultiPolygon",
+            "coordinates": [
+                [[[0.00001, 0.00002], [9.9999, 0.0], [10.0, 10.0], [0.0, 10.0]]],
+                [[[20.0, 20.0], [20.0001, 20.0], [20.0001, 20.0001], [20.0, 20.0]]],
+            ],
+        }
+        output = geojson_to_arcgis(in_geojson, precision=2)
+        self.assertEqual(
+            output,
+            {
+                "spatialReference": {"wkid": 4326},
+                "rings": [[[0.0, 0.0], [0.0, 10.0], [10.0, 10.0], [10.0, 0.0], [0.0, 0.0]]],
+            },
+        )
+        in_geojson = {"type": "MultiPoint", "coordinates": [[1.23456, 2.34567], [1.23457, 2.34568]]}
+        self.assertEqual(geojson_to_arcgis(in_geojson, precision=3)["points"], [[1.235, 2.346], [1.235, 2.346]])
+
+    def test_simplify(self):
+        """Should simplify lines and rings, dropping polygons whose outer ring collapses"""
+        in_geojson = {
+            "type": "MultiPolygon",
+            "coordinates": [
+                [[[0, 0], [10, 0], [10, 10], [5, 10.01], [0, 10], [0, 0]]],
+                [[[20, 20], [20.01, 20], [20.01, 20.01], [20, 20]]],
+            ],
+        }
+        output = geojson_to_arcgis(in_geojson, simplify=0.1)
+        self.assertEqual(output["rings"], [[[0, 0], [0, 10], [10, 10], [10, 0], [0, 0]]])
+        in_geojson = {"type": "MultiLineString", "coordinates": [[[0, 0], [1, 0.01], [2, 0]], [[0, 0], [1, 1]]]}
+        self.assertEqual(geojson_to_arcgis(in_geojson, simplify=0.1)["paths"], [[[0, 0], [2, 0]], [[0, 0], [1, 1]]])
+        self.assertEqual(in_geojson["coordinates"][0], [[0, 0], [1, 0.01], [2, 0]])  # Input unchanged
+
+    def test_fields_where(self):
+        """Should skip Features rejected by the predicate without converting them, and keep only the selected fields"""
+        properties = {"kind": "a", "name": "one", "value": 1}
+        feature_collection = {
+            "type": "FeatureCollection",
+            "features": [
+                {"type": "Feature", "geometry": {"type": "Point", "coordinates": [1, 2]}, "properties": properties},
+                {"type": "Feature", "geometry": {"type": "Bogus"}, "properties": {"kind": "b"}, "id": 2},
+                {"type": "Feature", "geometry": None, "properties": None, "id": 3},
+            ],
+        }
+        output = geojson_to_arcgis(feature_collection, fields=["value", "name"], where=lambda p: p.get("kind") != "b")
+        self.assertEqual(
+            output,
+            [
+                {
+                    "geometry": {"x": 1, "y": 2, "spatialReference": {"wkid": 4326}},
+                    "attributes": {"value": 1, "name": "one"},
+                },
+                {"attributes": {"OBJECTID": 3}},
+            ],
+        )
+        self.assertEqual(list(output[0]["attributes"]), ["value", "name"])
+        self.assertEqual(properties, {"kind": "a", "name": "one", "value": 1})
+        output = geojson_to_arcgis_iter(feature_collection["features"], where=lambda p: p.get("kind") == "b")
+        with self.assertRaises(GeoJSONError):
+            list(output)
+
 
 if __name__ == "__main__":
     unittest.main()
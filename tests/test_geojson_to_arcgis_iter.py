@@ -0,0 +1,79 @@
+import io
+import json
+import types
+import unittest
+
+from terraformer.arcgis import geojson_to_arcgis, geojson_to_arcgis_iter
+from terraformer.arcgis.geojson import GeoJSONError
+
+FEATURE_COLLECTION = {
+    "type": "FeatureCollection",
+    "features": [
+        {
+            "type": "Feature",
+            "id": 1,
+            "geometry": {"type": "Point", "coordinates": [102.0, 0.5]},
+            "properties": {"prop0": "value0"},
+        },
+        {
+            "type": "Feature",
+            "geometry": {"type": "LineString", "coordinates": [[102.0, 0.0], [103.0, 1.0], [104.0, 0.0]]},
+            "properties": {"prop0": "value0", "prop1": 0.0},
+        },
+        {
+            "type": "Feature",
+            "geometry": {
+                "type": "Polygon",
+                "coordinates": [[[100.0, 0.0], [101.0, 0.0], [101.0, 1.0], [100.0, 1.0], [100.0, 0.0]]],
+            },
+            "properties": {"prop0": "value0", "prop1": {"this": "that"}},
+        },
+    ],
+}
+
+
+class TestGeoJSONToArcGISIter(unittest.TestCase):
+
+    def test_feature_collection(self):
+        """Should lazily yield the same features as geojson_to_arcgis() does for a FeatureCollection"""
+        output = geojson_to_arcgis_iter(FEATURE_COLLECTION)
+        self.assertIsInstance(output, types.GeneratorType)
+        self.assertEqual(list(output), geojson_to_arcgis(FEATURE_COLLECTION))
+
+    def test_feature_iterable(self):
+        """Should accept any iterable of Features and pass options through"""
+        features = (feature for feature in FEATURE_COLLECTION["features"])
+        output = list(geojson_to_arcgis_iter(features, id_attribute="FID", wkid=3857))
+        self.assertEqual(output, geojson_to_arcgis(FEATURE_COLLECTION, id_attribute="FID", wkid=3857))
+
+    def test_geojson_text_sequence(self):
+        """Should read RFC 8142 GeoJSON Text Sequences, including records spanning multiple lines"""
+        text = "".join(
+            f"\x1e{json.dumps(feature, indent=2 if i == 2 else None)}\n"
+            for i, feature in enumerate(FEATURE_COLLECTION["features"])
+        )
+        expected = geojson_to_arcgis(FEATURE_COLLECTION)
+        self.assertEqual(list(geojson_to_arcgis_iter(io.StringIO(text))), expected)
+        self.assertEqual(list(geojson_to_arcgis_iter(io.BytesIO(text.encode()))), expected)
+
+    def test_newline_delimited(self):
+        """Should read newline-delimited GeoJSON, skipping blank lines"""
+        text = "\n\n".join(json.dumps(feature) for feature in FEATURE_COLLECTION["features"])
+        output = list(geojson_to_arcgis_iter(io.BytesIO(text.encode())))
+        self.assertEqual(output, geojson_to_arcgis(FEATURE_COLLECTION))
+
+    def test_invalid_record(self):
+        """Should raise a GeoJSONError for records that aren't valid JSON"""
+        with self.assertRaises(GeoJSONError):
+            list(geojson_to_arcgis_iter(io.StringIO('{"type": "Feature", "geometry"\n')))
+
+    def test_invalid_source(self):
+        """Should raise a GeoJSONError for GeoJSON objects that aren't FeatureCollections"""
+        with self.assertRaises(GeoJSONError):
+            list(geojson_to_arcgis_iter(FEATURE_COLLECTION["features"][0]))
+        with self.assertRaises(GeoJSONError):
+            list(geojson_to_arcgis_iter({"type": "FeatureCollection", "features": []}))
+
+
+if __name__ == "__main__":
+    unittest.main()
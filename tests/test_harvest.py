@@ -0,0 +1,171 @@
+import json
+import random
+import threading
+import unittest
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from unittest import mock
+from urllib.parse import parse_qs
+
+from terraformer.arcgis import HarvestError, arcgis_to_geojson, harvest_layer
+
+LAYER_PATH = "/arcgis/rest/services/Test/FeatureServer/0"
+FEATURE_COUNT = 237
+MAX_RECORD_COUNT = 40
+
+
+def _feature(oid):
+    return {"geometry": {"x": oid * 0.5, "y": -oid * 0.25}, "attributes": {"OBJECTID": oid, "name": f"feature {oid}"}}
+
+
+class _FeatureServer(BaseHTTPRequestHandler):
+    """Stand-in for an ArcGIS feature layer that caps responses at MAX_RECORD_COUNT features"""
+
+    protocol_version = "HTTP/1.1"
+
+    def do_POST(self):
+        form = parse_qs(self.rfile.read(int(self.headers["Content-Length"])).decode())
+        params = {key: values[0] for key, values in form.items()}
+        self.server.requests.append((self.path, params))
+        self.server.clients.add(self.client_address)
+        if self.path == LAYER_PATH:
+            self._send(
+                {
+                    "maxRecordCount": MAX_RECORD_COUNT,
+                    "fields": [{"name": "OBJECTID", "type": "esriFieldTypeOID"}, {"name": "name"}],
+                }
+            )
+        elif self.path == LAYER_PATH + "/query":
+            self._query(params)
+        else:
+            self._send({"error": {"code": 404, "message": "Not found"}})
+
+    def _query(self, params):
+        if params["where"] == "fail":
+            return self._send({"error": {"code": 400, "message": "Unable to complete operation."}})
+        ids = list(range(1, FEATURE_COUNT + 1))
+        if params.get("returnIdsOnly") == "true":
+            random.Random(0).shuffle(ids)
+            return self._send({"objectIdFieldName": "OBJECTID", "objectIds": ids})
+        if params.get("returnCountOnly") == "true":
+            return self._send({"count": len(ids)})
+        if "objectIds" in params:
+            ids = [int(oid) for oid in params["objectIds"].split(",")]
+        else:
+            offset = int(params["resultOffset"])
+            ids = ids[offset : offset + int(params["resultRecordCount"])]
+        features = [_feature(oid) for oid in ids[:MAX_RECORD_COUNT]]
+        if params["outFields"] != "*":
+            fields = params["outFields"].split(",")
+            for feature in features:
+                feature["attributes"] = {k: v for k, v in feature["attributes"].items() if k in fields}
+        response = {
+            "objectIdFieldName": "OBJECTID",
+            "spatialReference": {"wkid": int(params["outSR"])},
+            "features": features,
+        }
+        if len(ids) > MAX_RECORD_COUNT:
+            response["exceededTransferLimit"] = True
+        self._send(response)
+
+    def _send(self, body):
+        data = json.dumps(body).encode()
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+    def log_message(self, format, *args):
+        pass
+
+
+class TestHarvestLayer(unittest.TestCase):
+
+    @classmethod
+    def setUpClass(cls):
+        cls.server = ThreadingHTTPServer(("127.0.0.1", 0), _FeatureServer)
+        cls.thread = threading.Thread(target=cls.server.serve_forever, daemon=True)
+        cls.thread.start()
+        cls.url = f"http://127.0.0.1:{cls.server.server_address[1]}{LAYER_PATH}"
+        cls.expected = arcgis_to_geojson({"features": [_feature(oid) for oid in range(1, FEATURE_COUNT + 1)]})
+
+    @classmethod
+    def tearDownClass(cls):
+        cls.server.shutdown()
+        cls.server.server_close()
+
+    def setUp(self):
+        self.server.requests = []
+        self.server.clients = set()
+
+    def test_ids_strategy(self):
+        """Should page through object IDs concurrently and yield every feature in object ID order"""
+        features = list(harvest_layer(self.url, max_workers=3))
+        self.assertEqual(features, self.expected["features"])
+        pages = [params for path, params in self.server.requests if "objectIds" in params]
+        self.assertEqual(len(pages), 6)  # ceil(237 / 40)
+        self.assertLessEqual(len(self.server.clients), 4)  # Connections are reused
+
+    def test_offset_strategy(self):
+        """Should page with resultOffset when planning from the feature count"""
+        features = list(harvest_layer(self.url, strategy="offset", max_workers=2))
+        self.assertEqual(features, self.expected["features"])
+        self.assertTrue(all(params["orderByFields"] == "OBJECTID" for _, params in self.server.requests[2:]))
+
+    def test_truncated_pages(self):
+        """Should fetch the rest of pages larger than the server's maxRecordCount"""
+        for strategy in ("ids", "offset"):
+            with self.subTest(strategy=strategy):
+                features = list(harvest_layer(self.url, page_size=100, strategy=strategy, id_attribute="name"))
+                self.assertEqual([f["id"] for f in features], [f"feature {i}" for i in range(1, FEATURE_COUNT + 1)])
+
+    def test_out_fields(self):
+        """Should always request the object ID field, which truncated pages are completed by"""
+        for strategy in ("ids", "offset"):
+            with self.subTest(strategy=strategy):
+                features = list(harvest_layer(self.url, out_fields="name", page_size=100, strategy=strategy))
+                self.assertEqual(features, self.expected["features"])
+                pages = [params for _, params in self.server.requests if "orderByFields" in params]
+                self.assertTrue(all(params["outFields"] == "name,OBJECTID" for params in pages))
+
+    def test_truncated_page_without_ids(self):
+        """Should raise HarvestError if a truncated page's features have no object IDs to request the rest by"""
+
+        def request(_url, params):
+            if params.get("returnIdsOnly"):
+                return {"objectIdFieldName": "OBJECTID", "objectIds": [1, 2]}
+            return {"exceededTransferLimit": True, "features": [{"geometry": {"x": 1, "y": 2}}]}
+
+        with mock.patch("terraformer.arcgis.harvest._Client.request", side_effect=request) as patched:
+            with self.assertRaises(HarvestError):
+                list(harvest_layer(self.url, page_size=10))
+        self.assertEqual(patched.call_count, 2)
+
+    def test_params(self):
+        """Should send extra parameters with every request"""
+        with self.assertWarns(UserWarning):  # Output isn't WGS 84
+            list(harvest_layer(self.url, page_size=100, params={"token": "secret", "outSR": 3857}))
+        self.assertTrue(all(params["token"] == "secret" for _, params in self.server.requests))
+        self.assertTrue(all(params["outSR"] == "3857" for _, params in self.server.requests))
+
+    def test_url_query_and_where(self):
+        """Should send the URL's query parameters with every request, and pass a where predicate to the converter"""
+        features = list(harvest_layer(self.url + "?token=secret&outSR=4326", where=lambda a: a["OBJECTID"] % 2 == 0))
+        self.assertEqual(features, self.expected["features"][1::2])
+        self.assertTrue(all(path.startswith(LAYER_PATH) for path, _ in self.server.requests))
+        self.assertTrue(all(params["token"] == "secret" for _, params in self.server.requests))
+
+    def test_errors(self):
+        """Should raise HarvestError on ArcGIS error responses and failed requests"""
+        with self.assertRaises(HarvestError):
+            list(harvest_layer(self.url, where_clause="fail"))
+        with self.assertRaises(HarvestError):
+            list(harvest_layer(self.url + "/missing", page_size=10))
+        with self.assertRaises(HarvestError):
+            list(harvest_layer("http://127.0.0.1:9/layer", page_size=10, timeout=1))
+        with self.assertRaises(ValueError):
+            list(harvest_layer(self.url, strategy="random"))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,70 @@
+import json
+import unittest
+
+from terraformer import jsonio
+from terraformer.arcgis import arcgis_to_geojson, arcgis_to_geojson_bytes, geojson_to_arcgis, geojson_to_arcgis_bytes
+from terraformer.arcgis.geojson import GeoJSONError
+from terraformer.packed import PackedCoordinates
+
+FEATURESET = {
+    "spatialReference": {"wkid": 4326},
+    "features": [
+        {
+            "geometry": {"rings": [[[0.5, 0.5], [0.5, 10.25], [10.125, 10.25], [10.125, 0.5], [0.5, 0.5]]]},
+            "attributes": {"OBJECTID": 1, "name": "Zürich / north", "value": 0.1, "flag": None},
+        },
+        {"geometry": {"x": -77.03, "y": 38.89}, "attributes": {"OBJECTID": 2, "name": "b", "value": 1e-7}},
+    ],
+}
+
+
+class TestJSONBackends(unittest.TestCase):
+
+    def tearDown(self):
+        jsonio.set_json_backend()
+
+    def test_default_backend(self):
+        """Should select the fastest installed backend by default, falling back to the standard library"""
+        self.assertEqual(jsonio.get_json_backend(), jsonio.available_backends()[0])
+        self.assertIn("json", jsonio.available_backends())
+
+    def test_unknown_backend(self):
+        """Should reject unknown backends"""
+        with self.assertRaises(ValueError):
+            jsonio.set_json_backend("simplejson")
+
+    def test_backends_agree(self):
+        """Should parse and serialize identically with every installed backend"""
+        data = json.dumps(FEATURESET).encode()
+        expected_geojson = arcgis_to_geojson(FEATURESET)
+        expected_arcgis = geojson_to_arcgis(expected_geojson)
+        for backend in jsonio.available_backends():
+            with self.subTest(backend=backend):
+                jsonio.set_json_backend(backend)
+                self.assertEqual(jsonio.loads(data), FEATURESET)
+                self.assertEqual(json.loads(jsonio.dumps(FEATURESET)), FEATURESET)
+                output = arcgis_to_geojson_bytes(data)
+                self.assertIsInstance(output, bytes)
+                self.assertEqual(json.loads(output), expected_geojson)
+                self.assertEqual(json.loads(geojson_to_arcgis_bytes(output)), expected_arcgis)
+                with self.assertRaises(ValueError):
+                    jsonio.loads(b"{")
+
+    def test_packed_coordinates(self):
+        """Should serialize PackedCoordinates as nested coordinate lists"""
+        coordinates = [[1.0, 2.0], [3.0, 4.0]]
+        for backend in jsonio.available_backends():
+            with self.subTest(backend=backend):
+                jsonio.set_json_backend(backend)
+                self.assertEqual(json.loads(jsonio.dumps(PackedCoordinates.from_coordinates(coordinates))), coordinates)
+
+    def test_bytes_options(self):
+        """Should pass conversion options through and report invalid GeoJSON documents"""
+        output = arcgis_to_geojson_bytes(json.dumps(FEATURESET), id_attribute="name", packed=True)
+        self.assertEqual(json.loads(output), arcgis_to_geojson(FEATURESET, id_attribute="name"))
+        with self.assertRaises(GeoJSONError):
+            geojson_to_arcgis_bytes(b'{"type": ')
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,102 @@
+import copy
+import json
+import pickle
+import unittest
+from unittest import mock
+
+from terraformer import jsonio
+from terraformer.arcgis import arcgis_to_geojson, arcgis_to_geojson_iter
+from terraformer.arcgis.arcgis import _convert_rings_to_geojson
+from terraformer.lazy import LazyFeature, LazyValue
+
+FEATURESET = {
+    "features": [
+        {
+            "geometry": {"rings": [[[0, 0], [0, 10], [10, 10], [10, 0], [0, 0]], [[2, 2], [4, 2], [4, 4], [2, 2]]]},
+            "attributes": {"OBJECTID": 1, "name": "Café"},
+        },
+        {"geometry": {"x": 1, "y": 2}, "attributes": {"OBJECTID": 2, "name": "Bar"}},
+        {"geometry": {"foo": "bar"}, "attributes": {"OBJECTID": 3}},
+        {"attributes": {"OBJECTID": 4}},
+    ]
+}
+
+
+class TestLazyFeature(unittest.TestCase):
+
+    def test_resolve_on_access(self):
+        """Should compute a pending value once, when it's first accessed"""
+        compute = mock.Mock(return_value={"type": "Point", "coordinates": [1, 2]})
+        geometry = LazyValue(compute)
+        feature = LazyFeature(type="Feature", geometry=geometry, properties={"a": 1})
+        self.assertEqual(feature["properties"], {"a": 1})
+        self.assertIn("geometry", feature)
+        self.assertEqual(len(feature), 3)
+        self.assertFalse(feature.is_resolved("geometry"))
+        self.assertFalse(geometry.resolved)
+        compute.assert_not_called()
+
+        self.assertEqual(feature["geometry"]["coordinates"], [1, 2])
+        self.assertIs(feature.get("geometry"), feature["geometry"])
+        self.assertTrue(feature.is_resolved("geometry"))
+        self.assertTrue(geometry.resolved)
+        compute.assert_called_once()
+
+    def test_dict_compatibility(self):
+        """Should resolve pending values when the feature is compared, copied, unpacked, serialized or pickled"""
+        expected = {"type": "Feature", "geometry": {"type": "Point", "coordinates": [1, 2]}, "properties": None}
+
+        def lazy():
+            return LazyFeature(expected, geometry=LazyValue(lambda: expected["geometry"]))
+
+        self.assertEqual(lazy(), expected)
+        self.assertEqual(expected, lazy())
+        self.assertEqual(dict(lazy()), expected)
+        self.assertEqual({**lazy()}, expected)
+        self.assertEqual(lazy() | {}, expected)
+        self.assertEqual(dict(lazy().items()), expected)
+        self.assertEqual(list(lazy().values()), list(expected.values()))
+        self.assertEqual(lazy().copy(), expected)
+        self.assertEqual(copy.deepcopy(lazy()), expected)
+        self.assertEqual(pickle.loads(pickle.dumps(lazy())), expected)
+        self.assertEqual(json.loads(json.dumps(lazy())), expected)
+        self.assertEqual(lazy().pop("geometry"), expected["geometry"])
+        self.assertEqual(repr(lazy()), repr(expected))
+        for backend in jsonio.available_backends():
+            with self.subTest(backend=backend):
+                previous = jsonio.get_json_backend()
+                jsonio.set_json_backend(backend)
+                try:
+                    self.assertEqual(jsonio.dumps(lazy()), jsonio.dumps(expected))
+                finally:
+                    jsonio.set_json_backend(previous)
+
+
+class TestLazyConversion(unittest.TestCase):
+
+    def test_arcgis_to_geojson(self):
+        """Should convert features' geometries on first access, with the same results as without lazy"""
+        expected = arcgis_to_geojson(FEATURESET)
+        rings_target = "terraformer.arcgis.arcgis._convert_rings_to_geojson"
+        with mock.patch(rings_target, wraps=_convert_rings_to_geojson) as rings:
+            output = arcgis_to_geojson(FEATURESET, lazy=True)
+            features = output["features"]
+            self.assertTrue(all(isinstance(feature, LazyFeature) for feature in features))
+            self.assertEqual([feature["id"] for feature in features], [1, 2, 3, 4])
+            self.assertEqual(features[0]["properties"], {"OBJECTID": 1, "name": "Café"})
+            rings.assert_not_called()
+            self.assertEqual(features[0]["geometry"], expected["features"][0]["geometry"])
+            rings.assert_called_once()
+        self.assertIsNone(features[2]["geometry"])
+        self.assertEqual(output, expected)
+
+    def test_arcgis_to_geojson_iter(self):
+        """Should stream lazy features"""
+        data = json.dumps(FEATURESET).encode()
+        features = list(arcgis_to_geojson_iter(data, lazy=True))
+        self.assertFalse(features[0].is_resolved("geometry"))
+        self.assertEqual(features, arcgis_to_geojson(FEATURESET)["features"])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,123 @@
+import json
+import mmap
+import os
+import pickle
+import tempfile
+import unittest
+from unittest import mock
+
+from terraformer.arcgis import MappedFeatureFile, arcgis_to_geojson, geojson_to_arcgis
+from terraformer.jsonscan import JSONScanError, JSONScanner
+
+FEATURESET = {
+    "objectIdFieldName": "OBJECTID",
+    "features": [
+        {"geometry": {"x": i, "y": -i}, "attributes": {"OBJECTID": i + 1, "name": f"feature {i}"}} for i in range(100)
+    ],
+    # Follows the features, which the streaming readers can't apply
+    "transform": {"originPosition": "upperLeft", "scale": [0.5, 0.5], "translate": [0.0, 10.0]},
+}
+
+
+class TestMappedFeatureFile(unittest.TestCase):
+
+    def setUp(self):
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        self.directory = directory.name
+
+    def _write(self, name, data):
+        path = os.path.join(self.directory, name)
+        with open(path, "w", encoding="utf-8") as file:
+            file.write(data if isinstance(data, str) else json.dumps(data, indent=1))
+        return path
+
+    def test_esri_json(self):
+        """Should index an Esri JSON FeatureSet and convert its features, applying a trailing transform"""
+        with MappedFeatureFile(self._write("featureset.json", FEATURESET)) as features:
+            self.assertEqual(features.format, "esri")
+            self.assertEqual(len(features), 100)
+            self.assertEqual(features.header, {"objectIdFieldName": "OBJECTID", "transform": FEATURESET["transform"]})
+            self.assertEqual([json.loads(raw) for raw in features.iter_raw()], FEATURESET["features"])
+            self.assertEqual(list(features.iter_converted()), arcgis_to_geojson(FEATURESET)["features"])
+            output = list(features.iter_converted(fields=[], where=lambda attributes: attributes["OBJECTID"] < 3))
+            self.assertEqual([feature["geometry"]["coordinates"] for feature in output], [[0.0, 10.0], [0.5, 10.5]])
+
+    def test_esri_json_streamed(self):
+        """Should convert the features of a file that isn't indexed without indexing it, applying header members as
+        they're read"""
+        featureset = {"transform": FEATURESET["transform"], "features": FEATURESET["features"]}
+        with MappedFeatureFile(self._write("featureset.json", featureset)) as features:
+            with mock.patch.object(MappedFeatureFile, "build_index", side_effect=AssertionError):
+                self.assertEqual(list(features.iter_converted()), arcgis_to_geojson(featureset)["features"])
+        with MappedFeatureFile(self._write("trailing.json", FEATURESET)) as features:
+            with self.assertRaises(ValueError):
+                list(features.iter_converted())
+            self.assertEqual(list(features.build_index().iter_converted()), arcgis_to_geojson(FEATURESET)["features"])
+
+    def test_geojson(self):
+        """Should detect GeoJSON FeatureCollections and convert their features to Esri JSON"""
+        feature_collection = arcgis_to_geojson(FEATURESET)
+        with MappedFeatureFile(self._write("features.geojson", feature_collection)) as features:
+            self.assertEqual(features.format, "geojson")
+            self.assertEqual(list(features.iter_converted()), geojson_to_arcgis(feature_collection))
+        path = self._write("untyped.geojson", {"features": feature_collection["features"]})
+        with MappedFeatureFile(path) as features:
+            self.assertEqual(features.format, "geojson")
+
+    def test_split(self):
+        """Should split the features into byte spans that can be read separately, e.g. by pickled copies"""
+        features = MappedFeatureFile(self._write("featureset.json", FEATURESET)).build_index()
+        expected = list(features.iter_converted())
+        for parts in (1, 3, 7, 200):
+            with self.subTest(parts=parts):
+                spans = features.split(parts)
+                self.assertLessEqual(len(spans), parts)
+                copies = [pickle.loads(pickle.dumps(features)) for _ in spans]
+                output = [feature for copy, span in zip(copies, spans) for feature in copy.iter_converted(span)]
+                self.assertEqual(output, expected)
+                for copy in copies:
+                    copy.close()
+        sizes = [end - start for start, end in features.split(4)]
+        self.assertLess(max(sizes) - min(sizes), max(sizes) / 10)
+        features.close()
+        with MappedFeatureFile(self._write("empty.json", {"features": []})) as features:
+            self.assertEqual(features.split(4), [])
+
+    def test_invalid_features(self):
+        """Should convert nothing for a null features member, and raise ValueError for non-object features"""
+        with MappedFeatureFile(self._write("null.json", '{"features": null}')) as features:
+            self.assertEqual(list(features.iter_converted()), [])
+        with MappedFeatureFile(self._write("bad.json", '{"features": [{}, null]}')) as features:
+            with self.assertRaises(ValueError):
+                list(features.iter_converted())
+
+    def test_malformed(self):
+        """Should raise JSONScanError for empty, malformed and truncated files"""
+        for data in ("", "[]", '{"features": [{"geometry": {}}', '{"features": [{} {}]}'):
+            with self.subTest(data=data):
+                with MappedFeatureFile(self._write("bad.json", data)) as features, self.assertRaises(JSONScanError):
+                    features.build_index()
+
+
+class TestJSONScannerSpans(unittest.TestCase):
+
+    def test_mmap(self):
+        """Should scan memory maps in place, yielding value offsets"""
+        data = b'{"a": 1, "features": [{"b": "}"}, [2, [3]], "c"], "d": {}}'
+        with tempfile.TemporaryFile() as file:
+            file.write(data)
+            file.flush()
+            with mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ) as buffer:
+                spans = list(JSONScanner(buffer).iter_member_spans())
+                expected = [("a", b"1"), ("features", b'{"b": "}"}'), ("features", b"[2, [3]]"), ("features", b'"c"')]
+                self.assertEqual([(key, buffer[start:end]) for key, start, end in spans], [*expected, ("d", b"{}")])
+                elements = list(JSONScanner(buffer).iter_element_spans(spans[2][1], spans[3][2]))
+                self.assertEqual(elements, [span[1:] for span in spans[2:4]])
+                self.assertEqual(list(JSONScanner(buffer).iter_members()), [(k, buffer[s:e]) for k, s, e in spans])
+        with tempfile.TemporaryFile() as file, self.assertRaises(JSONScanError):
+            list(JSONScanner(file).iter_member_spans())
+
+
+if __name__ == "__main__":
+    unittest.main()
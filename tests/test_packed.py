@@ -0,0 +1,84 @@
+import sys
+import unittest
+
+from terraformer.arcgis import arcgis_to_geojson, geojson_to_arcgis
+from terraformer.packed import PackedCoordinates
+
+LINESTRING = [[0.5, 1.5], [2.0, 3.0], [4.0, 5.0]]
+POLYGON = [
+    [[0.0, 0.0], [10.0, 0.0], [10.0, 10.0], [0.0, 10.0], [0.0, 0.0]],
+    [[2.0, 2.0], [2.0, 4.0], [4.0, 4.0], [4.0, 2.0], [2.0, 2.0]],
+]
+MULTIPOLYGON = [POLYGON, [[[20.0, 20.0], [30.0, 20.0], [30.0, 30.0], [20.0, 20.0]]]]
+
+
+class TestPackedCoordinates(unittest.TestCase):
+
+    def test_round_trip(self):
+        """Should convert nested coordinate lists to packed form and back without changes"""
+        for coordinates in (LINESTRING, POLYGON, [[[1.0, 2.0, 3.0], [4.0, 5.0, 6.0]]]):
+            packed = PackedCoordinates.from_coordinates(coordinates)
+            self.assertEqual(packed.to_coordinates(), coordinates)
+            self.assertEqual(len(packed), len(coordinates))
+
+    def test_layout(self):
+        """Should store interleaved coordinates with ring and part offsets"""
+        packed = PackedCoordinates.from_coordinates([POLYGON, [POLYGON[0]]])
+        self.assertEqual(packed.depth, 4)
+        self.assertEqual(packed.dims, 2)
+        self.assertEqual(packed.vertex_count, 15)
+        self.assertEqual(list(packed.ring_offsets), [0, 5, 10, 15])
+        self.assertEqual(list(packed.part_offsets), [0, 2, 3])
+        self.assertEqual(list(packed.coords[:4]), [0.0, 0.0, 10.0, 0.0])
+
+    def test_compact(self):
+        """Should use much less memory per vertex than nested lists"""
+        coordinates = [[float(i), float(i + 1)] for i in range(10000)]
+        list_bytes = sys.getsizeof(coordinates) + sum(
+            sys.getsizeof(vertex) + sum(sys.getsizeof(value) for value in vertex) for vertex in coordinates
+        )
+        self.assertLess(PackedCoordinates.from_coordinates(coordinates).nbytes * 5, list_bytes)
+
+    def test_invalid(self):
+        """Should reject empty, unnested and mixed-dimension coordinates"""
+        for coordinates in ([], [1.0, 2.0], [[0.0, 0.0], [1.0, 1.0, 1.0]]):
+            with self.assertRaises(ValueError):
+                PackedCoordinates.from_coordinates(coordinates)
+
+
+class TestPackedConversion(unittest.TestCase):
+
+    def test_arcgis_to_geojson(self):
+        """Should accept packed Esri geometries and emit packed GeoJSON coordinates"""
+        in_json = {"rings": PackedCoordinates.from_coordinates(MULTIPOLYGON[1] + POLYGON)}
+        expected = arcgis_to_geojson({"rings": MULTIPOLYGON[1] + POLYGON})
+        self.assertEqual(arcgis_to_geojson(in_json), expected)
+        output = arcgis_to_geojson(in_json, packed=True)
+        self.assertIsInstance(output["coordinates"], PackedCoordinates)
+        self.assertEqual(output["coordinates"].to_coordinates(), expected["coordinates"])
+
+    def test_arcgis_to_geojson_feature(self):
+        """Should emit packed coordinates for Feature geometries, but leave Point coordinates as lists"""
+        in_json = {
+            "features": [
+                {"geometry": {"paths": [LINESTRING]}, "attributes": {"OBJECTID": 1}},
+                {"geometry": {"x": 1.0, "y": 2.0}, "attributes": {"OBJECTID": 2}},
+            ]
+        }
+        output = arcgis_to_geojson(in_json, packed=True)
+        self.assertEqual(output["features"][0]["geometry"]["coordinates"].to_coordinates(), LINESTRING)
+        self.assertEqual(output["features"][1]["geometry"]["coordinates"], [1.0, 2.0])
+
+    def test_geojson_to_arcgis(self):
+        """Should accept packed GeoJSON coordinates and emit packed Esri geometries"""
+        in_geojson = {"type": "MultiPolygon", "coordinates": MULTIPOLYGON}
+        expected = geojson_to_arcgis(in_geojson)
+        packed_input = {"type": "MultiPolygon", "coordinates": PackedCoordinates.from_coordinates(MULTIPOLYGON)}
+        self.assertEqual(geojson_to_arcgis(packed_input), expected)
+        output = geojson_to_arcgis(packed_input, packed=True)
+        self.assertIsInstance(output["rings"], PackedCoordinates)
+        self.assertEqual(output["rings"].to_coordinates(), expected["rings"])
+
+
+if __name__ == "__main__":
+    unittest.main()
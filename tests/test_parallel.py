@@ -0,0 +1,191 @@
+import io
+import json
+import sys
+import threading
+import unittest
+from concurrent.futures import ThreadPoolExecutor
+from unittest import mock
+
+from terraformer.arcgis import (
+    arcgis_to_geojson,
+    arcgis_to_geojson_parallel,
+    arcgis_to_geojson_threaded,
+    geojson_to_arcgis,
+    geojson_to_arcgis_parallel,
+    geojson_to_arcgis_threaded,
+)
+from terraformer.cache import GeometryCache
+from terraformer.stats import collect_stats
+
+
+def _featureset(count):
+    features = []
+    for i in range(count):
+        x = float(i % 50)
+        y = float(i // 50)
+        features.append(
+            {
+                "geometry": {
+                    "rings": [
+                        [[x, y], [x, y + 0.9], [x + 0.9, y + 0.9], [x + 0.9, y], [x, y]],
+                        [[x + 0.2, y + 0.2], [x + 0.6, y + 0.2], [x + 0.6, y + 0.6], [x + 0.2, y + 0.2]],
+                    ]
+                },
+                "attributes": {"OBJECTID": i + 1, "name": f"feature {i}"},
+            }
+        )
+    return {"geometryType": "esriGeometryPolygon", "spatialReference": {"wkid": 4326}, "features": features}
+
+
+def _even(attributes):
+    return attributes.get("OBJECTID", 0) % 2 == 0
+
+
+class TestParallelConversion(unittest.TestCase):
+
+    @classmethod
+    def setUpClass(cls):
+        cls.featureset = _featureset(250)
+        cls.expected_geojson = arcgis_to_geojson(cls.featureset)
+        cls.expected_arcgis = geojson_to_arcgis(cls.expected_geojson)
+
+    def test_arcgis_to_geojson_featureset(self):
+        """Should convert a FeatureSet in worker processes and preserve feature order"""
+        output = list(arcgis_to_geojson_parallel(self.featureset, max_workers=2, chunk_size=16))
+        self.assertEqual(output, self.expected_geojson["features"])
+
+    def test_arcgis_to_geojson_stream(self):
+        """Should send raw JSON chunks from a file object or bytes to worker processes"""
+        data = json.dumps(self.featureset).encode()
+        output = list(arcgis_to_geojson_parallel(io.BytesIO(data), max_workers=2, chunk_size=32))
+        self.assertEqual(output, self.expected_geojson["features"])
+        output = list(arcgis_to_geojson_parallel(data, id_attribute="name", max_workers=2, chunk_size=100))
+        self.assertEqual(output, arcgis_to_geojson(self.featureset, id_attribute="name")["features"])
+
+    def test_arcgis_to_geojson_iterable(self):
+        """Should accept an iterator of features"""
+        features = iter(self.featureset["features"])
+        output = list(arcgis_to_geojson_parallel(features, max_workers=2, chunk_size=7))
+        self.assertEqual(output, self.expected_geojson["features"])
+
+    def test_arcgis_to_geojson_transform(self):
+        """Should send a FeatureSet's quantization transform to workers along with each chunk"""
+        featureset = {
+            "transform": {"originPosition": "upperLeft", "scale": [0.5, 0.5], "translate": [0.0, 10.0]},
+            "features": [{"geometry": {"x": i, "y": i}, "attributes": {"OBJECTID": i + 1}} for i in range(40)],
+        }
+        expected = arcgis_to_geojson(featureset)["features"]
+        self.assertEqual(expected[2]["geometry"]["coordinates"], [1.0, 9.0])
+        output = list(arcgis_to_geojson_parallel(featureset, max_workers=2, chunk_size=8))
+        self.assertEqual(output, expected)
+        data = json.dumps(featureset).encode()
+        output = list(arcgis_to_geojson_parallel(data, max_workers=2, chunk_size=8))
+        self.assertEqual(output, expected)
+
+    def test_packed_results(self):
+        """Should pass conversion options to workers, e.g. packed=True for cheap result transfer"""
+        output = list(arcgis_to_geojson_parallel(self.featureset, max_workers=2, chunk_size=50, packed=True))
+        expected = arcgis_to_geojson(self.featureset, packed=True)["features"]
+        self.assertEqual(output, expected)
+
+    def test_fields_where(self):
+        """Should send picklable `where` predicates and field selections to workers"""
+        output = list(arcgis_to_geojson_parallel(self.featureset, max_workers=2, chunk_size=16, where=_even))
+        self.assertEqual(output, arcgis_to_geojson(self.featureset, where=_even)["features"])
+        self.assertEqual(len(output), 125)
+        output = list(geojson_to_arcgis_parallel(self.expected_geojson, max_workers=2, fields=["name"], where=_even))
+        self.assertEqual(output, geojson_to_arcgis(self.expected_geojson, fields=["name"], where=_even))
+        self.assertEqual(output[0]["attributes"], {"name": "feature 1", "OBJECTID": 2})
+
+    def test_geojson_to_arcgis(self):
+        """Should convert a FeatureCollection or GeoJSON text sequence in worker processes and preserve order"""
+        output = list(geojson_to_arcgis_parallel(self.expected_geojson, max_workers=2, chunk_size=16))
+        self.assertEqual(output, self.expected_arcgis)
+        text = "".join(f"\x1e{json.dumps(feature)}\n" for feature in self.expected_geojson["features"])
+        output = list(geojson_to_arcgis_parallel(io.StringIO(text), wkid=3857, max_workers=2, chunk_size=64))
+        self.assertEqual(output, geojson_to_arcgis(self.expected_geojson, wkid=3857))
+
+
+class TestThreadedConversion(unittest.TestCase):
+
+    @classmethod
+    def setUpClass(cls):
+        cls.featureset = _featureset(250)
+        cls.featureset["features"].extend(
+            {"geometry": {"paths": [[[i, 0], [i + 0.5, 0.001], [i + 1, 0]]]}, "attributes": {"OBJECTID": 1000 + i}}
+            for i in range(50)
+        )
+        cls.expected_geojson = arcgis_to_geojson(cls.featureset)
+        cls.expected_arcgis = geojson_to_arcgis(cls.expected_geojson)
+
+    def setUp(self):
+        # Switch threads often, to interleave conversions even with the GIL
+        switch_interval = sys.getswitchinterval()
+        sys.setswitchinterval(1e-5)
+        self.addCleanup(sys.setswitchinterval, switch_interval)
+
+    def test_threaded(self):
+        """Should convert in threads and preserve feature order, recording stats from every thread"""
+        for max_workers in (None, 1, 4):
+            with self.subTest(max_workers=max_workers):
+                with collect_stats() as stats:
+                    output = list(arcgis_to_geojson_threaded(self.featureset, max_workers=max_workers, chunk_size=16))
+                self.assertEqual(output, self.expected_geojson["features"])
+                self.assertEqual(stats.counters["features"], len(output))
+                output = geojson_to_arcgis_threaded(self.expected_geojson, max_workers=max_workers, chunk_size=16)
+                self.assertEqual(list(output), self.expected_arcgis)
+        data = json.dumps(self.featureset).encode()
+        output = list(arcgis_to_geojson_threaded(io.BytesIO(data), max_workers=3, chunk_size=32, packed=True))
+        self.assertEqual(output, arcgis_to_geojson(self.featureset, packed=True)["features"])
+
+    def test_threaded_stream_options(self):
+        """Should give each chunk of a streamed source its own copy of the options the header was applied to"""
+        data = json.dumps(self.featureset).encode()
+        with mock.patch("terraformer.arcgis.parallel.arcgis_to_geojson", wraps=arcgis_to_geojson) as convert:
+            output = list(arcgis_to_geojson_threaded(io.BytesIO(data), max_workers=4, chunk_size=32))
+        self.assertEqual(output, self.expected_geojson["features"])
+        for call in convert.call_args_list:
+            self.assertEqual(call.kwargs["spatial_reference"], {"wkid": 4326})
+        # One set of checked spatial references per chunk, none of them shared between threads
+        sets = {id(call.kwargs["checked_spatial_references"]) for call in convert.call_args_list}
+        self.assertEqual(len(sets), -(-len(self.featureset["features"]) // 32))
+
+    def test_concurrent_stress(self):
+        """Should give the same results converting concurrently, sharing a cache, as converting in one thread"""
+        option_sets = [
+            {},
+            {"precision": 3},
+            {"simplify": 0.01, "packed": True},
+            {"copy": False, "fields": ["name"]},
+            {"where": lambda attributes: attributes["OBJECTID"] % 3 == 0},
+        ]
+        expected = [
+            (arcgis_to_geojson(self.featureset, **options), geojson_to_arcgis(self.expected_geojson, **options))
+            for options in option_sets
+        ]
+        cache = GeometryCache(max_entries=100)
+        lazy_features = arcgis_to_geojson(self.featureset, lazy=True)["features"]
+        barrier = threading.Barrier(8, timeout=30)  # Fail rather than hang if a thread never arrives
+
+        def convert(i):
+            barrier.wait()
+            options = option_sets[i % len(option_sets)]
+            result = (
+                arcgis_to_geojson(self.featureset, cache=cache, **options),
+                geojson_to_arcgis(self.expected_geojson, cache=cache, **options),
+            )
+            lazy_geometries = [feature["geometry"] for feature in lazy_features[i % 8 :: 8]]
+            return i, result, lazy_geometries
+
+        with ThreadPoolExecutor(8) as executor:
+            for i, result, lazy_geometries in executor.map(convert, range(16)):
+                self.assertEqual(result, expected[i % len(option_sets)])
+                geometries = [feature["geometry"] for feature in self.expected_geojson["features"][i % 8 :: 8]]
+                self.assertEqual(lazy_geometries, geometries)
+        info = cache.info()
+        self.assertGreater(info["hits"], 0)
+        self.assertLessEqual(info["entries"], 100)
+
+
+if __name__ == "__main__":
+    unittest.main()
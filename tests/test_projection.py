@@ -0,0 +1,107 @@
+import io
+import json
+import random
+import unittest
+import warnings
+from unittest import mock
+
+from terraformer import projection, vectorized
+from terraformer.arcgis import arcgis_to_geojson, arcgis_to_geojson_iter, geojson_to_arcgis
+
+# Portland, OR in WGS 84 and Web Mercator
+LON_LAT = [-122.6765, 45.5231]
+X_Y = [-13656285.512301026, 5704252.262945027]
+
+
+class TestProjection(unittest.TestCase):
+
+    def assertPointsAlmostEqual(self, a, b, places=6):
+        self.assertEqual(len(a), len(b))
+        for value_a, value_b in zip(a, b):
+            self.assertAlmostEqual(value_a, value_b, places)
+
+    def test_is_web_mercator(self):
+        """Should recognize Web Mercator WKIDs in spatialReference objects and as ints"""
+        for wkid in (3857, 102100, 102113, 900913):
+            self.assertTrue(projection.is_web_mercator(wkid))
+        self.assertTrue(projection.is_web_mercator({"wkid": 102100, "latestWkid": 3857}))
+        self.assertTrue(projection.is_web_mercator({"latestWkid": 3857}))
+        self.assertFalse(projection.is_web_mercator({"wkid": 4326}))
+        self.assertFalse(projection.is_web_mercator(27700))
+
+    def test_points(self):
+        """Should reproject points both ways, keeping z and clamping latitudes to Web Mercator's bounds"""
+        self.assertPointsAlmostEqual(projection.wgs84_to_web_mercator_point(LON_LAT), X_Y, 6)
+        self.assertPointsAlmostEqual(projection.web_mercator_to_wgs84_point(X_Y), LON_LAT, 9)
+        self.assertEqual(projection.web_mercator_to_wgs84_point([*X_Y, 12.5])[2], 12.5)
+        corner = projection.wgs84_to_web_mercator_point([180, projection.MAX_LATITUDE])
+        self.assertPointsAlmostEqual(corner, [20037508.342789244, 20037508.342789244], 6)
+        self.assertEqual(
+            projection.wgs84_to_web_mercator_point([0, 90]), projection.wgs84_to_web_mercator_point([0, 89])
+        )
+
+    def test_paths(self):
+        """Should reproject long paths the same with and without NumPy"""
+        rng = random.Random(3)
+        path = [[rng.uniform(-180, 180), rng.uniform(-85, 85)] for _ in range(500)]
+        projected = projection.wgs84_to_web_mercator_path(path)
+        with mock.patch.object(vectorized, "available", False):
+            expected = projection.wgs84_to_web_mercator_path(path)
+            unprojected = projection.web_mercator_to_wgs84_path(projected)
+        for a, b in zip(projected, expected):
+            self.assertPointsAlmostEqual(a, b, 6)
+        for a, b in zip(projection.web_mercator_to_wgs84_path(projected), unprojected):
+            self.assertPointsAlmostEqual(a, b, 12)
+        for a, b in zip(unprojected, path):
+            self.assertPointsAlmostEqual(a, b, 9)
+
+    def test_arcgis_to_geojson(self):
+        """Should reproject Web Mercator geometries, including those of FeatureSet features, instead of warning"""
+        featureset = {
+            "spatialReference": {"wkid": 102100, "latestWkid": 3857},
+            "features": [
+                {"geometry": {"x": X_Y[0], "y": X_Y[1]}, "attributes": {"OBJECTID": 1}},
+                {"geometry": {"paths": [[X_Y, [0, 0]]]}, "attributes": {"OBJECTID": 2}},
+            ],
+        }
+        with warnings.catch_warnings():
+            warnings.simplefilter("error")
+            output = arcgis_to_geojson(featureset, reproject=True)
+        self.assertPointsAlmostEqual(output["features"][0]["geometry"]["coordinates"], LON_LAT, 9)
+        self.assertPointsAlmostEqual(output["features"][1]["geometry"]["coordinates"][0], LON_LAT, 9)
+        self.assertEqual(output["features"][1]["geometry"]["coordinates"][1], [0, 0])
+        self.assertEqual(featureset["features"][0]["geometry"], {"x": X_Y[0], "y": X_Y[1]})  # Input unchanged
+
+        with self.assertWarns(UserWarning):
+            self.assertEqual(arcgis_to_geojson(featureset)["features"][0]["geometry"]["coordinates"], X_Y)
+        with self.assertWarns(UserWarning):  # Other CRSs are not reprojected
+            arcgis_to_geojson({"x": 1, "y": 2, "spatialReference": {"wkid": 27700}}, reproject=True)
+
+    def test_arcgis_to_geojson_iter(self):
+        """Should reproject streamed features when the spatial reference precedes them"""
+        featureset = {"spatialReference": {"wkid": 3857}, "features": [{"geometry": {"x": X_Y[0], "y": X_Y[1]}}]}
+        data = json.dumps(featureset).encode()
+        features = list(arcgis_to_geojson_iter(io.BytesIO(data), reproject=True))
+        self.assertPointsAlmostEqual(features[0]["geometry"]["coordinates"], LON_LAT, 9)
+        data = json.dumps({"features": featureset["features"], "spatialReference": {"wkid": 3857}}).encode()
+        with self.assertRaises(ValueError):
+            list(arcgis_to_geojson_iter(io.BytesIO(data), reproject=True))
+
+    def test_geojson_to_arcgis(self):
+        """Should emit Web Mercator coordinates directly when reprojecting to a Web Mercator WKID"""
+        ring = [[-122.7, 45.5], [-122.6, 45.5], [-122.6, 45.6], [-122.7, 45.6], [-122.7, 45.5]]
+        feature = {"type": "Feature", "geometry": {"type": "Polygon", "coordinates": [ring]}, "properties": None}
+        output = geojson_to_arcgis(feature, wkid=3857, reproject=True, precision=2)
+        self.assertEqual(output["geometry"]["spatialReference"], {"wkid": 3857})
+        rings = output["geometry"]["rings"]
+        self.assertEqual(rings[0][0], [round(v, 2) for v in projection.wgs84_to_web_mercator_point(ring[0])])
+        geometry = arcgis_to_geojson(output["geometry"], reproject=True)
+        for a, b in zip(geometry["coordinates"][0], ring):
+            self.assertPointsAlmostEqual(a, b, 6)
+        point = geojson_to_arcgis({"type": "Point", "coordinates": LON_LAT}, wkid=102100, reproject=True)
+        self.assertAlmostEqual(point["x"], X_Y[0], 6)
+        self.assertEqual(geojson_to_arcgis({"type": "Point", "coordinates": LON_LAT}, reproject=True)["x"], LON_LAT[0])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,122 @@
+import io
+import json
+import unittest
+
+from terraformer import jsonio
+from terraformer.arcgis import arcgis_to_geojson, arcgis_to_geojson_iter, geojson_to_arcgis, quantization_transform
+from terraformer.arcgis.quantization import dequantize_geometry, quantize_geometry
+from terraformer.packed import PackedCoordinates
+
+TRANSFORM = {"originPosition": "upperLeft", "scale": [0.5, 0.25], "translate": [-10.0, 20.0]}
+
+
+class TestQuantization(unittest.TestCase):
+
+    def test_dequantize_geometry(self):
+        """Should decode quantized points and delta-encoded paths, restarting deltas with each path"""
+        self.assertEqual(dequantize_geometry({"x": 4, "y": 8}, TRANSFORM), {"x": -8.0, "y": 18.0})
+        geometry = {"paths": [[[4, 8], [2, -4]], [[0, 0], [1, 1, 5]]], "hasZ": True}
+        self.assertEqual(
+            dequantize_geometry(geometry, TRANSFORM),
+            {"paths": [[[-8.0, 18.0], [-7.0, 19.0]], [[-10.0, 20.0], [-9.5, 19.75, 5]]], "hasZ": True},
+        )
+        lower_left = {**TRANSFORM, "originPosition": "lowerLeft"}
+        self.assertEqual(
+            dequantize_geometry({"points": [[4, 8], [0, 4]]}, lower_left), {"points": [[-8.0, 22.0], [-8.0, 23.0]]}
+        )
+
+    def test_quantize_round_trip(self):
+        """Should quantize coordinates to within half the tolerance, merging vertices in the same grid cell"""
+        transform = quantization_transform((0.0, 0.0, 10.0, 10.0), 0.01)
+        path = [[1.0, 1.0], [1.001, 1.001], [2.345, 6.789], [1.0, 1.0]]
+        quantized = quantize_geometry({"paths": [path]}, transform)
+        self.assertTrue(all(isinstance(value, int) for point in quantized["paths"][0] for value in point))
+        self.assertEqual(len(quantized["paths"][0]), 3)
+        decoded = dequantize_geometry(quantized, transform)["paths"][0]
+        for original, point in zip([path[0], path[2], path[3]], decoded):
+            self.assertAlmostEqual(original[0], point[0], delta=0.005)
+            self.assertAlmostEqual(original[1], point[1], delta=0.005)
+
+    def test_quantize_collapsed_parts(self):
+        """Should drop rings and paths whose vertices merge into too few grid cells, and holes of dropped rings"""
+        transform = quantization_transform((0.0, 0.0, 30.0, 10.0), 1.0)
+        square = [[0.0, 0.0], [10.0, 0.0], [10.0, 10.0], [0.0, 10.0], [0.0, 0.0]]
+        quantized_square = [[0, 10], [0, -10], [10, 0], [0, 10], [-10, 0]]
+        collapsed_hole = [[5.1, 5.1], [5.2, 5.1], [5.2, 5.2], [5.1, 5.1]]
+        polygon = {"type": "Polygon", "coordinates": [square, collapsed_hole]}
+        self.assertEqual(geojson_to_arcgis(polygon, transform=transform)["rings"], [quantized_square])
+        # The outer ring collapses to 3 vertices, while its hole alone would still have 4
+        collapsed_outer = [[20.0, 0.0], [23.0, 0.0], [20.0, 0.45], [20.0, 0.0]]
+        hole = [[20.4, 0.05], [21.6, 0.05], [21.0, 0.1], [20.4, 0.05]]
+        multipolygon = {"type": "MultiPolygon", "coordinates": [[square], [collapsed_outer, hole]]}
+        self.assertEqual(geojson_to_arcgis(multipolygon, transform=transform)["rings"], [quantized_square])
+        polygon = {"type": "Polygon", "coordinates": [collapsed_outer, hole]}
+        self.assertEqual(geojson_to_arcgis(polygon, transform=transform)["rings"], [])
+        line = {"type": "MultiLineString", "coordinates": [[[0.1, 0.1], [0.2, 0.2]], [[0.0, 0.0], [2.0, 0.0]]]}
+        self.assertEqual(geojson_to_arcgis(line, transform=transform)["paths"], [[[0, 10], [2, 0]]])
+
+    def test_quantization_transform(self):
+        """Should place the origin at the extent's upper or lower left corner"""
+        extent = (1.0, 2.0, 3.0, 4.0)
+        self.assertEqual(quantization_transform(extent, 0.1)["translate"], [1.0, 4.0])
+        self.assertEqual(quantization_transform(extent, 0.1, "lowerLeft")["translate"], [1.0, 2.0])
+        with self.assertRaises(ValueError):
+            quantization_transform(extent, 0)
+
+    def test_arcgis_to_geojson_featureset_transform(self):
+        """Should detect a FeatureSet transform and dequantize every feature's geometry"""
+        featureset = {
+            "transform": TRANSFORM,
+            "features": [
+                {"geometry": {"x": 4, "y": 8}, "attributes": {"OBJECTID": 1}},
+                {
+                    "geometry": {"rings": [[[0, 0], [0, -40], [40, 0], [0, 40], [-40, 0]]]},
+                    "attributes": {"OBJECTID": 2},
+                },
+            ],
+        }
+        features = arcgis_to_geojson(featureset)["features"]
+        self.assertEqual(features[0]["geometry"], {"type": "Point", "coordinates": [-8.0, 18.0]})
+        ring = [[-10.0, 20.0], [10.0, 20.0], [10.0, 30.0], [-10.0, 30.0], [-10.0, 20.0]]
+        self.assertEqual(features[1]["geometry"], {"type": "Polygon", "coordinates": [ring]})
+        streamed = list(arcgis_to_geojson_iter(io.BytesIO(json.dumps(featureset).encode())))
+        self.assertEqual(streamed, features)
+
+    def test_geojson_to_arcgis_transform(self):
+        """Should emit quantized, delta-encoded geometry that decodes back to the input"""
+        geojson = {
+            "type": "Feature",
+            "id": 1,
+            "properties": None,
+            "geometry": {
+                "type": "Polygon",
+                "coordinates": [[[0.0, 0.0], [2.0, 0.0], [2.0, 2.0], [0.0, 2.0], [0.0, 0.0]]],
+            },
+        }
+        transform = quantization_transform((0.0, 0.0, 2.0, 2.0), 0.5)
+        quantized = geojson_to_arcgis(geojson, transform=transform)
+        self.assertEqual(quantized["geometry"]["rings"], [[[0, 4], [0, -4], [4, 0], [0, 4], [-4, 0]]])
+        featureset = {"transform": transform, "features": [quantized]}
+        self.assertEqual(arcgis_to_geojson(featureset)["features"][0]["geometry"], geojson["geometry"])
+        self.assertEqual(geojson["geometry"]["coordinates"][0][0], [0.0, 0.0])  # Input unchanged
+
+    def test_geojson_to_arcgis_packed_transform(self):
+        """Should pack quantized coordinates as integers, so they serialize and round-trip as integers"""
+        geojson = {"type": "LineString", "coordinates": [[0.0, 0.0], [2.0, 0.0], [2.0, 2.0]]}
+        transform = quantization_transform((0.0, 0.0, 2.0, 2.0), 0.5)
+        quantized = geojson_to_arcgis(geojson, transform=transform, packed=True)
+        self.assertIsInstance(quantized["paths"], PackedCoordinates)
+        self.assertEqual(quantized["paths"].coords.typecode, "q")
+        decoded = json.loads(jsonio.dumps(quantized))
+        self.assertEqual(decoded["paths"], [[[0, 4], [4, 0], [0, -4]]])
+        self.assertTrue(all(type(value) is int for vertex in decoded["paths"][0] for value in vertex))
+        featureset = {"transform": transform, "features": [{"geometry": decoded, "attributes": {"OBJECTID": 1}}]}
+        self.assertEqual(arcgis_to_geojson(featureset)["features"][0]["geometry"], geojson)
+
+        measured = {"type": "LineString", "coordinates": [[0.0, 0.0, 1.5], [2.0, 2.0, 2.5]]}
+        quantized = geojson_to_arcgis(measured, transform=transform, packed=True)
+        self.assertEqual(quantized["paths"], [[[0, 4, 1.5], [4, -4, 2.5]]])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,83 @@
+import json
+import unittest
+
+from terraformer.arcgis import arcgis_to_geojson, geojson_to_arcgis
+from terraformer.stats import ConversionStats, collect_stats, current_stats
+
+OUTER = [[0, 0], [0, 10], [10, 10], [10, 0], [0, 0]]  # clockwise
+HOLE = [[2, 2], [4, 2], [4, 4], [2, 4], [2, 2]]  # counterclockwise
+CROSSING_HOLE = [[8, 8], [12, 8], [12, 12], [8, 12], [8, 8]]
+FAR_HOLE = [[20, 20], [22, 20], [22, 22], [20, 22]]  # open
+
+
+class TestConversionStats(unittest.TestCase):
+
+    def test_disabled_by_default(self):
+        """Should not collect statistics outside of a collect_stats() block"""
+        self.assertIsNone(current_stats())
+        with collect_stats() as stats:
+            self.assertIs(current_stats(), stats)
+        self.assertIsNone(current_stats())
+
+    def test_arcgis_to_geojson_counters(self):
+        """Should count hole assignments, closed rings and edge comparisons"""
+        featureset = {
+            "features": [
+                {"geometry": {"rings": [OUTER, HOLE, CROSSING_HOLE, FAR_HOLE]}, "attributes": {"OBJECTID": 1}},
+                {"geometry": {"x": 1, "y": 2}, "attributes": {"OBJECTID": 2}},
+            ]
+        }
+        with collect_stats() as stats:
+            arcgis_to_geojson(featureset)
+        self.assertEqual(stats.counters["holes_contained"], 1)
+        self.assertEqual(stats.counters["holes_intersected"], 1)
+        self.assertEqual(stats.counters["holes_promoted"], 1)
+        self.assertEqual(stats.counters["rings_closed"], 1)
+        self.assertEqual(stats.counters["features"], 2)
+        self.assertGreater(stats.counters["edge_comparisons"], 0)
+        self.assertEqual(stats.timings["arcgis_to_geojson"]["calls"], 2)
+        self.assertEqual({feature_id for feature_id, _ in stats.slowest_features}, {1, 2})
+
+    def test_geojson_to_arcgis_counters(self):
+        """Should count reversed rings and record per-feature timings"""
+        feature = {
+            "type": "Feature",
+            "id": "a",
+            "geometry": {"type": "Polygon", "coordinates": [OUTER[::-1], HOLE[::-1]]},  # RFC 7946 winding
+            "properties": None,
+        }
+        with collect_stats() as stats:
+            geojson_to_arcgis({"type": "FeatureCollection", "features": [feature]})
+        self.assertEqual(stats.counters["rings_reversed"], 2)
+        self.assertEqual(stats.timings["geojson_to_arcgis"]["calls"], 1)
+        self.assertEqual(stats.slowest_features[0][0], "a")
+
+    def test_slowest_features(self):
+        """Should keep only the N slowest features, slowest first, and call the callback for every feature"""
+        seen = []
+        stats = ConversionStats(slowest=2, on_feature=lambda feature_id, seconds: seen.append(feature_id))
+        for feature_id, seconds in ((1, 0.5), (2, 0.1), (3, 0.9), (4, 0.2)):
+            stats.record_feature("test", feature_id, seconds)
+        self.assertEqual(stats.slowest_features, [(3, 0.9), (1, 0.5)])
+        self.assertEqual(seen, [1, 2, 3, 4])
+        self.assertEqual(stats.timings["test"]["calls"], 4)
+        self.assertEqual(stats.timings["test"]["max_seconds"], 0.9)
+
+    def test_to_dict(self):
+        """Should export JSON-serializable statistics"""
+        with collect_stats() as stats:
+            arcgis_to_geojson({"geometry": {"rings": [OUTER, HOLE]}, "attributes": {"OBJECTID": 7}})
+        exported = json.loads(json.dumps(stats.to_dict()))
+        self.assertEqual(exported["counters"]["holes_contained"], 1)
+        self.assertEqual(exported["slowest_features"][0]["id"], 7)
+
+    def test_output_unchanged(self):
+        """Should produce the same output whether or not statistics are collected"""
+        geometry = {"rings": [OUTER, HOLE, CROSSING_HOLE, FAR_HOLE]}
+        expected = arcgis_to_geojson(geometry)
+        with collect_stats():
+            self.assertEqual(arcgis_to_geojson(geometry), expected)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,77 @@
+import math
+import random
+import unittest
+from unittest import mock
+
+from terraformer import common, vectorized
+from terraformer.arcgis import helpers
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+
+def _random_ring(rng, n):
+    ring = []
+    for i in range(n):
+        radius = rng.uniform(5, 10)
+        angle = 2 * math.pi * i / n
+        ring.append([round(radius * math.cos(angle), rng.choice((1, 6))), round(radius * math.sin(angle), 6)])
+    if rng.random() < 0.5:
+        ring.reverse()
+    return ring + [ring[0]]
+
+
+@unittest.skipIf(np is None, "NumPy is not installed")
+class TestVectorizedKernels(unittest.TestCase):
+
+    def setUp(self):
+        self.rng = random.Random(7)
+
+    def test_ring_is_clockwise(self):
+        """Should give the same orientation as the pure-Python shoelace sum"""
+        for _ in range(200):
+            ring = _random_ring(self.rng, self.rng.randint(3, 300))
+            expected = helpers.ring_is_clockwise(ring)
+            self.assertEqual(vectorized.ring_is_clockwise(ring), expected)
+            self.assertEqual(helpers.ring_is_clockwise(np.array(ring)), expected)
+
+    def test_coordinates_contain_point(self):
+        """Should give the same result as the pure-Python even-odd test, including points on vertices and edges"""
+        for _ in range(200):
+            ring = _random_ring(self.rng, self.rng.randint(3, 300))
+            points = [[self.rng.uniform(-11, 11), self.rng.uniform(-11, 11)] for _ in range(5)]
+            points += [ring[self.rng.randrange(len(ring))], [0.0, ring[0][1]]]
+            for point in points:
+                with mock.patch.object(vectorized, "available", False):
+                    expected = common.coordinates_contain_point(ring, point)
+                self.assertEqual(vectorized.coordinates_contain_point(ring, point), expected)
+                self.assertEqual(common.coordinates_contain_point(ring, point), expected)
+
+    def test_array_intersects_array(self):
+        """Should give the same result as the pure-Python edge comparisons, including touching and collinear edges"""
+        for _ in range(500):
+            a = [[float(self.rng.randint(0, 6)), float(self.rng.randint(0, 6))] for _ in range(self.rng.randint(2, 25))]
+            b = [[float(self.rng.randint(0, 6)), float(self.rng.randint(0, 6))] for _ in range(self.rng.randint(2, 25))]
+            expected = common.array_intersects_array(a, b)
+            self.assertEqual(vectorized.array_intersects_array(a, b), expected)
+            self.assertEqual(common.array_intersects_array(np.array(a), np.array(b)), expected)
+
+    def test_simplify_path(self):
+        """Should keep the same vertices as pure-Python Douglas-Peucker simplification"""
+        for _ in range(20):
+            ring = _random_ring(self.rng, self.rng.randint(200, 2000))
+            tolerance = self.rng.choice((0.01, 0.1, 1.0))
+            with mock.patch.object(vectorized, "available", False):
+                expected = common.simplify_path(ring, tolerance)
+            self.assertEqual(common.simplify_path(ring, tolerance), expected)
+
+    def test_fallback(self):
+        """Should defer to the pure-Python kernels for ragged or non-numeric coordinates"""
+        self.assertIsNone(vectorized.ring_is_clockwise([[0, 0], [1, 1, 1], [1, 0], [0, 0]]))
+        self.assertIsNone(vectorized.coordinates_contain_point([[0, 0], ["a", 1], [1, 0], [0, 0]], [0.5, 0.1]))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,119 @@
+import gzip
+import io
+import json
+import os
+import tempfile
+import tracemalloc
+import unittest
+
+from terraformer.arcgis import arcgis_to_geojson_iter, geojson_to_arcgis_iter
+from terraformer.writer import GeoJSONWriter
+
+
+class _Sink(io.RawIOBase):
+    """Binary file that discards everything written to it"""
+
+    def writable(self):
+        return True
+
+    def write(self, data):
+        return len(data)
+
+
+def _features(count):
+    for i in range(count):
+        yield {
+            "type": "Feature",
+            "geometry": {"type": "Point", "coordinates": [i * 0.001, -i * 0.002]},
+            "properties": {"OBJECTID": i + 1, "name": f"Café {i}"},
+            "id": i + 1,
+        }
+
+
+class TestGeoJSONWriter(unittest.TestCase):
+
+    def test_feature_collection(self):
+        """Should write a valid FeatureCollection and count features and bytes"""
+        file = io.BytesIO()
+        with GeoJSONWriter(file) as writer:
+            self.assertEqual(writer.write_all(_features(3)), 3)
+        data = file.getvalue()
+        self.assertEqual(json.loads(data), {"type": "FeatureCollection", "features": list(_features(3))})
+        self.assertEqual((writer.features_written, writer.bytes_written), (3, len(data)))
+        self.assertIsNone(writer.compressed_bytes_written)
+
+        file = io.BytesIO()
+        GeoJSONWriter(file).close()
+        self.assertEqual(json.loads(file.getvalue()), {"type": "FeatureCollection", "features": []})
+
+    def test_line_formats(self):
+        """Should write GeoJSON Text Sequences and newline-delimited GeoJSON that the readers can parse"""
+        for fmt in ("seq", "ndjson"):
+            with self.subTest(fmt=fmt):
+                file = io.BytesIO()
+                with GeoJSONWriter(file, fmt, buffer_size=100) as writer:
+                    writer.write_all(_features(50))
+                lines = file.getvalue().splitlines()
+                self.assertEqual(len(lines), 50)
+                self.assertEqual(lines[0].startswith(b"\x1e"), fmt == "seq")
+                file.seek(0)
+                self.assertEqual(len(list(geojson_to_arcgis_iter(file))), 50)
+
+    def test_text_file(self):
+        """Should write to text file objects"""
+        file = io.StringIO()
+        with GeoJSONWriter(file, "ndjson") as writer:
+            writer.write_all(_features(2))
+        self.assertEqual([json.loads(line) for line in file.getvalue().splitlines()], list(_features(2)))
+        with self.assertRaises(ValueError):
+            GeoJSONWriter(io.StringIO(), compress=True)
+
+    def test_gzip(self):
+        """Should gzip output written to paths ending in .gz, leaving the file closed"""
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, "features.geojson.gz")
+            with GeoJSONWriter(path) as writer:
+                writer.write_all(_features(1000))
+            with gzip.open(path, "rb") as file:
+                data = file.read()
+            self.assertEqual(len(json.loads(data)["features"]), 1000)
+            self.assertEqual(writer.bytes_written, len(data))
+            self.assertEqual(writer.compressed_bytes_written, os.path.getsize(path))
+            self.assertLess(writer.compressed_bytes_written, writer.bytes_written / 4)
+
+        file = io.BytesIO()
+        with GeoJSONWriter(file, "seq", compress=True) as writer:
+            writer.write_all(_features(5))
+        self.assertFalse(file.closed)
+        self.assertEqual(gzip.decompress(file.getvalue()).count(b"\x1e"), 5)
+
+    def test_failed_export(self):
+        """Should not complete the FeatureCollection if writing fails, and reject writes once closed"""
+        file = io.BytesIO()
+        with self.assertRaises(TypeError):
+            with GeoJSONWriter(file) as writer:
+                writer.write_all(_features(2))
+                writer.write({"type": "Feature", "geometry": None, "properties": {"value": object()}})
+        with self.assertRaises(ValueError):
+            json.loads(file.getvalue())
+        with self.assertRaises(ValueError):
+            writer.write(next(_features(1)))
+        with self.assertRaises(ValueError):
+            GeoJSONWriter(io.BytesIO(), "csv")
+
+    def test_streaming(self):
+        """Should convert and write a FeatureSet with memory use independent of its size"""
+        featureset = {"features": [{"geometry": {"x": i, "y": i}, "attributes": {"OBJECTID": i}} for i in range(20000)]}
+        source = json.dumps(featureset).encode()
+        del featureset
+        tracemalloc.start()
+        with GeoJSONWriter(_Sink(), "ndjson", buffer_size=1 << 14) as writer:
+            writer.write_all(arcgis_to_geojson_iter(source))
+        _, peak = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+        self.assertEqual(writer.features_written, 20000)
+        self.assertLess(peak, writer.bytes_written / 10)
+
+
+if __name__ == "__main__":
+    unittest.main()